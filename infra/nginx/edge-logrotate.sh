@@ -0,0 +1,22 @@
+#!/bin/sh
+# Rotaciona o log de redirecionamentos do edge por tamanho.
+# Mantém uma geração (.1): o Celery termina de importá-la antes de passar ao arquivo novo.
+set -eu
+
+LOG_FILE="${EDGE_LOG_FILE:-/var/log/nginx/edge/redirects.log}"
+MAX_BYTES="${EDGE_LOG_MAX_BYTES:-104857600}"
+INTERVAL="${EDGE_LOG_ROTATE_INTERVAL:-300}"
+
+(
+    while sleep "$INTERVAL"; do
+        [ -f "$LOG_FILE" ] || continue
+
+        size=$(wc -c < "$LOG_FILE")
+        if [ "$size" -lt "$MAX_BYTES" ]; then
+            continue
+        fi
+
+        mv -f "$LOG_FILE" "$LOG_FILE.1"
+        nginx -s reopen
+    done
+) &
@@ -0,0 +1,23 @@
+#!/bin/sh
+# Recarrega o nginx sempre que o Celery publica um novo mapa de redirecionamentos.
+set -eu
+
+VERSION_FILE="${EDGE_VERSION_FILE:-/etc/nginx/edge/redirects.version}"
+INTERVAL="${EDGE_RELOAD_INTERVAL:-5}"
+
+(
+    last=""
+    while sleep "$INTERVAL"; do
+        current=$(cat "$VERSION_FILE" 2>/dev/null || true)
+        if [ -z "$current" ] || [ "$current" = "$last" ]; then
+            continue
+        fi
+
+        last="$current"
+        if nginx -t -q; then
+            nginx -s reload
+        else
+            echo "edge-reload: configuração inválida, mantendo mapa anterior" >&2
+        fi
+    done
+) &
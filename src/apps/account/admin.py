@@ -3,7 +3,7 @@ from django.contrib.auth.admin import UserAdmin as DjangoUserAdmin
 from django.core.exceptions import PermissionDenied
 from django.utils.translation import gettext_lazy as _
 
-from apps.account.models import User
+from apps.account.models import ApiToken, User
 
 
 @admin.register(User)
@@ -74,3 +74,12 @@ class UserAdmin(DjangoUserAdmin):
                 _("Você não tem permissão para excluir usuários.")
             )
         super().delete_queryset(request, queryset)
+
+
+@admin.register(ApiToken)
+class ApiTokenAdmin(admin.ModelAdmin):
+    list_display = ("name", "user", "prefix", "created_at", "last_used_at", "revoked_at")
+    list_filter = ("revoked_at",)
+    search_fields = ("name", "prefix", "user__email")
+    readonly_fields = ("prefix", "last_used_at")
+    raw_id_fields = ("user",)
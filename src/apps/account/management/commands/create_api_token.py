@@ -0,0 +1,20 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.account.services.api_token_service import ApiTokenService
+
+
+class Command(BaseCommand):
+    help = "Emite um token de API para o usuário informado (exibido uma única vez)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("email")
+        parser.add_argument("--name", default="integração")
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.filter(email=options["email"]).first()
+        if user is None:
+            raise CommandError(f"Usuário não encontrado: {options['email']}")
+
+        _, raw_token = ApiTokenService.issue(user, options["name"])
+        self.stdout.write(self.style.SUCCESS(raw_token))
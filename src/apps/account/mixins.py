@@ -0,0 +1,35 @@
+from django.core.exceptions import PermissionDenied
+from django.http import JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
+
+from apps.account.services.api_token_service import ApiTokenService
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class ApiTokenOrLoginRequiredMixin:
+    """
+    Aceita "Authorization: Bearer <token>" para integrações ou a sessão do navegador.
+
+    A view fica isenta no middleware de CSRF porque o token não depende de cookie;
+    requisições autenticadas por sessão continuam passando pela verificação de CSRF.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        scheme, _, raw_token = request.headers.get("Authorization", "").partition(" ")
+
+        if scheme.lower() == "bearer":
+            user = ApiTokenService.authenticate(raw_token.strip())
+            if user is None:
+                return JsonResponse({"error": "Token inválido."}, status=401)
+            request.user = user
+        else:
+            if not request.user.is_authenticated:
+                raise PermissionDenied
+
+            rejected = CsrfViewMiddleware(lambda request: None).process_view(request, None, (), {})
+            if rejected is not None:
+                return rejected
+
+        return super().dispatch(request, *args, **kwargs)
@@ -82,3 +82,24 @@ class UserProfile(BaseModelAbstract):
 
     def __str__(self):
         return f"{self.user.username} profile"
+
+
+class ApiToken(BaseModelAbstract):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="api_tokens"
+    )
+
+    name = models.CharField(max_length=100)
+    prefix = models.CharField(max_length=8, editable=False)
+    key_digest = models.CharField(max_length=64, unique=True, editable=False)
+    last_used_at = models.DateTimeField(null=True, blank=True, editable=False)
+    revoked_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Token de API"
+        verbose_name_plural = "Tokens de API"
+
+    def __str__(self):
+        return f"{self.name} ({self.prefix}…)"
@@ -0,0 +1,58 @@
+import hashlib
+import logging
+import secrets
+from datetime import timedelta
+
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.account.models import ApiToken
+
+logger = logging.getLogger(__name__)
+
+
+class ApiTokenService:
+    LAST_USED_RESOLUTION = timedelta(minutes=1)
+
+    @staticmethod
+    def digest(raw_token: str) -> str:
+        return hashlib.sha256(raw_token.encode()).hexdigest()
+
+    @staticmethod
+    def issue(user, name: str) -> tuple[ApiToken, str]:
+        # Só o digest é persistido: o token em claro é exibido uma única vez.
+        raw_token = secrets.token_urlsafe(32)
+        token = ApiToken.objects.create(
+            user=user,
+            name=name,
+            prefix=raw_token[:8],
+            key_digest=ApiTokenService.digest(raw_token),
+            created_by=user,
+        )
+        logger.info(f"[API TOKEN] Token emitido | user={user.pk} prefix={token.prefix}")
+        return token, raw_token
+
+    @staticmethod
+    def authenticate(raw_token: str):
+        if not raw_token:
+            return None
+
+        token = (
+            ApiToken.objects.select_related("user")
+            .filter(key_digest=ApiTokenService.digest(raw_token), revoked_at__isnull=True)
+            .first()
+        )
+        if token is None or not token.user.is_active:
+            return None
+
+        now = timezone.now()
+        ApiToken.objects.filter(pk=token.pk).filter(
+            Q(last_used_at__isnull=True)
+            | Q(last_used_at__lt=now - ApiTokenService.LAST_USED_RESOLUTION)
+        ).update(last_used_at=now)
+
+        return token.user
+
+    @staticmethod
+    def revoke(token: ApiToken) -> None:
+        ApiToken.objects.filter(pk=token.pk, revoked_at__isnull=True).update(revoked_at=timezone.now())
@@ -1,11 +1,11 @@
 
 from django.db import IntegrityError, transaction
-from django.db.models import F
 from django.utils.translation import gettext_lazy as translate
 
 from apps.account.dtos.create_user_dto import CreateUserDTO
 from apps.account.models import User
 from apps.billing.models import UserWallet, WalletTransaction
+from apps.billing.services.wallet_service import WalletService
 
 
 class CreateUserService:
@@ -23,16 +23,10 @@ class CreateUserService:
 
         wallet, _ = UserWallet.objects.get_or_create(user=user)
 
-        updated = UserWallet.objects.filter(
-            pk=wallet.pk,
-            balance=0
-        ).update(balance=F("balance") + 5)
-
-        if updated:
-            WalletTransaction.objects.create(
+        if not WalletTransaction.objects.filter(wallet=wallet).exists():
+            WalletService.credit(
                 wallet=wallet,
                 amount=5,
-                transaction_type=WalletTransaction.TransactionType.CREDIT,
                 source=translate("%(amount)s free coins for signing up") % {
                     "amount": 5}
             )
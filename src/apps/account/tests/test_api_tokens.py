@@ -0,0 +1,42 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.account.models import ApiToken
+from apps.account.services.api_token_service import ApiTokenService
+from apps.common.utils import CommonUtils
+
+User = get_user_model()
+
+
+class ApiTokenServiceTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.user = User.objects.create_user(username='api', email='api@test.com')
+
+    def test_only_digest_is_stored(self):
+        token, raw_token = ApiTokenService.issue(self.user, 'ci')
+
+        self.assertNotEqual(token.key_digest, raw_token)
+        self.assertEqual(ApiTokenService.authenticate(raw_token), self.user)
+
+        token.refresh_from_db()
+        self.assertIsNotNone(token.last_used_at)
+
+    def test_revoked_token_and_inactive_user_are_rejected(self):
+        token, raw_token = ApiTokenService.issue(self.user, 'ci')
+        ApiTokenService.revoke(token)
+        self.assertIsNone(ApiTokenService.authenticate(raw_token))
+
+        _, raw_token = ApiTokenService.issue(self.user, 'ci')
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNone(ApiTokenService.authenticate(raw_token))
+
+    def test_command_prints_token_once(self):
+        stdout = StringIO()
+        call_command('create_api_token', 'api@test.com', stdout=stdout)
+
+        self.assertEqual(ApiTokenService.authenticate(stdout.getvalue().strip()), self.user)
+        self.assertEqual(ApiToken.objects.count(), 1)
@@ -1,7 +1,14 @@
 from django.contrib import admin
 from django.utils.html import format_html
 
-from apps.billing.models import Plan, UserSubscription, UserWallet, WalletTransaction
+from apps.billing.models import (
+    Plan,
+    UserSubscription,
+    UserWallet,
+    WalletCheckpoint,
+    WalletTransaction,
+    WebhookEvent,
+)
 
 
 @admin.register(Plan)
@@ -14,7 +21,8 @@ class PlanAdmin(admin.ModelAdmin):
         "advanced_stats",
         "longtime_expiration_date",
         "conditional_redirect",
-        "priority_support"
+        "priority_support",
+        "access_event_retention_days",
     )
     search_fields = ("name",)
     list_filter = (
@@ -36,9 +44,14 @@ class UserSubscriptionAdmin(admin.ModelAdmin):
 
 @admin.register(UserWallet)
 class UserWalletAdmin(admin.ModelAdmin):
-    list_display = ("user", "balance")
-    readonly_fields = ("balance",)
-    fields = ("user", "balance")
+    list_display = ("user", "current_balance")
+    readonly_fields = ("current_balance",)
+    fields = ("user", "current_balance")
+
+    def current_balance(self, obj):
+        return obj.current_balance
+
+    current_balance.short_description = "Saldo"
 
 
 @admin.register(WalletTransaction)
@@ -53,3 +66,18 @@ class WalletTransactionAdmin(admin.ModelAdmin):
         return format_html("<i>Usuário removido</i>")
 
     safe_user.short_description = "Usuário"
+
+
+@admin.register(WalletCheckpoint)
+class WalletCheckpointAdmin(admin.ModelAdmin):
+    list_display = ("wallet", "balance", "cutoff")
+    readonly_fields = ("wallet", "balance", "cutoff")
+    search_fields = ("wallet__user__username",)
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(admin.ModelAdmin):
+    list_display = ("topic", "resource_id", "status", "attempts", "created_at", "processed_at")
+    list_filter = ("topic", "status")
+    search_fields = ("resource_id",)
+    readonly_fields = ("payload", "last_error")
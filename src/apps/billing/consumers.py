@@ -0,0 +1,34 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+
+from apps.billing.services.payment_events_service import PaymentStatusEventService
+
+
+class PaymentStatusConsumer(AsyncJsonWebsocketConsumer):
+
+    async def connect(self):
+        user = self.scope["user"]
+
+        if not user.is_authenticated:
+            await self.close()
+            return
+
+        self.payment_id = self.scope["url_route"]["kwargs"]["payment_id"]
+        self.group_name = PaymentStatusEventService.group_name(user.pk)
+
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+
+        status = await database_sync_to_async(PaymentStatusEventService.last_status)(
+            self.payment_id, user.pk
+        )
+        if status:
+            await self.send_json({"payment_id": self.payment_id, "status": status})
+
+    async def disconnect(self, close_code):
+        if hasattr(self, "group_name"):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def payment_status(self, event):
+        if event["payment_id"] == self.payment_id:
+            await self.send_json({"payment_id": event["payment_id"], "status": event["status"]})
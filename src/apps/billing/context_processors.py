@@ -1,15 +1,14 @@
-from apps.billing.models import UserWallet
+from django.utils.functional import SimpleLazyObject
+
+from apps.billing.services.balance_service import WalletBalanceService
 
 
 class BillingContextProcessor:
     @staticmethod
     def user_balance(request):
         if request.user.is_authenticated:
-            try:
-                wallet = UserWallet.objects.get(user=request.user)
-                return {'user_balance': wallet.balance}
-            except UserWallet.DoesNotExist:
-                return {'user_balance': 0}
+            user_id = request.user.pk
+            return {'user_balance': SimpleLazyObject(lambda: WalletBalanceService.get(user_id))}
         return {'user_balance': 0}
 
 
@@ -0,0 +1,80 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.billing.models import UserWallet
+from apps.billing.services.balance_service import WalletBalanceService
+from apps.billing.services.ledger_service import WalletLedgerService
+
+
+class Command(BaseCommand):
+    help = "Compara UserWallet.balance com o saldo do ledger (checkpoint + transações) em lotes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--open",
+            action="store_true",
+            help="Cria o checkpoint inicial a partir do saldo gravado (antes de ativar WALLET_LEDGER_ENABLED)",
+        )
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help="Grava o saldo do ledger em UserWallet.balance nas carteiras divergentes",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        if options["open"]:
+            opened = WalletLedgerService.open(batch_size=batch_size)
+            self.stdout.write(self.style.SUCCESS(f"{opened} checkpoints iniciais criados"))
+            return
+
+        checked = 0
+        drifted = []
+        synced = 0
+        self.skipped = 0
+
+        for wallet_id, stored, ledger in WalletLedgerService.drift(batch_size=batch_size):
+            checked += 1
+            if stored == ledger:
+                continue
+
+            self.stdout.write(f"{wallet_id}: gravado={stored} ledger={ledger} diferença={ledger - stored}")
+            drifted.append((wallet_id, stored, max(ledger, 0)))
+
+            if len(drifted) >= batch_size:
+                synced += self._flush(drifted, options["sync"])
+                drifted = []
+
+        synced += self._flush(drifted, options["sync"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{checked} carteiras verificadas, {synced} sincronizadas, "
+                f"{self.skipped} alteradas durante a verificação"
+            )
+        )
+
+    def _flush(self, wallets, sync) -> int:
+        if not sync or not wallets:
+            return 0
+
+        synced = []
+        now = timezone.now()
+        with transaction.atomic():
+            for wallet_id, stored, ledger in wallets:
+                # Só grava se o saldo ainda é o lido: um crédito/débito entre drift() e aqui não se perde.
+                updated = UserWallet.objects.filter(pk=wallet_id, balance=stored).update(
+                    balance=ledger, updated_at=now
+                )
+                if updated:
+                    synced.append(wallet_id)
+                else:
+                    self.skipped += 1
+                    self.stdout.write(f"{wallet_id}: saldo alterado durante a verificação, não sincronizado")
+
+            for user_id in UserWallet.objects.filter(pk__in=synced).values_list("user_id", flat=True):
+                WalletBalanceService.invalidate(user_id)
+        return len(synced)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0005_alter_wallettransaction_external_reference'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plan',
+            name='access_event_retention_days',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:12
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0006_plan_access_event_retention_days'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WalletCheckpoint',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now, editable=False)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('balance', models.BigIntegerField()),
+                ('cutoff', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='wallettransaction',
+            index=models.Index(fields=['wallet', 'processed_at'], name='wallet_tx_ledger_idx'),
+        ),
+        migrations.AddField(
+            model_name='walletcheckpoint',
+            name='created_by',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_created', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='walletcheckpoint',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_updated', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='walletcheckpoint',
+            name='wallet',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoints', to='billing.userwallet'),
+        ),
+        migrations.AddIndex(
+            model_name='walletcheckpoint',
+            index=models.Index(fields=['wallet', '-cutoff'], name='wallet_checkpoint_cutoff_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0008_webhook_event'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userwallet',
+            name='balance',
+            field=models.PositiveIntegerField(default=0, help_text='Saldo autoritativo só com WALLET_LEDGER_ENABLED desligado; use current_balance.'),
+        ),
+    ]
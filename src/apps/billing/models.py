@@ -5,6 +5,8 @@ from django.core.exceptions import ValidationError
 from django.db import models, transaction
 from django.utils import timezone
 
+from apps.billing.services.balance_service import WalletBalanceService
+from apps.billing.services.ledger_service import WalletLedgerService
 from apps.common.models import BaseModelAbstract
 
 
@@ -17,6 +19,7 @@ class Plan(BaseModelAbstract):
     longtime_expiration_date = models.BooleanField(default=False)
     conditional_redirect = models.BooleanField(default=False)
     priority_support = models.BooleanField(default=False)
+    access_event_retention_days = models.PositiveIntegerField(null=True, blank=True)
 
     def __str__(self):
         return f"{self.name} - R$ {self.price}"
@@ -99,9 +102,17 @@ class UserWallet(BaseModelAbstract):
         related_name="wallet"
     )
     balance = models.PositiveIntegerField(
-        default=0
+        default=0,
+        help_text="Saldo autoritativo só com WALLET_LEDGER_ENABLED desligado; use current_balance.",
     )
 
+    @property
+    def current_balance(self) -> int:
+        # No modo ledger a coluna não é mantida: o saldo vem de checkpoint + transações.
+        if WalletLedgerService.enabled():
+            return WalletLedgerService.balance(self.pk)
+        return self.balance
+
     def _credit(self, amount: int):
         if amount <= 0:
             raise ValidationError("Valor de crédito inválido.")
@@ -111,11 +122,11 @@ class UserWallet(BaseModelAbstract):
         if amount <= 0:
             raise ValidationError("Valor de débito inválido.")
         if self.balance < amount:
-            raise ValidationError("Saldo insuficiente.")
+            raise ValidationError("Saldo insuficiente.", code="insufficient_balance")
         self.balance -= amount
 
     def __str__(self):
-        return f"{self.user} - {self.balance} coins"
+        return f"{self.user} - {self.current_balance} coins"
 
 
 class WalletTransaction(BaseModelAbstract):
@@ -161,15 +172,32 @@ class WalletTransaction(BaseModelAbstract):
         unique=True
     )
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["wallet", "processed_at"],
+                name="wallet_tx_ledger_idx",
+            ),
+        ]
+
     # --------------------------------------
 
     def _apply(self, wallet):
-        if self.transaction_type == self.TransactionType.CREDIT:
-            wallet._credit(self.amount)
+        if WalletLedgerService.enabled():
+            # No modo ledger a própria transação compõe o saldo; só o débito é validado.
+            if (
+                self.transaction_type == self.TransactionType.DEBIT
+                and WalletLedgerService.balance(wallet.pk) < self.amount
+            ):
+                raise ValidationError("Saldo insuficiente.", code="insufficient_balance")
         else:
-            wallet._debit(self.amount)
+            if self.transaction_type == self.TransactionType.CREDIT:
+                wallet._credit(self.amount)
+            else:
+                wallet._debit(self.amount)
+            wallet.save(update_fields=["balance"])
 
-        wallet.save(update_fields=["balance"])
+        WalletBalanceService.invalidate(wallet.user_id)
         self.processed_at = timezone.now()
 
     def save(self, *args, **kwargs):
@@ -196,7 +224,7 @@ class WalletTransaction(BaseModelAbstract):
             raise ValidationError(
                 "Somente transações pendentes podem ser concluídas.")
         self.status = self.Status.SUCCESS
-        self.save(update_fields=["status"])
+        self.save(update_fields=["status", "processed_at"])
 
     def process_failed(self):
         if self.status != self.Status.PENDING:
@@ -230,3 +258,84 @@ class WalletTransaction(BaseModelAbstract):
 
     def __str__(self):
         return f"{self.transaction_type} {self.amount} {self.status}"
+
+
+class WalletCheckpoint(BaseModelAbstract):
+    wallet = models.ForeignKey(
+        UserWallet,
+        on_delete=models.CASCADE,
+        related_name="checkpoints"
+    )
+    balance = models.BigIntegerField()
+    cutoff = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["wallet", "-cutoff"],
+                name="wallet_checkpoint_cutoff_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.wallet} - {self.balance} coins @ {self.cutoff}"
+
+
+class WebhookEvent(BaseModelAbstract):
+
+    class Topic(models.TextChoices):
+        PAYMENT = "payment", "Pagamento"
+        MERCHANT_ORDER = "merchant_order", "Pedido"
+
+    class Status(models.TextChoices):
+        RECEIVED = "received", "Recebido"
+        PROCESSING = "processing", "Processando"
+        WAITING = "waiting", "Aguardando provedor"
+        PROCESSED = "processed", "Processado"
+        IGNORED = "ignored", "Ignorado"
+        FAILED = "failed", "Falhou"
+
+    topic = models.CharField(
+        max_length=20,
+        choices=Topic.choices
+    )
+    resource_id = models.CharField(
+        max_length=64
+    )
+    payload = models.JSONField(
+        default=dict,
+        blank=True
+    )
+    status = models.CharField(
+        max_length=12,
+        choices=Status.choices,
+        default=Status.RECEIVED
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0
+    )
+    last_error = models.TextField(
+        blank=True,
+        default=""
+    )
+    processed_at = models.DateTimeField(
+        null=True,
+        blank=True
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["topic", "resource_id"],
+                name="unique_webhook_event"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["status", "updated_at"],
+                name="webhook_event_status_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} {self.resource_id} ({self.status})"
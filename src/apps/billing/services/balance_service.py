@@ -0,0 +1,62 @@
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from apps.billing.services.ledger_service import WalletLedgerService
+
+logger = logging.getLogger(__name__)
+
+
+class WalletBalanceService:
+    CACHE_KEY_PREFIX = "billing:balance"
+
+    @staticmethod
+    def _cache_key(user_id) -> str:
+        return f"{WalletBalanceService.CACHE_KEY_PREFIX}:{user_id}"
+
+    @staticmethod
+    def get(user_id) -> int:
+        from apps.billing.models import UserWallet
+
+        key = WalletBalanceService._cache_key(user_id)
+
+        try:
+            balance = cache.get(key)
+        except Exception:
+            logger.warning(f"[BALANCE] Cache indisponível | user={user_id}")
+            balance = None
+
+        if balance is not None:
+            return balance
+
+        if WalletLedgerService.enabled():
+            wallet_id = UserWallet.objects.filter(user_id=user_id).values_list("pk", flat=True).first()
+            balance = WalletLedgerService.balance(wallet_id) if wallet_id else 0
+        else:
+            balance = (
+                UserWallet.objects.filter(user_id=user_id)
+                .values_list("balance", flat=True)
+                .first()
+            ) or 0
+
+        try:
+            cache.set(key, balance, getattr(settings, "WALLET_BALANCE_CACHE_TIMEOUT", 300))
+        except Exception:
+            logger.warning(f"[BALANCE] Falha ao gravar cache | user={user_id}")
+
+        return balance
+
+    @staticmethod
+    def invalidate(user_id) -> None:
+        key = WalletBalanceService._cache_key(user_id)
+
+        def delete():
+            try:
+                cache.delete(key)
+            except Exception:
+                logger.warning(f"[BALANCE] Falha ao invalidar cache | user={user_id}")
+
+        # Remove só após o commit para não repovoar o cache com o saldo antigo.
+        transaction.on_commit(delete)
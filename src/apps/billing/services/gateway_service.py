@@ -0,0 +1,124 @@
+import logging
+import os
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from mercadopago.config.defaults import DEFAULT_RETRY_ON
+from mercadopago.errors.exceptions import MPServerError
+from mercadopago.http.http_client import HttpClient
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+from apps.billing.services.mp_service import MercadoPagoService
+
+logger = logging.getLogger(__name__)
+
+
+class PooledHttpClient(HttpClient):
+    """
+    HttpClient do SDK com uma Session persistente: reaproveita conexões keep-alive entre chamadas.
+    """
+
+    def __init__(self, *, pool_size: int, max_retries: int, backoff_factor: float, timeout: tuple):
+        self.timeout = timeout
+        self.session = requests.Session()
+
+        # POST fica fora das retentativas (allowed_methods padrão): criar preferência não é idempotente.
+        retry = Retry(
+            total=max_retries,
+            status_forcelist=DEFAULT_RETRY_ON,
+            backoff_factor=backoff_factor,
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method, url, maxretries=None, retry_on=None, backoff_factor=None, **kwargs):
+        kwargs["timeout"] = self.timeout
+        api_result = self.session.request(method, url, **kwargs)
+        response = {"status": api_result.status_code, "response": None}
+
+        if api_result.status_code != 204 and api_result.content:
+            try:
+                response["response"] = api_result.json()
+            except ValueError as exc:
+                raise MPServerError(
+                    api_result.status_code,
+                    {"message": "Invalid JSON in response body", "error": "invalid_response"},
+                ) from exc
+
+        return response
+
+
+class PaymentGatewayService:
+    PAYMENT_CACHE_PREFIX = "billing:mp:payment"
+
+    _client = None
+    _pid = None
+
+    @staticmethod
+    def build_sdk():
+        import mercadopago
+        from mercadopago.config import RequestOptions
+
+        connect_timeout = getattr(settings, "MERCADO_PAGO_CONNECT_TIMEOUT", 3.0)
+        read_timeout = getattr(settings, "MERCADO_PAGO_READ_TIMEOUT", 10.0)
+        max_retries = getattr(settings, "MERCADO_PAGO_MAX_RETRIES", 2)
+
+        http_client = PooledHttpClient(
+            pool_size=getattr(settings, "MERCADO_PAGO_POOL_SIZE", 10),
+            max_retries=max_retries,
+            backoff_factor=getattr(settings, "MERCADO_PAGO_RETRY_BACKOFF", 0.3),
+            timeout=(connect_timeout, read_timeout),
+        )
+        return mercadopago.SDK(
+            settings.MERCADO_PAGO_ACCESS_TOKEN,
+            http_client=http_client,
+            request_options=RequestOptions(
+                connection_timeout=float(read_timeout),
+                max_retries=max_retries,
+            ),
+        )
+
+    @staticmethod
+    def client() -> MercadoPagoService:
+        # Recria após fork (workers do gunicorn/celery) para não compartilhar sockets com o processo pai.
+        pid = os.getpid()
+        if PaymentGatewayService._client is None or PaymentGatewayService._pid != pid:
+            PaymentGatewayService._client = MercadoPagoService(PaymentGatewayService.build_sdk())
+            PaymentGatewayService._pid = pid
+        return PaymentGatewayService._client
+
+    @staticmethod
+    def reset() -> None:
+        PaymentGatewayService._client = None
+        PaymentGatewayService._pid = None
+
+    @staticmethod
+    def _payment_cache_key(payment_id) -> str:
+        return f"{PaymentGatewayService.PAYMENT_CACHE_PREFIX}:{payment_id}"
+
+    @staticmethod
+    def get_payment(payment_id, fresh: bool = False) -> dict:
+        key = PaymentGatewayService._payment_cache_key(payment_id)
+
+        if not fresh:
+            try:
+                cached = cache.get(key)
+            except Exception:
+                logger.warning(f"[GATEWAY] Cache indisponível | payment={payment_id}")
+                cached = None
+
+            if cached is not None:
+                return cached
+
+        payment = PaymentGatewayService.client().get_payment(payment_id)
+
+        try:
+            cache.set(key, payment, getattr(settings, "MERCADO_PAGO_PAYMENT_CACHE_TIMEOUT", 10))
+        except Exception:
+            logger.warning(f"[GATEWAY] Falha ao gravar cache | payment={payment_id}")
+
+        return payment
@@ -0,0 +1,170 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Case, F, OuterRef, Q, Subquery, Sum, When
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class WalletLedgerService:
+    """
+    Saldo derivado de WalletTransaction: último checkpoint + soma das transações posteriores.
+    """
+
+    @staticmethod
+    def enabled() -> bool:
+        return getattr(settings, "WALLET_LEDGER_ENABLED", False)
+
+    @staticmethod
+    def applied():
+        from apps.billing.models import WalletTransaction
+
+        # Estornadas continuam valendo: o estorno é uma transação inversa própria.
+        return WalletTransaction.objects.filter(
+            status__in=[WalletTransaction.Status.SUCCESS, WalletTransaction.Status.REFUNDED],
+        )
+
+    @staticmethod
+    def signed_amount():
+        from apps.billing.models import WalletTransaction
+
+        return Case(
+            When(transaction_type=WalletTransaction.TransactionType.CREDIT, then=F("amount")),
+            default=-F("amount"),
+        )
+
+    @staticmethod
+    def _latest_checkpoint(field: str, wallet_ref: str, until=None):
+        from apps.billing.models import WalletCheckpoint
+
+        checkpoints = WalletCheckpoint.objects.filter(wallet=OuterRef(wallet_ref))
+        if until is not None:
+            checkpoints = checkpoints.filter(cutoff__lte=until)
+        return Subquery(checkpoints.order_by("-cutoff").values(field)[:1])
+
+    @staticmethod
+    def balances(wallet_ids, until=None) -> dict:
+        from apps.billing.models import UserWallet
+
+        wallet_ids = list(wallet_ids)
+        if not wallet_ids:
+            return {}
+
+        balances = dict(
+            UserWallet.objects.filter(pk__in=wallet_ids)
+            .annotate(checkpoint=WalletLedgerService._latest_checkpoint("balance", "pk", until))
+            .values_list("pk", "checkpoint")
+        )
+
+        tail = WalletLedgerService.applied().filter(wallet_id__in=wallet_ids)
+        if until is not None:
+            tail = tail.filter(processed_at__lte=until)
+
+        sums = (
+            tail.annotate(cutoff=WalletLedgerService._latest_checkpoint("cutoff", "wallet_id", until))
+            .filter(Q(cutoff__isnull=True) | Q(processed_at__gt=F("cutoff")))
+            .order_by()
+            .values("wallet_id")
+            .annotate(total=Sum(WalletLedgerService.signed_amount()))
+            .values_list("wallet_id", "total")
+        )
+
+        result = {pk: checkpoint or 0 for pk, checkpoint in balances.items()}
+        for wallet_id, total in sums:
+            result[wallet_id] = result.get(wallet_id, 0) + (total or 0)
+        return result
+
+    @staticmethod
+    def balance(wallet_id) -> int:
+        return WalletLedgerService.balances([wallet_id]).get(wallet_id, 0)
+
+    @staticmethod
+    def checkpoint(batch_size: int = 1000, cutoff=None) -> int:
+        from apps.billing.models import WalletCheckpoint
+
+        # Só consolida transações antigas o bastante para já estarem commitadas.
+        cutoff = cutoff or timezone.now() - timedelta(
+            seconds=getattr(settings, "WALLET_CHECKPOINT_LAG", 300)
+        )
+
+        active = WalletLedgerService.applied().filter(processed_at__lte=cutoff)
+        previous = WalletCheckpoint.objects.order_by("-cutoff").values_list("cutoff", flat=True).first()
+        if previous is not None:
+            active = active.filter(processed_at__gt=previous)
+
+        wallet_ids = active.order_by("wallet_id").values_list("wallet_id", flat=True).distinct()
+
+        created = 0
+        batch = []
+        for wallet_id in wallet_ids.iterator(chunk_size=batch_size):
+            batch.append(wallet_id)
+            if len(batch) >= batch_size:
+                created += WalletLedgerService._write_checkpoints(batch, cutoff)
+                batch = []
+
+        if batch:
+            created += WalletLedgerService._write_checkpoints(batch, cutoff)
+
+        logger.info(f"[LEDGER] Checkpoints gravados | wallets={created} cutoff={cutoff.isoformat()}")
+        return created
+
+    @staticmethod
+    def _write_checkpoints(wallet_ids, cutoff) -> int:
+        from apps.billing.models import WalletCheckpoint
+
+        balances = WalletLedgerService.balances(wallet_ids, until=cutoff)
+        WalletCheckpoint.objects.bulk_create(
+            WalletCheckpoint(wallet_id=wallet_id, balance=balance, cutoff=cutoff)
+            for wallet_id, balance in balances.items()
+        )
+        return len(balances)
+
+    @staticmethod
+    def drift(batch_size: int = 1000):
+        from apps.billing.models import UserWallet
+
+        last_pk = None
+
+        while True:
+            wallets = UserWallet.objects.order_by("pk")
+            if last_pk is not None:
+                wallets = wallets.filter(pk__gt=last_pk)
+
+            stored = list(wallets.values_list("pk", "balance")[:batch_size])
+            if not stored:
+                break
+
+            ledger = WalletLedgerService.balances([pk for pk, _ in stored])
+            for pk, balance in stored:
+                yield pk, balance, ledger.get(pk, 0)
+
+            last_pk = stored[-1][0]
+
+    @staticmethod
+    def open(batch_size: int = 1000, cutoff=None) -> int:
+        from apps.billing.models import UserWallet, WalletCheckpoint
+
+        # Saldo inicial do ledger: adota o saldo gravado em UserWallet para carteiras sem checkpoint.
+        cutoff = cutoff or timezone.now()
+        wallets = (
+            UserWallet.objects.filter(checkpoints__isnull=True)
+            .order_by()
+            .values_list("pk", "balance")
+        )
+
+        created = 0
+        batch = []
+        for wallet_id, balance in wallets.iterator(chunk_size=batch_size):
+            batch.append(WalletCheckpoint(wallet_id=wallet_id, balance=balance, cutoff=cutoff))
+            if len(batch) >= batch_size:
+                WalletCheckpoint.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+
+        if batch:
+            WalletCheckpoint.objects.bulk_create(batch)
+            created += len(batch)
+
+        return created
@@ -47,3 +47,18 @@ class MercadoPagoService(PaymentAbstract):
                 "status": 500,
                 "response": {"error": str(e)},
             }
+
+    def get_payment(self, payment_id) -> dict:
+        return self._response(self.sdk.payment().get(payment_id), "payment", payment_id)
+
+    def get_merchant_order(self, merchant_order_id) -> dict:
+        return self._response(
+            self.sdk.merchant_order().get(merchant_order_id), "merchant_order", merchant_order_id
+        )
+
+    @staticmethod
+    def _response(result, resource, resource_id) -> dict:
+        status = result.get("status")
+        if status and status >= 400:
+            raise RuntimeError(f"Mercado Pago retornou {status} para {resource} {resource_id}")
+        return result.get("response") or {}
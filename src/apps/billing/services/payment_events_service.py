@@ -0,0 +1,61 @@
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentStatusEventService:
+    GROUP_PREFIX = "billing.payments"
+    CACHE_KEY_PREFIX = "billing:payment_status"
+    EVENT_TYPE = "payment.status"
+
+    @staticmethod
+    def group_name(user_id) -> str:
+        return f"{PaymentStatusEventService.GROUP_PREFIX}.{user_id}"
+
+    @staticmethod
+    def _cache_key(payment_id) -> str:
+        return f"{PaymentStatusEventService.CACHE_KEY_PREFIX}:{payment_id}"
+
+    @staticmethod
+    def last_status(payment_id, user_id) -> str | None:
+        # Cobre a página que conecta depois do webhook: o push já teria passado.
+        try:
+            cached = cache.get(PaymentStatusEventService._cache_key(payment_id))
+        except Exception:
+            return None
+
+        if not cached or str(cached.get("user_id")) != str(user_id):
+            return None
+        return cached.get("status")
+
+    @staticmethod
+    def publish(user_id, payment_id, status: str) -> None:
+        if not user_id:
+            return
+
+        message = {
+            "type": PaymentStatusEventService.EVENT_TYPE,
+            "payment_id": str(payment_id),
+            "status": status,
+        }
+
+        def send():
+            try:
+                cache.set(
+                    PaymentStatusEventService._cache_key(payment_id),
+                    {"user_id": str(user_id), "status": status},
+                    getattr(settings, "PAYMENT_STATUS_EVENT_TIMEOUT", 60 * 60),
+                )
+                async_to_sync(get_channel_layer().group_send)(
+                    PaymentStatusEventService.group_name(user_id), message
+                )
+            except Exception as e:
+                logger.warning(f"[PAYMENT EVENTS] Falha ao publicar | payment={payment_id} error={e}")
+
+        transaction.on_commit(send)
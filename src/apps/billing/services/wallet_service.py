@@ -1,8 +1,10 @@
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import connection, transaction
 from django.utils import timezone
 
 from apps.billing.models import UserWallet, WalletTransaction
+from apps.billing.services.balance_service import WalletBalanceService
+from apps.billing.services.ledger_service import WalletLedgerService
 
 
 class WalletService:
@@ -18,21 +20,70 @@ class WalletService:
         if amount <= 0:
             raise ValidationError("O valor do crédito deve ser positivo.")
 
-        transaction = WalletTransaction.objects.create(
-            wallet=wallet,
-            transaction_type=WalletTransaction.TransactionType.CREDIT,
-            amount=amount,
+        return WalletService._post(
+            wallet,
+            WalletTransaction.TransactionType.CREDIT,
+            amount,
             source=source,
             external_reference=external_reference,
         )
 
-        wallet.balance += amount
-        wallet.save(update_fields=["balance"])
+    @staticmethod
+    def _change_balance(wallet_id, delta: int) -> int | None:
+        opts = UserWallet._meta
+        quote = connection.ops.quote_name
+
+        # Verificação e ajuste no mesmo UPDATE: o lock da linha dura só este comando.
+        sql = (
+            f"UPDATE {quote(opts.db_table)} "
+            f"SET {quote('balance')} = {quote('balance')} + %s, {quote('updated_at')} = %s "
+            f"WHERE {quote(opts.pk.column)} = %s AND {quote('balance')} + %s >= 0 "
+            f"RETURNING {quote('balance')}"
+        )
+        params = [
+            delta,
+            opts.get_field("updated_at").get_db_prep_value(timezone.now(), connection),
+            opts.pk.get_db_prep_value(wallet_id, connection),
+            delta,
+        ]
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+
+        return row[0] if row else None
+
+    @staticmethod
+    def _post(wallet, transaction_type, amount, source=None, external_reference=None):
+        delta = amount if transaction_type == WalletTransaction.TransactionType.CREDIT else -amount
+
+        if WalletLedgerService.enabled():
+            # Créditos só acrescentam linhas; débitos serializam por carteira para não ficar negativo.
+            balance = None
+            if delta < 0:
+                UserWallet.objects.select_for_update().filter(pk=wallet.pk).values_list("pk").first()
+                if WalletLedgerService.balance(wallet.pk) + delta < 0:
+                    raise ValidationError("Saldo insuficiente.", code="insufficient_balance")
+        else:
+            balance = WalletService._change_balance(wallet.pk, delta)
+            if balance is None:
+                raise ValidationError("Saldo insuficiente.", code="insufficient_balance")
 
-        transaction.status = WalletTransaction.Status.SUCCESS
-        transaction.processed_at = timezone.now()
-        transaction.save(update_fields=["status", "processed_at"])
+        # bulk_create não passa por WalletTransaction.save, que aplicaria o valor de novo.
+        transaction = WalletTransaction(
+            wallet=wallet,
+            transaction_type=transaction_type,
+            amount=amount,
+            source=source,
+            external_reference=external_reference,
+            status=WalletTransaction.Status.SUCCESS,
+            processed_at=timezone.now(),
+        )
+        WalletTransaction.objects.bulk_create([transaction])
 
+        if balance is not None:
+            wallet.balance = balance
+        WalletBalanceService.invalidate(wallet.user_id)
         return transaction
 
     @staticmethod
@@ -41,18 +92,13 @@ class WalletService:
         if amount <= 0:
             raise ValidationError("O valor do débito deve ser positivo.")
 
-        if wallet.balance < amount:
-            raise ValidationError("Saldo insuficiente.")
-
-        transaction = WalletTransaction.objects.create(
-            wallet=wallet,
-            transaction_type=WalletTransaction.TransactionType.DEBIT,
-            amount=amount,
+        return WalletService._post(
+            wallet,
+            WalletTransaction.TransactionType.DEBIT,
+            amount,
             source=source,
             external_reference=external_reference,
-            status=WalletTransaction.Status.SUCCESS,
         )
-        return transaction
 
     @staticmethod
     @transaction.atomic
@@ -62,34 +108,21 @@ class WalletService:
                 "Apenas transações concluídas podem ser estornadas."
             )
 
-        wallet = UserWallet.objects.select_for_update().get(
-            pk=transaction.wallet.pk
-        )
-
         reverse_type = (
             WalletTransaction.TransactionType.DEBIT
             if transaction.transaction_type == WalletTransaction.TransactionType.CREDIT
             else WalletTransaction.TransactionType.CREDIT
         )
 
-        if reverse_type == WalletTransaction.TransactionType.DEBIT:
-            if wallet.balance < transaction.amount:
-                raise ValidationError("Saldo insuficiente para estorno.")
-            wallet.balance -= transaction.amount
-        else:
-            wallet.balance += transaction.amount
-
-        wallet.save(update_fields=["balance"])
-
-        refund_transaction = WalletTransaction.objects.create(
-            wallet=wallet,
-            transaction_type=reverse_type,
-            amount=transaction.amount,
-            status=WalletTransaction.Status.SUCCESS,
-            source=f"Refund: {transaction.id}",
-            external_reference=transaction.external_reference,
-            processed_at=timezone.now(),
-        )
+        try:
+            refund_transaction = WalletService._post(
+                transaction.wallet,
+                reverse_type,
+                transaction.amount,
+                source=f"Refund: {transaction.id}",
+            )
+        except ValidationError:
+            raise ValidationError("Saldo insuficiente para estorno.")
 
         transaction.status = WalletTransaction.Status.REFUNDED
         transaction.save(update_fields=["status"])
@@ -0,0 +1,224 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from apps.billing.models import Plan, UserWallet, WalletTransaction, WebhookEvent
+from apps.billing.services.gateway_service import PaymentGatewayService
+from apps.billing.services.payment_events_service import PaymentStatusEventService
+from apps.billing.services.subscription_service import SubscriptionService
+from apps.billing.services.wallet_service import WalletService
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookInboxService:
+    PAYMENT_TOPICS = ("payment", "approved", "payment.updated", "payment.created")
+    MERCHANT_ORDER_TOPICS = ("merchant_order", "topic_merchant_order_wh")
+    REARM_STATUSES = (WebhookEvent.Status.WAITING, WebhookEvent.Status.FAILED)
+
+    @staticmethod
+    def normalize(data: dict, query) -> tuple[str | None, str | None]:
+        raw_topic = data.get("topic") or data.get("type") or query.get("topic") or query.get("type")
+
+        if raw_topic in WebhookInboxService.PAYMENT_TOPICS:
+            topic = WebhookEvent.Topic.PAYMENT
+        elif raw_topic in WebhookInboxService.MERCHANT_ORDER_TOPICS:
+            topic = WebhookEvent.Topic.MERCHANT_ORDER
+        else:
+            return None, None
+
+        # O "id" de topo é o da notificação quando há "data.id"; o recurso vem de data.id.
+        resource_id = (
+            (data.get("data") or {}).get("id")
+            or data.get("data.id")
+            or query.get("data.id")
+            or query.get("id")
+            or data.get("id")
+        )
+        return topic, str(resource_id) if resource_id else None
+
+    @staticmethod
+    def receive(topic: str, resource_id: str, payload: dict) -> WebhookEvent:
+        event, created = WebhookEvent.objects.get_or_create(
+            topic=topic,
+            resource_id=resource_id,
+            defaults={"payload": payload},
+        )
+
+        if not created:
+            # Nova notificação de um evento que aguardava o provedor (ex.: pagamento aprovado depois).
+            rearmed = WebhookEvent.objects.filter(
+                pk=event.pk, status__in=WebhookInboxService.REARM_STATUSES
+            ).update(
+                status=WebhookEvent.Status.RECEIVED,
+                payload=payload,
+                attempts=0,
+                updated_at=timezone.now(),
+            )
+            if not rearmed:
+                logger.info(f"[WEBHOOK] Evento duplicado | topic={topic} id={resource_id}")
+                return event
+
+        WebhookInboxService.enqueue(event.pk)
+        return event
+
+    @staticmethod
+    def enqueue(event_id) -> None:
+        from apps.billing.tasks import process_webhook_event
+
+        def publish():
+            try:
+                process_webhook_event.delay(str(event_id))
+            except Exception as e:
+                # O evento já está no inbox; drain_webhook_inbox o processa depois.
+                logger.warning(f"[WEBHOOK] Falha ao enfileirar | event={event_id} error={e}")
+
+        transaction.on_commit(publish)
+
+    @staticmethod
+    def _claimable():
+        now = timezone.now()
+        retry_before = now - timedelta(seconds=getattr(settings, "WEBHOOK_RETRY_DELAY", 60))
+        stuck_before = now - timedelta(seconds=getattr(settings, "WEBHOOK_PROCESSING_TIMEOUT", 300))
+
+        return WebhookEvent.objects.filter(
+            Q(status=WebhookEvent.Status.RECEIVED)
+            | Q(status=WebhookEvent.Status.FAILED, updated_at__lte=retry_before)
+            | Q(status=WebhookEvent.Status.PROCESSING, updated_at__lte=stuck_before),
+            attempts__lt=getattr(settings, "WEBHOOK_MAX_ATTEMPTS", 5),
+        )
+
+    @staticmethod
+    @transaction.atomic
+    def claim(event_id=None, limit: int = 1) -> list[WebhookEvent]:
+        events = WebhookInboxService._claimable().select_for_update(skip_locked=True)
+        if event_id is not None:
+            events = events.filter(pk=event_id)
+
+        events = list(events.order_by("created_at")[:limit])
+        if events:
+            WebhookEvent.objects.filter(pk__in=[event.pk for event in events]).update(
+                status=WebhookEvent.Status.PROCESSING,
+                attempts=F("attempts") + 1,
+                updated_at=timezone.now(),
+            )
+        return events
+
+    @staticmethod
+    def process(event: WebhookEvent) -> str:
+        last_error = ""
+        try:
+            status = WebhookInboxService._apply(event)
+        except Exception as e:
+            logger.warning(
+                f"[WEBHOOK] Falha ao processar | topic={event.topic} id={event.resource_id} error={e}"
+            )
+            status = WebhookEvent.Status.FAILED
+            last_error = str(e)[:1000]
+
+        WebhookEvent.objects.filter(pk=event.pk).update(
+            status=status,
+            last_error=last_error,
+            processed_at=timezone.now() if status == WebhookEvent.Status.PROCESSED else None,
+            updated_at=timezone.now(),
+        )
+
+        logger.info(f"[WEBHOOK] Evento processado | topic={event.topic} id={event.resource_id} status={status}")
+        return status
+
+    @staticmethod
+    def drain(batch_size: int | None = None) -> int:
+        batch_size = batch_size or getattr(settings, "WEBHOOK_INBOX_BATCH_SIZE", 50)
+        events = WebhookInboxService.claim(limit=batch_size)
+
+        for event in events:
+            WebhookInboxService.process(event)
+
+        return len(events)
+
+    @staticmethod
+    def _apply(event: WebhookEvent) -> str:
+        if event.topic == WebhookEvent.Topic.MERCHANT_ORDER:
+            merchant_order = PaymentGatewayService.client().get_merchant_order(event.resource_id)
+            payments = merchant_order.get("payments") or []
+            if not payments:
+                return WebhookEvent.Status.WAITING
+
+            for payment in payments:
+                if payment.get("id"):
+                    WebhookInboxService.receive(
+                        WebhookEvent.Topic.PAYMENT,
+                        str(payment["id"]),
+                        {"merchant_order": event.resource_id},
+                    )
+            return WebhookEvent.Status.PROCESSED
+
+        # Notificação indica mudança no provedor: busca sem cache e atualiza o cache compartilhado.
+        payment = PaymentGatewayService.get_payment(event.resource_id, fresh=True)
+        metadata = payment.get("metadata") or {}
+        status = WebhookInboxService._apply_payment(event.resource_id, payment, metadata)
+
+        # Só publica depois de aplicar: "approved" chega à página com os créditos já na carteira.
+        if status in (WebhookEvent.Status.PROCESSED, WebhookEvent.Status.WAITING):
+            PaymentStatusEventService.publish(
+                metadata.get("user_id"), event.resource_id, payment.get("status")
+            )
+        return status
+
+    @staticmethod
+    def _apply_payment(payment_id: str, payment: dict, metadata: dict) -> str:
+        if payment.get("status") != "approved":
+            return WebhookEvent.Status.WAITING
+
+        payment_type = metadata.get("type")
+
+        if payment_type == "credits":
+            return WebhookInboxService._apply_credits(
+                payment_id, metadata.get("user_id"), metadata.get("amount")
+            )
+
+        if payment_type == "plan":
+            return WebhookInboxService._apply_plan(metadata.get("user_id"), metadata.get("plan_id"))
+
+        logger.info(f"[WEBHOOK] Tipo desconhecido | payment={payment_id} tipo={payment_type}")
+        return WebhookEvent.Status.IGNORED
+
+    @staticmethod
+    def _apply_credits(payment_id: str, user_id, amount) -> str:
+        try:
+            amount = int(float(amount))
+        except (TypeError, ValueError):
+            logger.error(f"[WEBHOOK] Valor inválido | payment={payment_id} amount={amount}")
+            return WebhookEvent.Status.IGNORED
+
+        if WalletTransaction.objects.filter(external_reference=payment_id).exists():
+            return WebhookEvent.Status.PROCESSED
+
+        user = get_user_model().objects.get(pk=user_id)
+        wallet, _ = UserWallet.objects.get_or_create(user=user)
+
+        try:
+            with transaction.atomic():
+                WalletService.credit(
+                    wallet=wallet,
+                    amount=amount,
+                    source=f"CRED {amount} via Mercado Pago",
+                    external_reference=payment_id,
+                )
+        except IntegrityError:
+            logger.warning(f"[WEBHOOK] Já processado | payment={payment_id}")
+
+        return WebhookEvent.Status.PROCESSED
+
+    @staticmethod
+    def _apply_plan(user_id, plan_id) -> str:
+        user = get_user_model().objects.get(pk=user_id)
+        plan = Plan.objects.get(pk=plan_id)
+
+        SubscriptionService.activate_plan(user, plan)
+        return WebhookEvent.Status.PROCESSED
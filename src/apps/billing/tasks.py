@@ -63,9 +63,35 @@ def process_payment_task(self, data: dict):
         wallet.refresh_from_db()
 
         logger.info(
-            f"[TASK][DONE] Créditos aplicados | user={payment.user_id} balance={wallet.balance}"
+            f"[TASK][DONE] Créditos aplicados | user={payment.user_id} balance={wallet.current_balance}"
         )
         return {"status": "wallet_updated", "wallet_transaction_id": wallet_transaction.id}
 
     logger.warning(f"[TASK] Tipo inválido | tipo={payment.payment_type}")
     return {"status": "invalid_type"}
+
+
+@shared_task
+def checkpoint_wallet_ledger():
+    from apps.billing.services.ledger_service import WalletLedgerService
+
+    if not WalletLedgerService.enabled():
+        return 0
+    return WalletLedgerService.checkpoint()
+
+
+@shared_task
+def process_webhook_event(event_id: str):
+    from apps.billing.services.webhook_service import WebhookInboxService
+
+    events = WebhookInboxService.claim(event_id=event_id)
+    if not events:
+        return "skipped"
+    return WebhookInboxService.process(events[0])
+
+
+@shared_task
+def drain_webhook_inbox():
+    from apps.billing.services.webhook_service import WebhookInboxService
+
+    return WebhookInboxService.drain()
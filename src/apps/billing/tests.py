@@ -1,18 +1,46 @@
+import hashlib
+import hmac
+import json
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import skipUnless
+from unittest.mock import Mock, patch
 from uuid import uuid4
 
+from asgiref.sync import async_to_sync, sync_to_async
+from channels.testing import WebsocketCommunicator
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
 from django.db.models.signals import post_save
-from django.test import TestCase, override_settings
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
 from django.utils import timezone
 
+from apps.billing.consumers import PaymentStatusConsumer
+from apps.billing.context_processors import user_balance
 from apps.billing.models import (
     Plan,
     UserSubscription,
     UserWallet,
+    WalletCheckpoint,
     WalletTransaction,
+    WebhookEvent,
 )
+from apps.billing.services.gateway_service import PaymentGatewayService, PooledHttpClient
+from apps.billing.services.ledger_service import WalletLedgerService
+from apps.billing.services.mp_service import MercadoPagoService
+from apps.billing.services.payment_events_service import PaymentStatusEventService
+from apps.billing.services.wallet_service import WalletService
+from apps.billing.services.webhook_service import WebhookInboxService
 from apps.billing.signals import create_user_wallet
+from apps.billing.tasks import process_webhook_event
+from apps.billing.views import PaymentStatusStreamView
+from apps.common.tests.mocks.mock_mercado_pago import FakeMercadoPagoSDK
+from apps.common.utils import CommonUtils
 from apps.notification.signals import enqueue_welcome_email
 
 User = get_user_model()
@@ -169,3 +197,479 @@ class TestModels(TestCase):
 
         self.assertEqual(wallet.balance, 30)
         self.assertEqual(wallet.transactions.count(), 1)
+
+
+class WalletBalanceCacheTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        cache.clear()
+        self.user = User.objects.create_user("bia", "bia@test.com", "123")
+        self.wallet = UserWallet.objects.get(user=self.user)
+        self.request = RequestFactory().get("/")
+        self.request.user = self.user
+
+    def test_balance_is_lazy(self):
+        with self.assertNumQueries(0):
+            context = user_balance(self.request)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(str(context["user_balance"]), "0")
+
+    def test_balance_is_cached_between_renders(self):
+        str(user_balance(self.request)["user_balance"])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(str(user_balance(self.request)["user_balance"]), "0")
+
+    def test_wallet_changes_invalidate_cache(self):
+        str(user_balance(self.request)["user_balance"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            WalletTransaction.objects.create(
+                wallet=self.wallet,
+                transaction_type=WalletTransaction.TransactionType.CREDIT,
+                amount=7,
+                status=WalletTransaction.Status.SUCCESS,
+                source="Teste",
+            )
+
+        self.assertEqual(str(user_balance(self.request)["user_balance"]), "7")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            WalletService.debit(UserWallet.objects.get(pk=self.wallet.pk), 2, source="Teste")
+
+        self.assertEqual(str(user_balance(self.request)["user_balance"]), "5")
+
+    def test_anonymous_user_has_zero_balance(self):
+        self.request.user = AnonymousUser()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(user_balance(self.request)["user_balance"], 0)
+
+
+class WalletDebitTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.user = User.objects.create_user("rui", "rui@test.com", "123")
+        self.wallet = UserWallet.objects.get(user=self.user)
+        UserWallet.objects.filter(pk=self.wallet.pk).update(balance=10)
+
+    def test_debit_uses_single_update_and_insert(self):
+        with self.assertNumQueries(4):
+            transaction = WalletService.debit(self.wallet, 4, source="Teste")
+
+        self.assertEqual(self.wallet.balance, 6)
+        self.assertEqual(transaction.status, WalletTransaction.Status.SUCCESS)
+        self.assertIsNotNone(transaction.processed_at)
+        self.assertEqual(UserWallet.objects.get(pk=self.wallet.pk).balance, 6)
+
+    def test_debit_ignores_stale_in_memory_balance(self):
+        self.wallet.balance = 1000
+
+        with self.assertRaises(ValidationError):
+            WalletService.debit(self.wallet, 11, source="Teste")
+
+        self.assertEqual(UserWallet.objects.get(pk=self.wallet.pk).balance, 10)
+        self.assertFalse(WalletTransaction.objects.filter(wallet=self.wallet).exists())
+
+
+class WalletDebitConcurrencyTests(TransactionTestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.user = User.objects.create_user("lia", "lia@test.com", "123")
+        self.wallet = UserWallet.objects.get(user=self.user)
+        UserWallet.objects.filter(pk=self.wallet.pk).update(balance=25)
+
+    def _debit(self, _):
+        wallet = UserWallet(pk=self.wallet.pk, user_id=self.user.pk, balance=25)
+        try:
+            WalletService.debit(wallet, 2, source="Teste")
+            return True
+        except ValidationError:
+            return False
+        finally:
+            connection.close()
+
+    # SQLite em memória falha escritores concorrentes em vez de esperar o lock da linha.
+    @skipUnless(connection.vendor == "postgresql", "requer escrita concorrente (PostgreSQL)")
+    def test_parallel_debits_never_overdraw(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(self._debit, range(40)))
+
+        self.assertEqual(results.count(True), 25 // 2)
+        self.assertEqual(UserWallet.objects.get(pk=self.wallet.pk).balance, 1)
+        self.assertEqual(
+            WalletTransaction.objects.filter(
+                wallet=self.wallet,
+                transaction_type=WalletTransaction.TransactionType.DEBIT,
+            ).count(),
+            25 // 2,
+        )
+
+
+class WalletServiceTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.user = User.objects.create_user("eva", "eva@test.com", "123")
+        self.wallet = UserWallet.objects.get(user=self.user)
+
+    def test_credit_is_applied_once(self):
+        WalletService.credit(self.wallet, 10, source="Teste")
+
+        self.assertEqual(UserWallet.objects.get(pk=self.wallet.pk).balance, 10)
+
+    def test_refund_reverses_once(self):
+        credit = WalletService.credit(self.wallet, 10, source="Teste", external_reference="ref-1")
+
+        WalletService.refund(credit)
+
+        credit.refresh_from_db()
+        self.assertEqual(credit.status, WalletTransaction.Status.REFUNDED)
+        self.assertEqual(UserWallet.objects.get(pk=self.wallet.pk).balance, 0)
+
+
+@override_settings(WALLET_LEDGER_ENABLED=True, WALLET_CHECKPOINT_LAG=0)
+class WalletLedgerTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.user = User.objects.create_user("noa", "noa@test.com", "123")
+        self.wallet = UserWallet.objects.get(user=self.user)
+
+    def test_ledger_mode_does_not_touch_wallet_row(self):
+        WalletService.credit(self.wallet, 10, source="Teste")
+        WalletService.debit(self.wallet, 3, source="Teste")
+
+        self.assertEqual(UserWallet.objects.get(pk=self.wallet.pk).balance, 0)
+        self.assertEqual(WalletLedgerService.balance(self.wallet.pk), 7)
+
+        with self.assertRaises(ValidationError):
+            WalletService.debit(self.wallet, 8, source="Teste")
+
+    def test_current_balance_follows_the_ledger(self):
+        WalletService.credit(self.wallet, 10, source="Teste")
+
+        wallet = UserWallet.objects.get(pk=self.wallet.pk)
+        self.assertEqual(wallet.current_balance, 10)
+        self.assertIn("10 coins", str(wallet))
+
+    def test_balance_is_checkpoint_plus_tail(self):
+        WalletService.credit(self.wallet, 10, source="Teste")
+        self.assertEqual(WalletLedgerService.checkpoint(), 1)
+
+        WalletTransaction.objects.filter(wallet=self.wallet).delete()
+        WalletService.debit(self.wallet, 4, source="Teste")
+
+        with self.assertNumQueries(2):
+            self.assertEqual(WalletLedgerService.balance(self.wallet.pk), 6)
+
+        self.assertEqual(WalletLedgerService.checkpoint(), 1)
+        self.assertEqual(WalletCheckpoint.objects.filter(wallet=self.wallet).latest("cutoff").balance, 6)
+
+    def test_pending_transaction_counts_once_processed(self):
+        pending = WalletTransaction.objects.create(
+            wallet=self.wallet,
+            transaction_type=WalletTransaction.TransactionType.CREDIT,
+            amount=5,
+            source="Teste",
+        )
+        self.assertEqual(WalletLedgerService.balance(self.wallet.pk), 0)
+
+        pending.process_success()
+
+        self.assertEqual(WalletLedgerService.balance(self.wallet.pk), 5)
+        self.assertEqual(UserWallet.objects.get(pk=self.wallet.pk).balance, 0)
+
+
+class ReconcileWalletsCommandTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.user = User.objects.create_user("ivo", "ivo@test.com", "123")
+        self.wallet = UserWallet.objects.get(user=self.user)
+        WalletService.credit(self.wallet, 10, source="Teste")
+
+    def test_reports_and_syncs_drift(self):
+        UserWallet.objects.filter(pk=self.wallet.pk).update(balance=99)
+        out = StringIO()
+
+        call_command("reconcile_wallets", "--batch-size", "1", stdout=out)
+        self.assertIn("gravado=99 ledger=10", out.getvalue())
+        self.assertEqual(UserWallet.objects.get(pk=self.wallet.pk).balance, 99)
+
+        call_command("reconcile_wallets", "--sync", stdout=StringIO())
+        self.assertEqual(UserWallet.objects.get(pk=self.wallet.pk).balance, 10)
+
+    def test_sync_skips_wallets_changed_after_the_check(self):
+        UserWallet.objects.filter(pk=self.wallet.pk).update(balance=99)
+        drift = WalletLedgerService.drift
+
+        def concurrent_debit(*args, **kwargs):
+            for row in drift(*args, **kwargs):
+                UserWallet.objects.filter(pk=self.wallet.pk).update(balance=97)
+                yield row
+
+        out = StringIO()
+        with patch.object(WalletLedgerService, "drift", side_effect=concurrent_debit):
+            call_command("reconcile_wallets", "--sync", stdout=out)
+
+        self.assertIn("0 sincronizadas, 1 alteradas", out.getvalue())
+        self.assertEqual(UserWallet.objects.get(pk=self.wallet.pk).balance, 97)
+
+    def test_open_adopts_stored_balance(self):
+        UserWallet.objects.filter(pk=self.wallet.pk).update(balance=42)
+
+        call_command("reconcile_wallets", "--open", stdout=StringIO())
+
+        self.assertEqual(WalletLedgerService.balance(self.wallet.pk), 42)
+
+
+@override_settings(MERCADO_PAGO_WEBHOOK_SECRET="segredo")
+class MercadoPagoWebhookTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.user = User.objects.create_user("leo", "leo@test.com", "123")
+        self.wallet = UserWallet.objects.get(user=self.user)
+        self.sdk = FakeMercadoPagoSDK()
+
+        cache.clear()
+        patcher = patch.object(
+            PaymentGatewayService, "client", return_value=MercadoPagoService(self.sdk)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = patch.object(process_webhook_event, "delay", side_effect=process_webhook_event)
+        self.delay = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _post(self, resource_id, topic="payment", signed=True):
+        headers = {"HTTP_X_REQUEST_ID": "req-1"}
+        if signed:
+            manifest = f"id:{resource_id};request-id:req-1;ts:1700000000;"
+            digest = hmac.new(b"segredo", manifest.encode(), hashlib.sha256).hexdigest()
+            headers["HTTP_X_SIGNATURE"] = f"ts=1700000000,v1={digest}"
+
+        return self.client.post(
+            f"{reverse('mp_webhook')}?data.id={resource_id}&type={topic}",
+            data=json.dumps({"type": topic, "data": {"id": resource_id}}),
+            content_type="application/json",
+            **headers,
+        )
+
+    def test_webhook_only_persists_and_acks(self):
+        self.sdk.add_payment(101, user_id=str(self.user.pk), type="credits", amount="10")
+
+        with patch.object(process_webhook_event, "delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self._post("101")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"status": "received"})
+        self.assertEqual(self.sdk.calls, [])
+        delay.assert_called_once()
+        self.assertEqual(WebhookEvent.objects.get().status, WebhookEvent.Status.RECEIVED)
+
+    def test_unsigned_webhook_is_ignored(self):
+        response = self._post("101", signed=False)
+
+        self.assertEqual(response.json(), {"status": "ignored"})
+        self.assertFalse(WebhookEvent.objects.exists())
+
+    def test_credits_are_applied_once_for_duplicate_notifications(self):
+        self.sdk.add_payment(102, user_id=str(self.user.pk), type="credits", amount="10")
+
+        for _ in range(3):
+            with self.captureOnCommitCallbacks(execute=True):
+                self._post("102")
+
+        event = WebhookEvent.objects.get()
+        self.assertEqual(event.status, WebhookEvent.Status.PROCESSED)
+        self.assertEqual(self.sdk.calls, ["102"])
+        self.assertEqual(
+            WalletTransaction.objects.filter(external_reference="102").count(), 1
+        )
+        self.assertEqual(UserWallet.objects.get(pk=self.wallet.pk).balance, 10)
+
+    def test_pending_payment_is_reprocessed_on_next_notification(self):
+        self.sdk.add_payment(103, status="pending", user_id=str(self.user.pk), type="credits", amount="5")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._post("103")
+        self.assertEqual(WebhookEvent.objects.get().status, WebhookEvent.Status.WAITING)
+
+        self.sdk.payments["103"]["status"] = "approved"
+        with self.captureOnCommitCallbacks(execute=True):
+            self._post("103")
+
+        self.assertEqual(WebhookEvent.objects.get().status, WebhookEvent.Status.PROCESSED)
+        self.assertEqual(UserWallet.objects.get(pk=self.wallet.pk).balance, 5)
+
+    def test_merchant_order_fans_out_to_payments(self):
+        plan = Plan.objects.create(name="Pro")
+        self.sdk.add_payment(104, user_id=str(self.user.pk), type="plan", plan_id=str(plan.pk))
+        self.sdk.add_merchant_order(900, 104)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._post("900", topic="merchant_order")
+
+        self.assertEqual(
+            set(WebhookEvent.objects.values_list("topic", "status")),
+            {
+                (WebhookEvent.Topic.MERCHANT_ORDER, WebhookEvent.Status.PROCESSED),
+                (WebhookEvent.Topic.PAYMENT, WebhookEvent.Status.PROCESSED),
+            },
+        )
+        self.assertEqual(self.user.active_subscription.plan, plan)
+
+    @override_settings(WEBHOOK_RETRY_DELAY=0)
+    def test_provider_failure_is_retried_by_drain(self):
+        self.sdk.add_payment(105, user_id=str(self.user.pk), type="credits", amount="7")
+        self.sdk.fail = True
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._post("105")
+
+        event = WebhookEvent.objects.get()
+        self.assertEqual(event.status, WebhookEvent.Status.FAILED)
+        self.assertIn("500", event.last_error)
+
+        self.sdk.fail = False
+        self.assertEqual(WebhookInboxService.drain(), 1)
+
+        event.refresh_from_db()
+        self.assertEqual(event.status, WebhookEvent.Status.PROCESSED)
+        self.assertEqual(event.attempts, 2)
+        self.assertEqual(UserWallet.objects.get(pk=self.wallet.pk).balance, 7)
+
+
+class PaymentGatewayServiceTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        cache.clear()
+        PaymentGatewayService.reset()
+        self.addCleanup(PaymentGatewayService.reset)
+
+    def test_client_is_shared_and_pools_connections(self):
+        client = PaymentGatewayService.client()
+
+        self.assertIs(PaymentGatewayService.client(), client)
+        self.assertIsInstance(client.sdk.http_client, PooledHttpClient)
+
+        http_client = client.sdk.http_client
+        response = Mock(status_code=200, content=b"{}", json=Mock(return_value={"id": 1}))
+
+        with patch.object(http_client.session, "request", return_value=response) as request:
+            client.sdk.payment().get(1)
+            client.sdk.payment().get(2)
+
+        self.assertEqual(request.call_count, 2)
+        self.assertEqual(request.call_args.kwargs["timeout"], http_client.timeout)
+
+    def test_status_api_and_webhook_share_payment_cache(self):
+        sdk = FakeMercadoPagoSDK()
+        sdk.add_payment(201, status="pending")
+
+        with patch.object(PaymentGatewayService, "client", return_value=MercadoPagoService(sdk)):
+            for _ in range(3):
+                response = self.client.get(reverse("payment_status_api"), {"payment_id": "201"})
+                self.assertEqual(response.json(), {"status": "pending"})
+
+            self.assertEqual(sdk.calls, ["201"])
+
+            sdk.payments["201"]["status"] = "approved"
+            PaymentGatewayService.get_payment("201", fresh=True)
+
+            response = self.client.get(reverse("payment_status_api"), {"payment_id": "201"})
+
+        self.assertEqual(response.json(), {"status": "approved"})
+        self.assertEqual(sdk.calls, ["201", "201"])
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    PAYMENT_STATUS_STREAM_TIMEOUT=5,
+)
+class PaymentStatusEventTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.user = User.objects.create_user("ana", "ana@test.com", "123")
+        self.sdk = FakeMercadoPagoSDK()
+
+        cache.clear()
+        patcher = patch.object(
+            PaymentGatewayService, "client", return_value=MercadoPagoService(self.sdk)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = patch.object(process_webhook_event, "delay", side_effect=process_webhook_event)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _notify(self, payment_id):
+        with self.captureOnCommitCallbacks(execute=True):
+            WebhookInboxService.receive(WebhookEvent.Topic.PAYMENT, payment_id, {})
+
+    async def _connect(self, payment_id):
+        communicator = WebsocketCommunicator(
+            PaymentStatusConsumer.as_asgi(), f"/ws/billing/payments/{payment_id}/"
+        )
+        communicator.scope["user"] = self.user
+        communicator.scope["url_route"] = {"kwargs": {"payment_id": payment_id}}
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    def test_webhook_pushes_status_after_credits_are_applied(self):
+        self.sdk.add_payment(301, user_id=str(self.user.pk), type="credits", amount="10")
+
+        async def scenario():
+            communicator = await self._connect("301")
+            self.assertTrue(await communicator.receive_nothing())
+
+            await sync_to_async(self._notify)("301")
+
+            message = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return message
+
+        message = async_to_sync(scenario)()
+
+        self.assertEqual(message, {"payment_id": "301", "status": "approved"})
+        self.assertEqual(UserWallet.objects.get(user=self.user).balance, 10)
+
+    def test_late_connection_receives_last_status(self):
+        self.sdk.add_payment(302, status="pending", user_id=str(self.user.pk), type="credits", amount="5")
+        self._notify("302")
+
+        async def scenario():
+            communicator = await self._connect("302")
+            message = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return message
+
+        self.assertEqual(async_to_sync(scenario)(), {"payment_id": "302", "status": "pending"})
+        self.assertIsNone(PaymentStatusEventService.last_status("302", uuid4()))
+
+    def test_event_stream_ends_on_final_status(self):
+        self.sdk.add_payment(303, status="pending", user_id=str(self.user.pk), type="credits", amount="5")
+        self._notify("303")
+
+        async def scenario():
+            stream = PaymentStatusStreamView.stream(self.user.pk, "303")
+            events = [await anext(stream)]
+
+            self.sdk.payments["303"]["status"] = "approved"
+            await sync_to_async(self._notify)("303")
+
+            events += [event async for event in stream]
+            return events
+
+        events = async_to_sync(scenario)()
+
+        self.assertEqual(events[0], 'data: {"payment_id": "303", "status": "pending"}\n\n')
+        self.assertEqual(events[-1], 'data: {"payment_id": "303", "status": "approved"}\n\n')
+
+    def test_event_stream_requires_authentication(self):
+        response = self.client.get(reverse("payment_status_events"), {"payment_id": "304"})
+
+        self.assertEqual(response.status_code, 401)
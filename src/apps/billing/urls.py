@@ -5,6 +5,7 @@ from apps.billing.views import (
     PaymentFailureView,
     PaymentPendingView,
     PaymentStatusAPI,
+    PaymentStatusStreamView,
     PaymentSuccessView,
     WalletPageView,
 )
@@ -27,4 +28,5 @@ urlpatterns = [
          PaymentPendingView.as_view(), name='payment_pending'),
 
     path("payment/status/", PaymentStatusAPI.as_view(), name="payment_status_api"),
+    path("payment/events/", PaymentStatusStreamView.as_view(), name="payment_status_events"),
 ]
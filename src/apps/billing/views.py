@@ -1,10 +1,13 @@
+import asyncio
+import json
 import logging
 
-import mercadopago
+from asgiref.sync import sync_to_async
+from channels.layers import get_channel_layer
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.paginator import Paginator
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse
 from django.views import View
@@ -13,7 +16,9 @@ from django.views.generic import TemplateView
 from apps.billing.domain import Pricing
 from apps.billing.dto import CheckoutPreferenceDTO
 from apps.billing.models import Plan, UserWallet, WalletTransaction
-from apps.billing.services.mp_service import MercadoPagoService
+from apps.billing.services.balance_service import WalletBalanceService
+from apps.billing.services.gateway_service import PaymentGatewayService
+from apps.billing.services.payment_events_service import PaymentStatusEventService
 
 logger = logging.getLogger(__name__)
 
@@ -27,8 +32,7 @@ class BuyCoinsView(LoginRequiredMixin, View):
         logger.info(
             f"[COMPRA INICIADA] User={request.user.id} Credits={credit_amount}")
 
-        sdk = mercadopago.SDK(settings.MERCADO_PAGO_ACCESS_TOKEN)
-        mp_service = MercadoPagoService(sdk)
+        mp_service = PaymentGatewayService.client()
 
         if not price:
             return redirect("payment_failure")
@@ -129,7 +133,7 @@ class WalletPageView(View):
         active_plan = active_subscription.plan if active_subscription else None
 
         logger.debug(
-            f"Usuário {request.user.id} possui {wallet.balance} coins e {transactions.count()} transações."
+            f"Usuário {request.user.id} possui {WalletBalanceService.get(request.user.id)} coins e {transactions.count()} transações."
         )
         return render(
             request,
@@ -181,9 +185,7 @@ class PaymentStatusAPI(View):
             f"[STATUS API] Consulta de status | payment_id={payment_id}")
 
         try:
-            sdk = mercadopago.SDK(settings.MERCADO_PAGO_ACCESS_TOKEN)
-            payment_info = sdk.payment().get(payment_id)
-            response = payment_info.get("response", {})
+            response = PaymentGatewayService.get_payment(payment_id)
         except Exception as e:
             logger.error(f"[STATUS API] Erro ao consultar MP: {e}")
             return JsonResponse({"status": "unknown"}, status=500)
@@ -196,3 +198,65 @@ class PaymentStatusAPI(View):
             return JsonResponse({"status": "approved"})
 
         return JsonResponse({"status": status or "unknown"})
+
+
+class PaymentStatusStreamView(View):
+    FINAL_STATUSES = ("approved", "rejected", "cancelled", "refunded", "charged_back")
+
+    async def get(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return JsonResponse({"error": "authentication_required"}, status=401)
+
+        payment_id = request.GET.get("payment_id")
+        if not payment_id:
+            return JsonResponse({"error": "payment_id_required"}, status=400)
+
+        response = StreamingHttpResponse(
+            self.stream(user.pk, payment_id), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    @staticmethod
+    def _event(payment_id, status) -> str:
+        return f"data: {json.dumps({'payment_id': payment_id, 'status': status})}\n\n"
+
+    @classmethod
+    async def stream(cls, user_id, payment_id):
+        layer = get_channel_layer()
+        channel = await layer.new_channel()
+        group = PaymentStatusEventService.group_name(user_id)
+        # Entra no grupo antes de ler o último status: um push entre as duas etapas não se perde.
+        await layer.group_add(group, channel)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + getattr(settings, "PAYMENT_STATUS_STREAM_TIMEOUT", 60)
+        heartbeat = getattr(settings, "PAYMENT_STATUS_HEARTBEAT", 15)
+
+        try:
+            status = await sync_to_async(PaymentStatusEventService.last_status)(payment_id, user_id)
+            if status:
+                yield cls._event(payment_id, status)
+                if status in cls.FINAL_STATUSES:
+                    return
+
+            # Ao encerrar, o EventSource reconecta sozinho; a conexão não fica presa indefinidamente.
+            while (remaining := deadline - loop.time()) > 0:
+                try:
+                    message = await asyncio.wait_for(
+                        layer.receive(channel), timeout=min(heartbeat, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                if message.get("payment_id") != payment_id:
+                    continue
+
+                yield cls._event(payment_id, message["status"])
+                if message["status"] in cls.FINAL_STATUSES:
+                    return
+        finally:
+            await layer.group_discard(group, channel)
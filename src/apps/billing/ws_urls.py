@@ -0,0 +1,7 @@
+from django.urls import path
+
+from apps.billing.consumers import PaymentStatusConsumer
+
+websocket_urlpatterns = [
+    path("ws/billing/payments/<str:payment_id>/", PaymentStatusConsumer.as_asgi()),
+]
@@ -0,0 +1,33 @@
+import re
+
+from django.db import connection
+
+INDEX_PATTERNS = {
+    "sqlite": r"(?:USING (?:COVERING )?INDEX|USING INTEGER PRIMARY KEY) {name}",
+    "postgresql": r"(?:Index (?:Only )?Scan using|Bitmap Index Scan on) {name}",
+}
+
+
+class QueryPlanAssertionsMixin:
+    """
+    Asserções sobre o EXPLAIN do banco de testes.
+    """
+
+    def explain(self, queryset) -> str:
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        return queryset.explain()
+
+    def assertUsesIndex(self, queryset, index_name=None):
+        plan = self.explain(queryset)
+        pattern = INDEX_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            self.skipTest(f"EXPLAIN não suportado para {connection.vendor}")
+
+        name = re.escape(index_name) if index_name else r"\S+"
+        self.assertRegex(
+            plan,
+            pattern.format(name=name),
+            f"Plano não usa o índice {index_name or ''}:\n{plan}",
+        )
@@ -0,0 +1,41 @@
+class FakeMercadoPagoResource:
+    def __init__(self, provider, store):
+        self.provider = provider
+        self.store = store
+
+    def get(self, resource_id):
+        self.provider.calls.append(str(resource_id))
+        if self.provider.fail:
+            return {"status": 500, "response": {"message": "internal_error"}}
+
+        response = self.store.get(str(resource_id))
+        if response is None:
+            return {"status": 404, "response": {"message": "not_found"}}
+        return {"status": 200, "response": response}
+
+
+class FakeMercadoPagoSDK:
+    """
+    Provedor local com a interface do SDK usada pelo billing (payment/merchant_order).
+    """
+
+    def __init__(self):
+        self.payments = {}
+        self.merchant_orders = {}
+        self.calls = []
+        self.fail = False
+
+    def add_payment(self, payment_id, status="approved", **metadata):
+        self.payments[str(payment_id)] = {"id": payment_id, "status": status, "metadata": metadata}
+
+    def add_merchant_order(self, merchant_order_id, *payment_ids):
+        self.merchant_orders[str(merchant_order_id)] = {
+            "id": merchant_order_id,
+            "payments": [{"id": payment_id} for payment_id in payment_ids],
+        }
+
+    def payment(self):
+        return FakeMercadoPagoResource(self, self.payments)
+
+    def merchant_order(self):
+        return FakeMercadoPagoResource(self, self.merchant_orders)
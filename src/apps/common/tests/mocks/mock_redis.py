@@ -0,0 +1,178 @@
+class MockRedisPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self.commands.append((name, args, kwargs))
+            return self
+
+        return command
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.commands = []
+
+    def execute(self):
+        results = [
+            getattr(self.client, name)(*args, **kwargs)
+            for name, args, kwargs in self.commands
+        ]
+        self.commands = []
+        return results
+
+
+class MockRedis:
+    """
+    Mock em memória com o subconjunto de comandos Redis usado pelos serviços.
+    """
+
+    def __init__(self):
+        self.data = {}
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, bytes):
+            return value
+        return str(value).encode()
+
+    def pipeline(self, transaction=True):
+        return MockRedisPipeline(self)
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = self._encode(value)
+        return True
+
+    def setex(self, key, seconds, value):
+        return self.set(key, value)
+
+    def delete(self, *keys):
+        return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    def exists(self, *keys):
+        return sum(1 for key in keys if key in self.data)
+
+    def rename(self, source, destination):
+        self.data[destination] = self.data.pop(source)
+        return True
+
+    def setbit(self, key, offset, value):
+        bits = self.data.setdefault(key, set())
+        previous = int(offset in bits)
+        if value:
+            bits.add(offset)
+        else:
+            bits.discard(offset)
+        return previous
+
+    def getbit(self, key, offset):
+        return int(offset in self.data.get(key, set()))
+
+    def expire(self, key, seconds):
+        return key in self.data
+
+    def incrby(self, key, amount=1):
+        value = int(self.data.get(key, 0)) + amount
+        self.data[key] = self._encode(value)
+        return value
+
+    def incr(self, key, amount=1):
+        return self.incrby(key, amount)
+
+    def decrby(self, key, amount=1):
+        return self.incrby(key, -amount)
+
+    def rpush(self, key, *values):
+        items = self.data.setdefault(key, [])
+        items.extend(self._encode(value) for value in values)
+        return len(items)
+
+    def lpush(self, key, *values):
+        items = self.data.setdefault(key, [])
+        for value in values:
+            items.insert(0, self._encode(value))
+        return len(items)
+
+    def lpop(self, key, count=None):
+        items = self.data.get(key, [])
+        if not items:
+            return None
+        if count is None:
+            return items.pop(0)
+        popped, self.data[key] = items[:count], items[count:]
+        return popped
+
+    def lmove(self, source, destination, src="LEFT", dest="RIGHT"):
+        items = self.data.get(source, [])
+        if not items:
+            return None
+        item = items.pop(0 if src == "LEFT" else -1)
+        target = self.data.setdefault(destination, [])
+        target.insert(0 if dest == "LEFT" else len(target), item)
+        return item
+
+    def lrange(self, key, start, end):
+        items = self.data.get(key, [])
+        return items[start:] if end == -1 else items[start:end + 1]
+
+    def llen(self, key):
+        return len(self.data.get(key, []))
+
+    def lindex(self, key, index):
+        items = self.data.get(key, [])
+        try:
+            return items[index]
+        except IndexError:
+            return None
+
+    def hset(self, key, field, value):
+        items = self.data.setdefault(key, {})
+        created = self._encode(field) not in items
+        items[self._encode(field)] = self._encode(value)
+        return int(created)
+
+    def hget(self, key, field):
+        return self.data.get(key, {}).get(self._encode(field))
+
+    def hincrby(self, key, field, amount=1):
+        items = self.data.setdefault(key, {})
+        value = int(items.get(self._encode(field), 0)) + amount
+        items[self._encode(field)] = self._encode(value)
+        return value
+
+    def hincrbyfloat(self, key, field, amount=1.0):
+        items = self.data.setdefault(key, {})
+        value = float(items.get(self._encode(field), 0)) + amount
+        items[self._encode(field)] = self._encode(value)
+        return value
+
+    def zadd(self, key, mapping, gt=False):
+        items = self.data.setdefault(key, {})
+        added = 0
+        for member, score in mapping.items():
+            member = self._encode(member)
+            if member not in items:
+                added += 1
+            elif gt and score <= items[member]:
+                continue
+            items[member] = float(score)
+        return added
+
+    def zrange(self, key, start, end, withscores=False):
+        items = sorted(self.data.get(key, {}).items(), key=lambda item: item[1])
+        items = items[start:] if end == -1 else items[start:end + 1]
+        return items if withscores else [member for member, _ in items]
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def hscan_iter(self, key, match=None, count=None):
+        yield from list(self.data.get(key, {}).items())
@@ -75,7 +75,7 @@ class UrlAdmin(admin.ModelAdmin):
 
     @admin.display(description=_("Acessos"))
     def get_access_count(self, obj):
-        count = obj.accessevent_set.count()
+        count = obj.click_count
         if count > 0:
             url = f"/admin/converter/accessevent/?url__id__exact={obj.id}"
             return format_html('<a href="{}">{} acessos</a>', url, count)
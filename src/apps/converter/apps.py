@@ -5,3 +5,7 @@ class ConverterConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.converter'
     label = 'converter'
+
+    def ready(self):
+        import apps.converter.checks
+        import apps.converter.signals
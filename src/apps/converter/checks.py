@@ -0,0 +1,20 @@
+from django.core.checks import Error, register
+
+
+@register()
+def short_code_length_check(app_configs, **kwargs):
+    from apps.converter.services.shortening_service import ShortCodeService
+
+    min_length = ShortCodeService.min_length()
+    max_length = ShortCodeService.max_length()
+
+    if min_length > max_length:
+        return [
+            Error(
+                f"SHORT_CODE_MIN_LENGTH ({min_length}) excede o tamanho de Url.short_code ({max_length}).",
+                hint="Reduza DJANGO_SHORT_CODE_MIN_LENGTH ou aumente max_length do campo short_code.",
+                id="converter.E001",
+            )
+        ]
+
+    return []
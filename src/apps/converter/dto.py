@@ -0,0 +1,8 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class BulkUrlItemDTO:
+    original_url: str
+    is_direct: bool = False
+    is_permanent: bool = False
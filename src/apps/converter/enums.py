@@ -16,4 +16,6 @@ class AnonymousLimitExceeded(Exception):
     pass
 
 
-ANONYMOUS_DAILY_LIMIT = 3
\ No newline at end of file
+ANONYMOUS_DAILY_LIMIT = 3
+
+URL_EXPIRATION_DAYS = 7
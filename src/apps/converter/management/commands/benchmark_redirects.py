@@ -0,0 +1,109 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.converter.models import Url
+from apps.converter.services.edge_service import EdgeRedirectMapService
+
+
+class NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Command(BaseCommand):
+    help = "Mede a latência dos redirecionamentos em um ou mais alvos (ex.: nginx, gunicorn e daphne)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            help="nome=url_base, ex.: edge=http://localhost:8080 (pode repetir)",
+        )
+        parser.add_argument("--codes", nargs="*", default=[])
+        parser.add_argument("--sample", type=int, default=100)
+        parser.add_argument(
+            "--all-links",
+            action="store_true",
+            help="Inclui links com página intermediária na amostra (não servidos pelo nginx)",
+        )
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=10)
+        parser.add_argument("--host", default=None, help="Cabeçalho Host enviado nas requisições")
+
+    def handle(self, *args, **options):
+        targets = []
+        for value in options["target"]:
+            name, _, base_url = value.partition("=")
+            if not base_url:
+                raise CommandError(f"Alvo inválido: {value}")
+            targets.append((name, base_url.rstrip("/")))
+
+        links = (
+            Url.objects.filter(metadata__isnull=False)
+            if options["all_links"]
+            else EdgeRedirectMapService.active_redirects()
+        )
+        codes = options["codes"] or list(
+            links.values_list("short_code", flat=True)[: options["sample"]]
+        )
+        if not codes:
+            raise CommandError("Nenhum link ativo para o benchmark.")
+
+        opener = urllib.request.build_opener(NoRedirectHandler)
+        headers = {"Host": options["host"]} if options["host"] else {}
+
+        for name, base_url in targets:
+            paths = list(islice(cycle(codes), options["requests"]))
+            latencies, errors, elapsed = self._run(
+                opener, base_url, headers, paths, options["concurrency"]
+            )
+            self._report(name, latencies, errors, elapsed)
+
+    @staticmethod
+    def _request(opener, url, headers):
+        request = urllib.request.Request(url, headers=headers)
+        started = time.perf_counter()
+        try:
+            with opener.open(request, timeout=10) as response:
+                status = response.status
+        except urllib.error.HTTPError as error:
+            status = error.code
+        except OSError:
+            return None
+        return time.perf_counter() - started if status < 400 else None
+
+    def _run(self, opener, base_url, headers, codes, concurrency):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(
+                executor.map(
+                    lambda code: self._request(opener, f"{base_url}/{code}/", headers),
+                    codes,
+                )
+            )
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(result for result in results if result is not None)
+        return latencies, len(results) - len(latencies), elapsed
+
+    def _report(self, name, latencies, errors, elapsed):
+        if not latencies:
+            self.stdout.write(self.style.ERROR(f"{name}: nenhuma resposta válida ({errors} erros)"))
+            return
+
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        self.stdout.write(
+            f"{name}: requests={len(latencies)} errors={errors} "
+            f"rps={len(latencies) / elapsed:.1f} "
+            f"mean={statistics.mean(latencies) * 1000:.2f}ms "
+            f"p50={quantiles[49] * 1000:.2f}ms "
+            f"p95={quantiles[94] * 1000:.2f}ms "
+            f"p99={quantiles[98] * 1000:.2f}ms"
+        )
@@ -0,0 +1,46 @@
+import random
+import string
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.converter.models import Url
+from apps.converter.services.shortening_service import ShortCodeService
+
+
+class Command(BaseCommand):
+    help = "Compara a validação via Hashids com a consulta ao índice de short_code para códigos inválidos e válidos."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        iterations = options["iterations"]
+
+        malformed = [
+            "".join(rng.choices(string.ascii_letters + string.digits, k=rng.randint(4, 8)))
+            for _ in range(iterations)
+        ]
+        valid = list(Url.objects.values_list("short_code", flat=True)[:iterations]) or [
+            ShortCodeService.encode(rng.randint(1, 10**6)) for _ in range(iterations)
+        ]
+
+        for label, codes in (("malformed", malformed), ("valid", valid)):
+            self._report(f"{label}/decode", codes, ShortCodeService.is_valid)
+            self._report(
+                f"{label}/index",
+                codes,
+                lambda code: Url.objects.filter(short_code=code).exists(),
+            )
+
+    def _report(self, label, codes, func):
+        started = time.perf_counter()
+        matches = sum(1 for code in codes if func(code))
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{label}: {len(codes)} códigos, {elapsed / len(codes) * 1_000_000:.1f}µs/código, "
+            f"{matches} aceitos"
+        )
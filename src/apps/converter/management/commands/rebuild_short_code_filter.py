@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from apps.converter.services.bloom_service import ShortCodeBloomFilterService
+
+
+class Command(BaseCommand):
+    help = "Reconstrói o filtro de Bloom de códigos curtos a partir de Url e exibe suas métricas."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--stats", action="store_true", help="Apenas exibe as métricas atuais")
+
+    def handle(self, *args, **options):
+        if not options["stats"]:
+            added = ShortCodeBloomFilterService.rebuild()
+            self.stdout.write(self.style.SUCCESS(f"{added} códigos adicionados ao filtro"))
+
+        for key, value in ShortCodeBloomFilterService.stats().items():
+            self.stdout.write(f"{key}: {value}")
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.converter.services.click_counter_service import ClickCounterService
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula click_count e last_clicked_at de cada Url: AccessEvent dentro da janela "
+        "de retenção e ClickRollup para os dias anteriores."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        reconciled = ClickCounterService.reconcile(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{reconciled} URLs reconciliadas"))
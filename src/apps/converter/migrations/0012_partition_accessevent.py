@@ -0,0 +1,182 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:24
+
+from datetime import datetime, time
+
+from django.conf import settings
+from django.db import migrations, models, transaction
+
+TABLE = "converter_accessevent"
+LEGACY = "converter_accessevent_legacy"
+BATCH_SIZE = 10000
+FOREIGN_KEYS = ("url", "created_by", "updated_by")
+
+
+def _add_months(month, count):
+    index = month.month - 1 + count
+    return month.replace(year=month.year + index // 12, month=index % 12 + 1, day=1)
+
+
+def _bound(month):
+    from django.utils import timezone
+
+    return timezone.make_aware(datetime.combine(month, time.min)).isoformat()
+
+
+def _foreign_keys(apps, schema_editor):
+    q = schema_editor.quote_name
+    Url = apps.get_model("converter", "Url")
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+
+    return [
+        f"ALTER TABLE {q(TABLE)} ADD CONSTRAINT {q(f'{TABLE}_{column}_fk')} "
+        f"FOREIGN KEY ({q(column)}) REFERENCES {q(target)} (id) DEFERRABLE INITIALLY DEFERRED"
+        for column, target in (
+            ("url_id", Url._meta.db_table),
+            ("created_by_id", User._meta.db_table),
+            ("updated_by_id", User._meta.db_table),
+        )
+    ]
+
+
+def _foreign_key_indexes(apps, schema_editor):
+    # Mesmos nomes que o Django gerou para os índices das FKs, mantendo o estado das migrações
+    AccessEvent = apps.get_model("converter", "AccessEvent")
+
+    for name in FOREIGN_KEYS:
+        for statement in schema_editor._field_indexes_sql(AccessEvent, AccessEvent._meta.get_field(name)):
+            schema_editor.execute(statement)
+
+
+def _drop_indexes(schema_editor, table):
+    # Libera os nomes dos índices antes de recriá-los na tabela nova
+    q = schema_editor.quote_name
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT indexname FROM pg_indexes WHERE tablename = %s AND indexname <> %s",
+            [table, f"{table}_pkey"],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    for name in names:
+        schema_editor.execute(f"DROP INDEX {q(name)}")
+
+
+def _move_rows(schema_editor, source, target):
+    # Cada lote em sua própria transação: o redirect só espera pelo lote corrente
+    q = schema_editor.quote_name
+    connection = schema_editor.connection
+
+    while True:
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {q(source)} WHERE id IN "
+                f"(SELECT id FROM {q(source)} LIMIT %s) RETURNING *) "
+                f"INSERT INTO {q(target)} SELECT * FROM moved",
+                [BATCH_SIZE],
+            )
+            if cursor.rowcount < BATCH_SIZE:
+                break
+
+    schema_editor.execute(f"DROP TABLE {q(source)} CASCADE")
+
+
+def forwards(apps, schema_editor):
+    AccessEvent = apps.get_model("converter", "AccessEvent")
+
+    if schema_editor.connection.vendor != "postgresql":
+        for index in AccessEvent._meta.indexes:
+            schema_editor.add_index(AccessEvent, index)
+        return
+
+    from django.utils import timezone
+
+    q = schema_editor.quote_name
+
+    with transaction.atomic(using=schema_editor.connection.alias):
+        schema_editor.execute(f"ALTER TABLE {q(TABLE)} RENAME TO {q(LEGACY)}")
+        schema_editor.execute(
+            f"ALTER TABLE {q(LEGACY)} RENAME CONSTRAINT {q(f'{TABLE}_pkey')} TO {q(f'{LEGACY}_pkey')}"
+        )
+        _drop_indexes(schema_editor, LEGACY)
+        schema_editor.execute(
+            f"CREATE TABLE {q(TABLE)} (LIKE {q(LEGACY)} INCLUDING DEFAULTS) "
+            f"PARTITION BY RANGE (created_at)"
+        )
+        schema_editor.execute(f"ALTER TABLE {q(TABLE)} ADD PRIMARY KEY (id, created_at)")
+        for statement in _foreign_keys(apps, schema_editor):
+            schema_editor.execute(statement)
+        _foreign_key_indexes(apps, schema_editor)
+        for index in AccessEvent._meta.indexes:
+            schema_editor.add_index(AccessEvent, index)
+        schema_editor.execute(f"CREATE TABLE {q(f'{TABLE}_default')} PARTITION OF {q(TABLE)} DEFAULT")
+
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(f"SELECT MIN(created_at) FROM {q(LEGACY)}")
+            oldest = cursor.fetchone()[0] or timezone.now()
+
+        month = timezone.localdate(oldest).replace(day=1)
+        last = _add_months(timezone.localdate().replace(day=1), 3)
+
+        while month <= last:
+            following = _add_months(month, 1)
+            schema_editor.execute(
+                f"CREATE TABLE {q(f'{TABLE}_p{month:%Y%m}')} PARTITION OF {q(TABLE)} "
+                f"FOR VALUES FROM ('{_bound(month)}') TO ('{_bound(following)}')"
+            )
+            month = following
+
+    _move_rows(schema_editor, LEGACY, TABLE)
+
+
+def backwards(apps, schema_editor):
+    AccessEvent = apps.get_model("converter", "AccessEvent")
+
+    if schema_editor.connection.vendor != "postgresql":
+        for index in AccessEvent._meta.indexes:
+            schema_editor.remove_index(AccessEvent, index)
+        return
+
+    q = schema_editor.quote_name
+
+    with transaction.atomic(using=schema_editor.connection.alias):
+        schema_editor.execute(f"ALTER TABLE {q(TABLE)} RENAME TO {q(LEGACY)}")
+        schema_editor.execute(
+            f"ALTER TABLE {q(LEGACY)} RENAME CONSTRAINT {q(f'{TABLE}_pkey')} TO {q(f'{LEGACY}_pkey')}"
+        )
+        for column in ("url_id", "created_by_id", "updated_by_id"):
+            schema_editor.execute(
+                f"ALTER TABLE {q(LEGACY)} RENAME CONSTRAINT {q(f'{TABLE}_{column}_fk')} "
+                f"TO {q(f'{LEGACY}_{column}_fk')}"
+            )
+        _drop_indexes(schema_editor, LEGACY)
+        schema_editor.execute(f"CREATE TABLE {q(TABLE)} (LIKE {q(LEGACY)} INCLUDING DEFAULTS)")
+        schema_editor.execute(f"ALTER TABLE {q(TABLE)} ADD PRIMARY KEY (id)")
+        for statement in _foreign_keys(apps, schema_editor):
+            schema_editor.execute(statement)
+        _foreign_key_indexes(apps, schema_editor)
+
+    _move_rows(schema_editor, LEGACY, TABLE)
+
+
+class Migration(migrations.Migration):
+    # A cópia do histórico roda em lotes, fora da transação que troca as tabelas
+    atomic = False
+
+    dependencies = [
+        ('converter', '0011_url_click_count'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # O índice é criado em forwards, antes da cópia, direto na tabela particionada
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='accessevent',
+                    index=models.Index(fields=['url', 'created_at'], name='converter_a_url_id_eb27bb_idx'),
+                ),
+            ],
+        ),
+        migrations.RunPython(forwards, backwards),
+    ]
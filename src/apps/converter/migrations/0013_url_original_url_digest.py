@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:27
+
+from django.conf import settings
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_digests(apps, schema_editor):
+    Url = apps.get_model("converter", "Url")
+
+    batch = []
+    for url in Url.objects.only("id", "original_url").iterator(chunk_size=2000):
+        url.original_url_digest = hashlib.sha256(url.original_url.encode()).hexdigest()
+        batch.append(url)
+
+        if len(batch) >= 2000:
+            Url.objects.bulk_update(batch, ["original_url_digest"])
+            batch = []
+
+    if batch:
+        Url.objects.bulk_update(batch, ["original_url_digest"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('converter', '0012_partition_accessevent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='url',
+            name='original_url_digest',
+            field=models.CharField(default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(backfill_digests, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='url',
+            index=models.Index(fields=['created_by', 'original_url_digest'], name='url_owner_digest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='url',
+            index=models.Index(condition=models.Q(('created_by__isnull', True)), fields=['created_by_ip', 'original_url_digest'], name='url_anon_digest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='url',
+            index=models.Index(condition=models.Q(('created_by__isnull', True)), fields=['created_by_ip', 'created_at'], name='url_anon_created_idx'),
+        ),
+    ]
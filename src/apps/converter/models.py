@@ -1,3 +1,4 @@
+import hashlib
 from datetime import timedelta
 
 from django.core.validators import URLValidator
@@ -5,6 +6,7 @@ from django.db import models
 from django.utils import timezone
 
 from apps.common.models import BaseModelAbstract
+from apps.converter.enums import URL_EXPIRATION_DAYS
 from apps.converter.utils import ShortCodeGenerator
 
 short_code_generator: ShortCodeGenerator = ShortCodeGenerator(length=8)
@@ -16,6 +18,13 @@ class UrlSequence(models.Model):
     class Meta:
         db_table = "url_sequence"
 
+
+class EdgeLogCursor(models.Model):
+    path = models.CharField(max_length=255, unique=True)
+    inode = models.BigIntegerField(default=0)
+    offset = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
 class Url(BaseModelAbstract):
     original_url = models.URLField(
         max_length=4096,
@@ -33,6 +42,34 @@ class Url(BaseModelAbstract):
         blank=True
     )
 
+    original_url_digest = models.CharField(max_length=64, editable=False, default="")
+
+    click_count = models.PositiveBigIntegerField(default=0, editable=False)
+    last_clicked_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_by", "click_count"]),
+            models.Index(
+                fields=["created_by", "original_url_digest"],
+                name="url_owner_digest_idx",
+            ),
+            models.Index(
+                fields=["created_by_ip", "original_url_digest"],
+                condition=models.Q(created_by__isnull=True),
+                name="url_anon_digest_idx",
+            ),
+            models.Index(
+                fields=["created_by_ip", "created_at"],
+                condition=models.Q(created_by__isnull=True),
+                name="url_anon_created_idx",
+            ),
+        ]
+
+    @staticmethod
+    def digest(original_url: str) -> str:
+        return hashlib.sha256(original_url.encode()).hexdigest()
+
     def save(self, *args, **kwargs):
         is_new = self._state.adding
         from apps.converter.services.shortening_service import ShortCodeService, UrlSequenceService
@@ -41,17 +78,29 @@ class Url(BaseModelAbstract):
             sequence = UrlSequenceService.next()
             self.short_code = ShortCodeService.encode(sequence)
 
+        self.original_url_digest = Url.digest(self.original_url)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "original_url" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "original_url_digest"}
+
         super().save(*args, **kwargs)
 
+        if is_new:
+            from apps.converter.services.bloom_service import ShortCodeBloomFilterService
+
+            # Antes do commit: um rollback só deixa um falso positivo, nunca um falso negativo.
+            # bulk_create e migrações de dados não passam aqui e devem chamar add() (ou rebuild).
+            ShortCodeBloomFilterService.add(self.short_code)
+
     def is_expired(self) -> bool:
-        return timezone.now() > self.created_at + timedelta(days=7)
+        return timezone.now() > self.created_at + timedelta(days=URL_EXPIRATION_DAYS)
 
     @property
     def expires_at(self):
         metadata = getattr(self, "metadata", None)
         if metadata and metadata.is_permanent:
             return None
-        return self.created_at + timedelta(days=7)
+        return self.created_at + timedelta(days=URL_EXPIRATION_DAYS)
 
     def __str__(self):
         return f"{self.short_code} -> {self.original_url}"
@@ -80,6 +129,11 @@ class AccessEvent(BaseModelAbstract):
 
     # Extra
     is_bot = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["url", "created_at"]),
+        ]
     
     
 
@@ -0,0 +1,250 @@
+import json
+import logging
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from apps.converter.services.access_event_service import AccessEventService
+from apps.security.services import RedisConnectionService
+
+logger = logging.getLogger(__name__)
+
+
+class AccessEventBufferService:
+    BUFFER_KEY = "converter:access_events:buffer"
+    ENQUEUED_KEY = "converter:access_events:enqueued"
+    FLUSHED_KEY = "converter:access_events:flushed"
+    DROPPED_KEY = "converter:access_events:dropped"
+    AGGREGATE_KEY = "converter:access_events:aggregates"
+    LOCK_TIMEOUT = 300
+
+    @staticmethod
+    def _batch_size() -> int:
+        return getattr(settings, "ACCESS_EVENT_BATCH_SIZE", 500)
+
+    @staticmethod
+    def _max_attempts() -> int:
+        return getattr(settings, "ACCESS_EVENT_FLUSH_MAX_ATTEMPTS", 5)
+
+    @staticmethod
+    def dead_letter_key(key: str) -> str:
+        return f"{key}:dead"
+
+    @staticmethod
+    def _high_watermark() -> int:
+        return getattr(settings, "ACCESS_EVENT_BUFFER_HIGH_WATERMARK", 50000)
+
+    @staticmethod
+    def push(payload: dict) -> bool:
+        try:
+            client = RedisConnectionService.get_redis_client()
+            with client.pipeline() as pipe:
+                pipe.rpush(AccessEventBufferService.BUFFER_KEY, json.dumps(payload))
+                pipe.incr(AccessEventBufferService.ENQUEUED_KEY)
+                depth, _ = pipe.execute()
+        except Exception as e:
+            logger.warning(f"[ACCESS BUFFER] Redis indisponível, gravando direto | error={e}")
+            return False
+
+        if depth % AccessEventBufferService._batch_size() == 0:
+            from apps.converter.tasks import flush_access_events
+
+            flush_access_events.delay()
+
+        if depth > AccessEventBufferService._high_watermark():
+            logger.warning(f"[ACCESS BUFFER] Buffer acima do limite | depth={depth}")
+
+        return True
+
+    @staticmethod
+    def defer_aggregates(payloads: list[dict]) -> bool:
+        try:
+            client = RedisConnectionService.get_redis_client()
+            depth = client.rpush(
+                AccessEventBufferService.AGGREGATE_KEY,
+                *[json.dumps(payload) for payload in payloads],
+            )
+        except Exception as e:
+            logger.warning(f"[ACCESS BUFFER] Redis indisponível, agregando direto | error={e}")
+            return False
+
+        if depth % AccessEventBufferService._batch_size() == 0:
+            from apps.converter.tasks import flush_click_aggregates
+
+            flush_click_aggregates.delay()
+
+        return True
+
+    @staticmethod
+    def _live(payloads: list[dict]) -> list[dict]:
+        from apps.converter.models import Url
+
+        live_ids = {
+            str(url_id)
+            for url_id in Url.objects.filter(
+                id__in={payload["url_id"] for payload in payloads}
+            ).values_list("id", flat=True)
+        }
+        return [payload for payload in payloads if payload["url_id"] in live_ids]
+
+    @staticmethod
+    def _claim(client, key: str, processing: str, count: int) -> list:
+        with client.pipeline() as pipe:
+            for _ in range(count):
+                pipe.lmove(key, processing, "LEFT", "RIGHT")
+            return [item for item in pipe.execute() if item is not None]
+
+    @staticmethod
+    def _drain(key: str, handle, max_batches: int | None = None) -> int:
+        # Itens retirados ficam na lista de processamento até o commit (ack);
+        # o que um worker interrompido deixou lá é reprocessado na próxima execução.
+        client = RedisConnectionService.get_redis_client()
+        lock = f"{key}:lock"
+        processing = f"{key}:processing"
+
+        if not client.set(lock, 1, ex=AccessEventBufferService.LOCK_TIMEOUT, nx=True):
+            return 0
+
+        batch_size = AccessEventBufferService._batch_size()
+        handled = 0
+        batches = 0
+
+        try:
+            while max_batches is None or batches < max_batches:
+                raw_items = client.lrange(processing, 0, -1)
+                recovered = bool(raw_items)
+                if not recovered:
+                    raw_items = AccessEventBufferService._claim(client, key, processing, batch_size)
+                    if not raw_items:
+                        break
+
+                batches += 1
+                client.expire(lock, AccessEventBufferService.LOCK_TIMEOUT)
+                handled += AccessEventBufferService._process(client, key, raw_items, handle)
+
+                if not recovered and len(raw_items) < batch_size:
+                    break
+        finally:
+            client.delete(lock)
+
+        return handled
+
+    @staticmethod
+    def _process(client, key: str, raw_items: list, handle) -> int:
+        payloads = []
+        dead = []
+
+        for item in raw_items:
+            try:
+                payloads.append(json.loads(item))
+            except ValueError:
+                logger.error(f"[ACCESS BUFFER] Item inválido descartado | key={key} item={item[:200]!r}")
+                dead.append(item)
+
+        try:
+            handled = handle(payloads) if payloads else 0
+        except Exception as e:
+            attempts = client.incr(f"{key}:attempts")
+            if attempts < AccessEventBufferService._max_attempts():
+                logger.warning(f"[ACCESS BUFFER] Falha ao gravar lote | key={key} attempts={attempts} error={e}")
+                raise
+
+            # Lote que sempre falha: grava item a item e separa só os que não entram
+            handled = 0
+            for payload in payloads:
+                try:
+                    handled += handle([payload])
+                except Exception:
+                    dead.append(json.dumps(payload))
+
+            logger.error(
+                f"[ACCESS BUFFER] Lote com falhas recorrentes | key={key} dead={len(dead)} error={e}"
+            )
+
+        with client.pipeline() as pipe:
+            if dead:
+                pipe.rpush(AccessEventBufferService.dead_letter_key(key), *dead)
+            pipe.delete(f"{key}:processing", f"{key}:attempts")
+            pipe.execute()
+
+        return handled
+
+    @staticmethod
+    def flush(max_batches: int | None = None) -> int:
+        return AccessEventBufferService._drain(
+            AccessEventBufferService.BUFFER_KEY, AccessEventBufferService._save, max_batches
+        )
+
+    @staticmethod
+    def _save(payloads: list[dict]) -> int:
+        payloads_to_save = AccessEventBufferService._live(payloads)
+        AccessEventService.create_events(payloads_to_save)
+
+        dropped = len(payloads) - len(payloads_to_save)
+        try:
+            client = RedisConnectionService.get_redis_client()
+            with client.pipeline() as pipe:
+                pipe.incrby(AccessEventBufferService.FLUSHED_KEY, len(payloads_to_save))
+                if dropped:
+                    pipe.incrby(AccessEventBufferService.DROPPED_KEY, dropped)
+                pipe.execute()
+        except Exception as e:
+            logger.warning(f"[ACCESS BUFFER] Falha ao atualizar métricas | error={e}")
+
+        return len(payloads_to_save)
+
+    @staticmethod
+    def flush_aggregates(max_batches: int | None = None) -> int:
+        return AccessEventBufferService._drain(
+            AccessEventBufferService.AGGREGATE_KEY, AccessEventBufferService._aggregate, max_batches
+        )
+
+    @staticmethod
+    def _aggregate(payloads: list[dict]) -> int:
+        events = AccessEventService.build_events(AccessEventBufferService._live(payloads))
+
+        with transaction.atomic():
+            AccessEventService.aggregate(events)
+
+        return len(events)
+
+    @staticmethod
+    def stats() -> dict:
+        data = {
+            "online": False,
+            "depth": None,
+            "oldest_age_seconds": None,
+            "enqueued": None,
+            "flushed": None,
+            "dropped": None,
+            "dead": None,
+            "backpressure": False,
+        }
+
+        try:
+            client = RedisConnectionService.get_redis_client()
+            with client.pipeline() as pipe:
+                pipe.llen(AccessEventBufferService.BUFFER_KEY)
+                pipe.lindex(AccessEventBufferService.BUFFER_KEY, 0)
+                pipe.get(AccessEventBufferService.ENQUEUED_KEY)
+                pipe.get(AccessEventBufferService.FLUSHED_KEY)
+                pipe.get(AccessEventBufferService.DROPPED_KEY)
+                pipe.llen(AccessEventBufferService.dead_letter_key(AccessEventBufferService.BUFFER_KEY))
+                depth, oldest, enqueued, flushed, dropped, dead = pipe.execute()
+        except Exception:
+            return data
+
+        data["online"] = True
+        data["depth"] = depth
+        data["enqueued"] = int(enqueued or 0)
+        data["flushed"] = int(flushed or 0)
+        data["dropped"] = int(dropped or 0)
+        data["dead"] = dead
+        data["backpressure"] = depth > AccessEventBufferService._high_watermark()
+
+        if oldest:
+            age = time.time() - json.loads(oldest)["created_at"]
+            data["oldest_age_seconds"] = round(max(age, 0), 1)
+
+        return data
@@ -1,55 +1,150 @@
-from user_agents import parse
+import asyncio
+import logging
+from datetime import datetime
+from datetime import timezone as dt_timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
 
 from apps.converter.models import AccessEvent
+from apps.converter.services.click_counter_service import ClickCounterService
+from apps.converter.services.user_agent_service import UserAgentParserService
 from apps.converter.utils import UserRequestUtil
+from apps.monitor.services.rollup_service import ClickRollupService
+
+logger = logging.getLogger(__name__)
 
 user_request_util = UserRequestUtil()
 
 
 class AccessEventService:
+    _background_tasks = set()
 
     @staticmethod
-    def track(request, url):
-        ip_address = user_request_util.get_client_ip(request)
+    def track(request, url_id):
+        from apps.converter.services.access_event_buffer_service import (
+            AccessEventBufferService,
+        )
+
+        payload = AccessEventService.build_payload(request, url_id)
+
+        if getattr(settings, "ACCESS_EVENT_BUFFERED", False):
+            if AccessEventBufferService.push(payload):
+                return None
+
+        # O redirect grava só o evento: agregados diários e contador são aplicados em lote depois
+        event = AccessEventService.create_events([payload], aggregate=False)[0]
 
-        ua_string = request.META.get("HTTP_USER_AGENT", "")
-        user_agent = parse(ua_string)
+        if not AccessEventBufferService.defer_aggregates([payload]):
+            with transaction.atomic():
+                AccessEventService.aggregate([event])
 
-        browser = user_agent.browser.family or None
-        browser_version = user_agent.browser.version_string or None
-        os = user_agent.os.family or None
+        return event
 
-        device_type = (
-            "Mobile" if user_agent.is_mobile
-            else "Tablet" if user_agent.is_tablet
-            else "PC"
+    @staticmethod
+    def track_in_background(request, url_id) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(
+            sync_to_async(AccessEventService._track_detached, thread_sensitive=False)(
+                request, url_id
+            )
         )
+        AccessEventService._background_tasks.add(task)
+        task.add_done_callback(AccessEventService._background_tasks.discard)
+        return task
+
+    @staticmethod
+    def _track_detached(request, url_id) -> None:
+        close_old_connections()
+        try:
+            AccessEventService.track(request, url_id)
+        except Exception:
+            logger.exception(f"[ACCESS] Falha ao registrar acesso | url_id={url_id}")
+        finally:
+            close_old_connections()
 
-        referer = request.META.get("HTTP_REFERER")
-
-        country = request.META.get("HTTP_CF_IPCOUNTRY")
-        region = request.META.get("HTTP_CF_REGION")
-        city = request.META.get("HTTP_CF_IPCITY")
-        latitude = request.META.get("HTTP_CF_IPLATITUDE")
-        longitude = request.META.get("HTTP_CF_IPLONGITUDE")
-
-        return AccessEvent.objects.create(
-            url=url,
-            ip_address=ip_address,
-            user_agent=ua_string,
-            referer=referer,
-            browser=browser,
-            browser_version=browser_version,
-            os=os,
-            device_type=device_type,
-            country=country,
-            region=region,
-            city=city,
-            latitude=latitude,
-            longitude=longitude,
-            is_bot=user_agent.is_bot,
+    @staticmethod
+    def build_payload(request, url_id) -> dict:
+        return AccessEventService.payload_from(
+            url_id=url_id,
+            created_at=timezone.now().timestamp(),
+            ip_address=user_request_util.get_client_ip(request),
+            ua_string=request.META.get("HTTP_USER_AGENT", ""),
+            referer=request.META.get("HTTP_REFERER"),
+            country=request.META.get("HTTP_CF_IPCOUNTRY"),
+            region=request.META.get("HTTP_CF_REGION"),
+            city=request.META.get("HTTP_CF_IPCITY"),
+            latitude=request.META.get("HTTP_CF_IPLATITUDE"),
+            longitude=request.META.get("HTTP_CF_IPLONGITUDE"),
         )
-        
+
+    @staticmethod
+    def payload_from(
+        *,
+        url_id,
+        created_at: float,
+        ip_address,
+        ua_string: str,
+        referer=None,
+        country=None,
+        region=None,
+        city=None,
+        latitude=None,
+        longitude=None,
+    ) -> dict:
+        user_agent = UserAgentParserService.parse(ua_string)
+
+        return {
+            "url_id": str(url_id),
+            "created_at": created_at,
+            "ip_address": ip_address,
+            "user_agent": ua_string,
+            "referer": referer,
+            "browser": user_agent.browser,
+            "browser_version": user_agent.browser_version,
+            "os": user_agent.os,
+            "device_type": user_agent.device_type,
+            "country": country,
+            "region": region,
+            "city": city,
+            "latitude": latitude,
+            "longitude": longitude,
+            "is_bot": user_agent.is_bot,
+        }
+
+    @staticmethod
+    def build_events(payloads: list[dict]) -> list[AccessEvent]:
+        return [
+            AccessEvent(
+                **{
+                    **payload,
+                    "created_at": datetime.fromtimestamp(
+                        payload["created_at"], tz=dt_timezone.utc
+                    ),
+                }
+            )
+            for payload in payloads
+        ]
+
+    @staticmethod
+    def create_events(payloads: list[dict], aggregate: bool = True) -> list[AccessEvent]:
+        events = AccessEventService.build_events(payloads)
+
+        if not aggregate:
+            return AccessEvent.objects.bulk_create(events)
+
+        with transaction.atomic():
+            events = AccessEvent.objects.bulk_create(events)
+            AccessEventService.aggregate(events)
+
+        return events
+
+    @staticmethod
+    def aggregate(events) -> None:
+        ClickRollupService.record(events)
+        ClickCounterService.increment(events)
+
     @staticmethod
     def get_client_ip(request):
         cf_ip = request.META.get("HTTP_CF_CONNECTING_IP")
@@ -0,0 +1,216 @@
+import hashlib
+import logging
+import math
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.security.services import RedisConnectionService
+
+logger = logging.getLogger(__name__)
+
+
+class ShortCodeBloomFilterService:
+    KEY_PREFIX = "converter:bloom:codes"
+    BUILDING_KEY = "converter:bloom:building"
+    STATS_KEY = "converter:bloom:stats"
+    REBUILD_BATCH_SIZE = 5000
+    BUILDING_TTL = 60 * 60
+
+    @staticmethod
+    def enabled() -> bool:
+        return getattr(settings, "SHORT_CODE_BLOOM_ENABLED", False)
+
+    @staticmethod
+    def parameters() -> tuple[int, int]:
+        capacity = getattr(settings, "SHORT_CODE_BLOOM_CAPACITY", 1_000_000)
+        error_rate = getattr(settings, "SHORT_CODE_BLOOM_ERROR_RATE", 0.001)
+
+        bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        hashes = max(1, round(bits / capacity * math.log(2)))
+        return bits, hashes
+
+    @staticmethod
+    def key() -> str:
+        bits, hashes = ShortCodeBloomFilterService.parameters()
+        return f"{ShortCodeBloomFilterService.KEY_PREFIX}:{bits}:{hashes}"
+
+    @staticmethod
+    def positions(short_code: str, bits: int, hashes: int) -> list[int]:
+        digest = hashlib.blake2b(short_code.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        return [(first + index * second) % bits for index in range(hashes)]
+
+    @staticmethod
+    def might_contain(short_code: str) -> bool | None:
+        if not ShortCodeBloomFilterService.enabled():
+            return None
+
+        bits, hashes = ShortCodeBloomFilterService.parameters()
+        key = ShortCodeBloomFilterService.key()
+
+        try:
+            client = RedisConnectionService.get_redis_client()
+            with client.pipeline(transaction=False) as pipe:
+                pipe.exists(key)
+                for position in ShortCodeBloomFilterService.positions(short_code, bits, hashes):
+                    pipe.getbit(key, position)
+                ready, *found = pipe.execute()
+
+            if not ready:
+                return None
+            if all(found):
+                return True
+
+            client.hincrby(ShortCodeBloomFilterService.STATS_KEY, "rejected", 1)
+            return False
+
+        except Exception as e:
+            logger.warning(f"[BLOOM] Filtro indisponível, consultando o banco | error={e}")
+            return None
+
+    @staticmethod
+    def record_false_positive(short_code: str) -> None:
+        try:
+            RedisConnectionService.get_redis_client().hincrby(
+                ShortCodeBloomFilterService.STATS_KEY, "false_positives", 1
+            )
+        except Exception:
+            logger.warning(f"[BLOOM] Falha ao registrar falso positivo | code={short_code}")
+
+    @staticmethod
+    def add(*short_codes: str) -> None:
+        if not short_codes or not ShortCodeBloomFilterService.enabled():
+            return
+
+        bits, hashes = ShortCodeBloomFilterService.parameters()
+        key = ShortCodeBloomFilterService.key()
+
+        try:
+            client = RedisConnectionService.get_redis_client()
+            with client.pipeline(transaction=False) as pipe:
+                pipe.exists(key)
+                pipe.get(ShortCodeBloomFilterService.BUILDING_KEY)
+                ready, building = pipe.execute()
+
+            # Só escreve em filtros completos: criar a chave aqui geraria falsos negativos.
+            targets = ([key] if ready else []) + ([building.decode()] if building else [])
+            if not targets:
+                return
+
+            with client.pipeline(transaction=False) as pipe:
+                for short_code in short_codes:
+                    for position in ShortCodeBloomFilterService.positions(short_code, bits, hashes):
+                        for target in targets:
+                            pipe.setbit(target, position, 1)
+                pipe.execute()
+
+        except Exception as e:
+            logger.warning(f"[BLOOM] Falha ao adicionar códigos | count={len(short_codes)} error={e}")
+
+    @staticmethod
+    def rebuild() -> int:
+        from apps.converter.models import Url
+
+        bits, hashes = ShortCodeBloomFilterService.parameters()
+        key = ShortCodeBloomFilterService.key()
+        building = f"{key}:building"
+        batch_size = ShortCodeBloomFilterService.REBUILD_BATCH_SIZE
+
+        # add() roda dentro da transação do encurtamento: um código escrito só no filtro antigo
+        # pode ser commitado depois do snapshot da varredura; a margem o recupera antes do RENAME.
+        margin = getattr(settings, "SHORT_CODE_BLOOM_REBUILD_MARGIN", 300)
+        since = timezone.now() - timedelta(seconds=margin)
+
+        client = RedisConnectionService.get_redis_client()
+        client.delete(building)
+        client.setbit(building, bits - 1, 0)
+        client.set(
+            ShortCodeBloomFilterService.BUILDING_KEY, building,
+            ex=ShortCodeBloomFilterService.BUILDING_TTL,
+        )
+
+        started = time.monotonic()
+        added = 0
+        renamed = False
+
+        try:
+            codes = Url.objects.order_by().values_list("short_code", flat=True)
+            batch = []
+            for short_code in codes.iterator(chunk_size=batch_size):
+                batch.append(short_code)
+                if len(batch) >= batch_size:
+                    ShortCodeBloomFilterService._set_bits(client, building, batch, bits, hashes)
+                    added += len(batch)
+                    batch = []
+                    # Mantém add() espelhando no filtro novo durante toda a varredura.
+                    client.expire(
+                        ShortCodeBloomFilterService.BUILDING_KEY,
+                        ShortCodeBloomFilterService.BUILDING_TTL,
+                    )
+
+            if batch:
+                ShortCodeBloomFilterService._set_bits(client, building, batch, bits, hashes)
+                added += len(batch)
+
+            recent = list(
+                Url.objects.filter(created_at__gte=since)
+                .order_by()
+                .values_list("short_code", flat=True)
+            )
+            for start in range(0, len(recent), batch_size):
+                ShortCodeBloomFilterService._set_bits(
+                    client, building, recent[start:start + batch_size], bits, hashes
+                )
+
+            client.rename(building, key)
+            renamed = True
+
+        finally:
+            client.delete(ShortCodeBloomFilterService.BUILDING_KEY)
+            if not renamed:
+                client.delete(building)
+
+        client.hset(ShortCodeBloomFilterService.STATS_KEY, "items", added)
+        client.hset(ShortCodeBloomFilterService.STATS_KEY, "built_at", int(time.time()))
+
+        logger.info(
+            f"[BLOOM] Filtro reconstruído | items={added} recent={len(recent)} bits={bits} "
+            f"hashes={hashes} seconds={round(time.monotonic() - started, 3)}"
+        )
+        return added
+
+    @staticmethod
+    def _set_bits(client, key, short_codes, bits, hashes) -> None:
+        with client.pipeline(transaction=False) as pipe:
+            for short_code in short_codes:
+                for position in ShortCodeBloomFilterService.positions(short_code, bits, hashes):
+                    pipe.setbit(key, position, 1)
+            pipe.execute()
+
+    @staticmethod
+    def stats() -> dict:
+        bits, hashes = ShortCodeBloomFilterService.parameters()
+        raw = RedisConnectionService.get_redis_client().hgetall(ShortCodeBloomFilterService.STATS_KEY)
+        values = {key.decode(): int(value) for key, value in raw.items()}
+
+        rejected = values.get("rejected", 0)
+        false_positives = values.get("false_positives", 0)
+        items = values.get("items", 0)
+        negatives = rejected + false_positives
+
+        return {
+            "bits": bits,
+            "hashes": hashes,
+            "items": items,
+            "built_at": values.get("built_at"),
+            "rejected": rejected,
+            "false_positives": false_positives,
+            "false_positive_rate": round(false_positives / negatives, 6) if negatives else 0.0,
+            "expected_false_positive_rate": round(
+                (1 - math.exp(-hashes * items / bits)) ** hashes, 6
+            ),
+        }
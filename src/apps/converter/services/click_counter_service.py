@@ -0,0 +1,75 @@
+import logging
+from collections import Counter
+
+from django.db.models import Count, F, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from apps.converter.models import AccessEvent, Url
+from apps.converter.services.retention_service import AccessEventRetentionService
+from apps.monitor.models import ClickRollup
+
+logger = logging.getLogger(__name__)
+
+
+class ClickCounterService:
+
+    @staticmethod
+    def increment(events) -> None:
+        counts = Counter()
+        last_clicked = {}
+
+        for event in events:
+            counts[event.url_id] += 1
+            last_clicked[event.url_id] = max(
+                event.created_at, last_clicked.get(event.url_id, event.created_at)
+            )
+
+        for url_id in sorted(counts, key=str):
+            clicked_at = Value(last_clicked[url_id])
+            Url.objects.filter(pk=url_id).update(
+                click_count=F("click_count") + counts[url_id],
+                last_clicked_at=Greatest(Coalesce("last_clicked_at", clicked_at), clicked_at),
+            )
+
+    @staticmethod
+    def reconcile(batch_size: int = 1000) -> int:
+        # A retenção apaga eventos antigos: antes da janela completa o total vem dos agregados
+        # diários, e só os dias ainda íntegros são recontados a partir de AccessEvent.
+        since = AccessEventRetentionService.complete_since()
+
+        events = AccessEvent.objects.filter(
+            url=OuterRef("pk"), created_at__gte=AccessEventRetentionService.day_start(since)
+        ).values("url").order_by()
+        history = ClickRollup.objects.filter(
+            url=OuterRef("pk"), dimension=ClickRollup.Dimension.TOTAL, bucket__lt=since
+        ).values("url").order_by()
+
+        click_count = (
+            Coalesce(Subquery(history.annotate(total=Sum("total")).values("total")[:1]), 0)
+            + Coalesce(Subquery(events.annotate(total=Count("id")).values("total")[:1]), 0)
+        )
+        last_clicked_at = Coalesce(
+            Subquery(events.annotate(last=Max("created_at")).values("last")[:1]),
+            F("last_clicked_at"),
+        )
+
+        reconciled = 0
+        last_pk = None
+
+        while True:
+            urls = Url.objects.order_by("pk")
+            if last_pk is not None:
+                urls = urls.filter(pk__gt=last_pk)
+
+            pks = list(urls.values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                break
+
+            reconciled += Url.objects.filter(pk__in=pks).update(
+                click_count=click_count,
+                last_clicked_at=last_clicked_at,
+            )
+            last_pk = pks[-1]
+
+        logger.info(f"[CLICK COUNTER] Contadores reconciliados | urls={reconciled}")
+        return reconciled
@@ -0,0 +1,245 @@
+import itertools
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.encoding import iri_to_uri
+
+from apps.converter.enums import URL_EXPIRATION_DAYS
+from apps.converter.models import EdgeLogCursor, Url
+from apps.converter.services.access_event_service import AccessEventService
+
+logger = logging.getLogger(__name__)
+
+SHORT_CODE_PATTERN = re.compile(r"^[A-Za-z0-9]+$")
+
+
+class EdgeRedirectMapService:
+    TARGETS_FILE = "targets.map"
+    VERSION_FILE = "redirects.version"
+    SCHEDULE_KEY = "converter:edge_map:scheduled"
+
+    @staticmethod
+    def directory() -> str:
+        return getattr(settings, "EDGE_REDIRECT_MAP_DIR", "")
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(EdgeRedirectMapService.directory())
+
+    @staticmethod
+    def active_redirects():
+        expiration_date = timezone.now() - timedelta(days=URL_EXPIRATION_DAYS)
+        return (
+            Url.objects.filter(metadata__is_direct=True)
+            .filter(Q(metadata__is_permanent=True) | Q(created_at__gte=expiration_date))
+            .order_by()
+            .values_list("short_code", "original_url")
+        )
+
+    @staticmethod
+    def escape(url: str) -> str:
+        return iri_to_uri(url).replace("$", "%24")
+
+    @staticmethod
+    def entry(redirects) -> str:
+        """
+        Linha do mapa para códigos que só diferem em maiúsculas/minúsculas.
+
+        O map do nginx compara chaves literais sem diferenciar caixa, então a chave é o código
+        em minúsculas e o valor lista os pares "código destino"; o regex sensível a caixa em
+        $shortly_edge_target escolhe o par do código exato.
+        """
+        pairs = " ".join(
+            f"{short_code} {EdgeRedirectMapService.escape(original_url)}"
+            for short_code, original_url in redirects
+        )
+        return f'{redirects[0][0].lower()} "{pairs}";\n'
+
+    @staticmethod
+    def generate() -> int:
+        directory = EdgeRedirectMapService.directory()
+        os.makedirs(directory, exist_ok=True)
+
+        handle = tempfile.NamedTemporaryFile("w", dir=directory, delete=False, suffix=".tmp")
+        written = 0
+
+        try:
+            redirects = (
+                EdgeRedirectMapService.active_redirects()
+                .order_by(Lower("short_code"))
+                .iterator(chunk_size=5000)
+            )
+
+            with handle:
+                # Ordenado por código em minúsculas: colisões de caixa ficam adjacentes e viram uma linha.
+                for _, group in itertools.groupby(redirects, key=lambda row: row[0].lower()):
+                    group = [row for row in group if SHORT_CODE_PATTERN.match(row[0])]
+                    if not group:
+                        continue
+
+                    handle.write(EdgeRedirectMapService.entry(group))
+                    written += len(group)
+
+                handle.flush()
+                os.fsync(handle.fileno())
+
+            os.chmod(handle.name, 0o644)
+            os.replace(handle.name, os.path.join(directory, EdgeRedirectMapService.TARGETS_FILE))
+
+        except Exception:
+            if os.path.exists(handle.name):
+                os.unlink(handle.name)
+            raise
+
+        version = os.path.join(directory, EdgeRedirectMapService.VERSION_FILE)
+        with open(f"{version}.tmp", "w") as stamp:
+            stamp.write(f"{time.time()} {written}\n")
+        os.replace(f"{version}.tmp", version)
+
+        logger.info(f"[EDGE] Mapa de redirecionamentos gerado | redirects={written}")
+        return written
+
+    @staticmethod
+    def schedule() -> None:
+        if not EdgeRedirectMapService.enabled():
+            return
+
+        debounce = getattr(settings, "EDGE_REDIRECT_MAP_DEBOUNCE", 30)
+        if not cache.add(EdgeRedirectMapService.SCHEDULE_KEY, 1, debounce * 2):
+            return
+
+        from apps.converter.tasks import regenerate_edge_redirect_map
+
+        transaction.on_commit(
+            lambda: regenerate_edge_redirect_map.apply_async(countdown=debounce)
+        )
+
+
+class EdgeAccessLogService:
+    ROTATED_SUFFIX = ".1"
+
+    @staticmethod
+    def _value(entry: dict, key: str):
+        value = entry.get(key)
+        return value if value not in ("", "-") else None
+
+    @staticmethod
+    def _float(value):
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _client_ip(entry: dict):
+        forwarded = EdgeAccessLogService._value(entry, "xff")
+        return (
+            EdgeAccessLogService._value(entry, "cf_ip")
+            or (forwarded.split(",")[0].strip() if forwarded else None)
+            or EdgeAccessLogService._value(entry, "ip")
+        )
+
+    @staticmethod
+    def source(path: str, cursor: EdgeLogCursor) -> tuple[str, int, int]:
+        """
+        Arquivo, inode e offset da próxima leitura.
+
+        Depois de uma rotação, termina o arquivo antigo (<path>.1) antes de começar o novo,
+        para não perder as linhas escritas entre a última importação e a rotação.
+        """
+        stat = os.stat(path)
+        if cursor.inode == stat.st_ino:
+            # Arquivo truncado no lugar: recomeça do início.
+            return path, stat.st_ino, cursor.offset if cursor.offset <= stat.st_size else 0
+
+        rotated = f"{path}{EdgeAccessLogService.ROTATED_SUFFIX}"
+        if cursor.inode and os.path.exists(rotated):
+            rotated_stat = os.stat(rotated)
+            if rotated_stat.st_ino == cursor.inode and cursor.offset < rotated_stat.st_size:
+                return rotated, rotated_stat.st_ino, cursor.offset
+
+        return path, stat.st_ino, 0
+
+    @staticmethod
+    def read(path: str, offset: int, max_lines: int) -> tuple[list[str], int]:
+        lines = []
+        with open(path, "rb") as handle:
+            handle.seek(offset)
+            while len(lines) < max_lines:
+                line = handle.readline()
+                if not line or not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                lines.append(line.decode("utf-8", errors="replace"))
+
+        return lines, offset
+
+    @staticmethod
+    def ingest() -> int:
+        path = getattr(settings, "EDGE_ACCESS_LOG_PATH", "")
+        if not path or not os.path.exists(path):
+            return 0
+
+        EdgeLogCursor.objects.get_or_create(path=path)
+
+        # Offset e eventos são gravados na mesma transação: uma importação nunca se repete
+        # nem se perde, e o lock da linha impede dois workers lendo o mesmo trecho.
+        with transaction.atomic():
+            cursor = EdgeLogCursor.objects.select_for_update(skip_locked=True).filter(path=path).first()
+            if cursor is None:
+                return 0
+
+            batch_size = getattr(settings, "ACCESS_EVENT_BATCH_SIZE", 500)
+            source, inode, offset = EdgeAccessLogService.source(path, cursor)
+            lines, offset = EdgeAccessLogService.read(source, offset, batch_size * 10)
+
+            entries = []
+            for line in lines:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"[EDGE] Linha inválida no log | line={line[:200]}")
+
+            codes = {entry.get("code") for entry in entries if entry.get("code")}
+            url_ids = dict(
+                Url.objects.filter(short_code__in=codes).values_list("short_code", "id")
+            )
+
+            payloads = [
+                AccessEventService.payload_from(
+                    url_id=url_ids[entry["code"]],
+                    created_at=EdgeAccessLogService._float(entry.get("time")) or time.time(),
+                    ip_address=EdgeAccessLogService._client_ip(entry),
+                    ua_string=entry.get("ua") or "",
+                    referer=EdgeAccessLogService._value(entry, "referer"),
+                    country=EdgeAccessLogService._value(entry, "country"),
+                    region=EdgeAccessLogService._value(entry, "region"),
+                    city=EdgeAccessLogService._value(entry, "city"),
+                    latitude=EdgeAccessLogService._float(EdgeAccessLogService._value(entry, "lat")),
+                    longitude=EdgeAccessLogService._float(EdgeAccessLogService._value(entry, "lon")),
+                )
+                for entry in entries
+                if entry.get("code") in url_ids and EdgeAccessLogService._client_ip(entry)
+            ]
+
+            for start in range(0, len(payloads), batch_size):
+                AccessEventService.create_events(payloads[start:start + batch_size])
+
+            cursor.inode = inode
+            cursor.offset = offset
+            cursor.save(update_fields=["inode", "offset", "updated_at"])
+
+        if payloads:
+            logger.info(f"[EDGE] Acessos do nginx importados | events={len(payloads)}")
+        return len(payloads)
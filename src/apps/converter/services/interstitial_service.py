@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core import signing
+
+
+class InterstitialTokenService:
+    SALT = "converter.interstitial"
+
+    @staticmethod
+    def wait_seconds() -> int:
+        return getattr(settings, "INTERSTITIAL_WAIT_SECONDS", 5)
+
+    @staticmethod
+    def issue(target_url: str, now: float | None = None) -> str:
+        return signing.dumps(
+            {"u": target_url, "t": now if now is not None else time.time()},
+            salt=InterstitialTokenService.SALT,
+            compress=True,
+        )
+
+    @staticmethod
+    def load(token: str | None) -> dict | None:
+        if not token:
+            return None
+
+        try:
+            return signing.loads(
+                token,
+                salt=InterstitialTokenService.SALT,
+                max_age=getattr(settings, "INTERSTITIAL_TOKEN_MAX_AGE", 600),
+            )
+        except signing.BadSignature:
+            return None
+
+    @staticmethod
+    def remaining(data: dict, now: float | None = None) -> float:
+        now = now if now is not None else time.time()
+        return max(0.0, data["t"] + InterstitialTokenService.wait_seconds() - now)
@@ -0,0 +1,120 @@
+import logging
+import re
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from apps.converter.models import AccessEvent
+
+logger = logging.getLogger(__name__)
+
+
+class AccessEventPartitionService:
+    TABLE = AccessEvent._meta.db_table
+    NAME_PATTERN = re.compile(rf"^{TABLE}_p(\d{{4}})(\d{{2}})$")
+
+    @staticmethod
+    def add_months(month: date, count: int) -> date:
+        index = month.month - 1 + count
+        return month.replace(year=month.year + index // 12, month=index % 12 + 1, day=1)
+
+    @staticmethod
+    def bound(month: date) -> str:
+        # Limite com fuso explícito: um literal de data seria lido no fuso da sessão (UTC no Django).
+        return timezone.make_aware(datetime.combine(month, time.min)).isoformat()
+
+    @staticmethod
+    def partition_name(month: date) -> str:
+        return f"{AccessEventPartitionService.TABLE}_p{month:%Y%m}"
+
+    @staticmethod
+    def is_partitioned() -> bool:
+        if connection.vendor != "postgresql":
+            return False
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+                [AccessEventPartitionService.TABLE],
+            )
+            return cursor.fetchone() is not None
+
+    @staticmethod
+    def partitions() -> list[date]:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE pg_inherits.inhparent = to_regclass(%s)",
+                [AccessEventPartitionService.TABLE],
+            )
+            names = [row[0] for row in cursor.fetchall()]
+
+        months = []
+        for name in names:
+            match = AccessEventPartitionService.NAME_PATTERN.match(name)
+            if match:
+                months.append(date(int(match[1]), int(match[2]), 1))
+        return sorted(months)
+
+    @staticmethod
+    def ensure_partitions(months_ahead: int | None = None) -> list[str]:
+        if months_ahead is None:
+            months_ahead = getattr(settings, "ACCESS_EVENT_PARTITIONS_AHEAD", 3)
+
+        existing = set(AccessEventPartitionService.partitions())
+        current = timezone.localdate().replace(day=1)
+        table = connection.ops.quote_name(AccessEventPartitionService.TABLE)
+        created = []
+
+        for offset in range(months_ahead + 1):
+            month = AccessEventPartitionService.add_months(current, offset)
+            if month in existing:
+                continue
+
+            name = AccessEventPartitionService.partition_name(month)
+            following = AccessEventPartitionService.add_months(month, 1)
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f"CREATE TABLE IF NOT EXISTS {connection.ops.quote_name(name)} "
+                        f"PARTITION OF {table} "
+                        f"FOR VALUES FROM ('{AccessEventPartitionService.bound(month)}') "
+                        f"TO ('{AccessEventPartitionService.bound(following)}')"
+                    )
+                created.append(name)
+            except Exception as e:
+                logger.error(f"[PARTITION] Falha ao criar partição | partition={name} error={e}")
+
+        return created
+
+    @staticmethod
+    def drop_partitions(before: date) -> list[str]:
+        archive = getattr(settings, "ACCESS_EVENT_ARCHIVE_PARTITIONS", False)
+        table = connection.ops.quote_name(AccessEventPartitionService.TABLE)
+        removed = []
+
+        for month in AccessEventPartitionService.partitions():
+            if AccessEventPartitionService.add_months(month, 1) > before:
+                continue
+
+            name = AccessEventPartitionService.partition_name(month)
+            quoted = connection.ops.quote_name(name)
+
+            with connection.cursor() as cursor:
+                cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {quoted}")
+                if archive:
+                    cursor.execute(
+                        f"ALTER TABLE {quoted} RENAME TO {connection.ops.quote_name(f'{name}_archived')}"
+                    )
+                else:
+                    cursor.execute(f"DROP TABLE {quoted}")
+
+            removed.append(name)
+            logger.info(
+                f"[PARTITION] Partição {'arquivada' if archive else 'removida'} | partition={name}"
+            )
+
+        return removed
@@ -0,0 +1,146 @@
+import hashlib
+import io
+import logging
+
+import qrcode
+import qrcode.image.svg
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class QrCodeService:
+    VERSION = 1
+    SIZES = {"sm": 4, "md": 6, "lg": 10}
+    FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+    DEFAULT_SIZE = "md"
+    CACHE_TIMEOUT = 60 * 60 * 24
+
+    @staticmethod
+    def short_url(short_code: str, base_url: str) -> str:
+        return f"{base_url.rstrip('/')}/{short_code}/".replace("http://", "https://")
+
+    @staticmethod
+    def base_url(request=None) -> str | None:
+        # O prerender (Celery) e a view precisam da mesma base: ela entra no digest e no caminho
+        # do storage. Só sem DOMAIN a view usa o host da requisição, e aí não há prerender.
+        domain = settings.DOMAIN.split("://")[-1].strip("/")
+        if domain:
+            return f"https://{domain}/"
+        return request.build_absolute_uri("/") if request is not None else None
+
+    @staticmethod
+    def digest(data: str, size: str, fmt: str) -> str:
+        return hashlib.sha256(
+            f"{QrCodeService.VERSION}|{size}|{fmt}|{data}".encode()
+        ).hexdigest()[:32]
+
+    @staticmethod
+    def path(digest: str, fmt: str) -> str:
+        return f"qr/{digest[:2]}/{digest}.{fmt}"
+
+    @staticmethod
+    def render(data: str, size: str, fmt: str) -> bytes:
+        qr = qrcode.QRCode(box_size=QrCodeService.SIZES[size], border=4)
+        qr.add_data(data)
+        qr.make(fit=True)
+
+        buf = io.BytesIO()
+        if fmt == "svg":
+            qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).save(buf)
+        else:
+            qr.make_image(fill_color="#18181b", back_color="white").save(buf, format="PNG")
+        return buf.getvalue()
+
+    @staticmethod
+    def get(data: str, size: str, fmt: str) -> bytes:
+        digest = QrCodeService.digest(data, size, fmt)
+        cache_key = f"converter:qr:{digest}"
+
+        content = cache.get(cache_key)
+        if content is not None:
+            return content
+
+        path = QrCodeService.path(digest, fmt)
+        try:
+            if default_storage.exists(path):
+                with default_storage.open(path, "rb") as handle:
+                    content = handle.read()
+        except Exception as e:
+            logger.warning(f"[QR] Falha ao ler do storage | path={path} error={e}")
+
+        if content is None:
+            content = QrCodeService.render(data, size, fmt)
+            QrCodeService._store(path, content)
+
+        cache.set(cache_key, content, QrCodeService.CACHE_TIMEOUT)
+        return content
+
+    @staticmethod
+    def _store(path: str, content: bytes) -> None:
+        try:
+            if default_storage.exists(path):
+                return
+            saved = default_storage.save(path, ContentFile(content))
+            if saved != path:
+                default_storage.delete(saved)
+        except Exception as e:
+            logger.warning(f"[QR] Falha ao gravar no storage | path={path} error={e}")
+
+    @staticmethod
+    def prerender(short_code: str, base_url: str | None = None) -> int:
+        base_url = base_url or QrCodeService.base_url()
+        if not base_url:
+            return 0
+
+        data = QrCodeService.short_url(short_code, base_url)
+        for fmt in QrCodeService.FORMATS:
+            QrCodeService.get(data, QrCodeService.DEFAULT_SIZE, fmt)
+        return len(QrCodeService.FORMATS)
+
+    @staticmethod
+    def purge(*short_codes: str, base_url: str | None = None) -> int:
+        base_url = base_url or QrCodeService.base_url()
+        if not base_url:
+            return 0
+
+        removed = 0
+        for short_code in short_codes:
+            data = QrCodeService.short_url(short_code, base_url)
+            for size in QrCodeService.SIZES:
+                for fmt in QrCodeService.FORMATS:
+                    digest = QrCodeService.digest(data, size, fmt)
+                    cache.delete(f"converter:qr:{digest}")
+                    try:
+                        path = QrCodeService.path(digest, fmt)
+                        if default_storage.exists(path):
+                            default_storage.delete(path)
+                            removed += 1
+                    except Exception as e:
+                        logger.warning(f"[QR] Falha ao remover do storage | code={short_code} error={e}")
+
+        return removed
+
+    @staticmethod
+    def schedule_prerender(short_codes) -> None:
+        if not QrCodeService.base_url():
+            return
+
+        from apps.converter.tasks import render_qr_codes
+
+        codes = list(short_codes)
+        transaction.on_commit(lambda: render_qr_codes.delay(codes))
+
+    @staticmethod
+    def schedule_purge(short_codes) -> None:
+        if not QrCodeService.base_url():
+            return
+
+        from apps.converter.tasks import purge_qr_codes
+
+        codes = list(short_codes)
+        transaction.on_commit(lambda: purge_qr_codes.delay(codes))
@@ -0,0 +1,132 @@
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, router, transaction
+from django.db.models import Min
+from django.db.models.deletion import Collector
+from django.utils import timezone
+
+from apps.converter.enums import URL_EXPIRATION_DAYS
+from apps.converter.models import AccessEvent, Url
+from apps.converter.services.edge_service import EdgeRedirectMapService
+from apps.converter.services.qr_service import QrCodeService
+from apps.converter.services.resolver_service import ShortCodeResolverService
+
+logger = logging.getLogger(__name__)
+
+
+class ExpiredUrlReaperService:
+    CURSOR_KEY = "converter:reaper:cursor"
+    CURSOR_TIMEOUT = 60 * 60 * 6
+
+    @staticmethod
+    def expired_urls(now=None):
+        expiration_date = (now or timezone.now()) - timedelta(days=URL_EXPIRATION_DAYS)
+        return Url.objects.filter(
+            metadata__is_permanent=False,
+            created_at__lt=expiration_date,
+        )
+
+    @staticmethod
+    def run(chunk_size=None, sleep=None, max_chunks=None) -> dict:
+        chunk_size = chunk_size or getattr(settings, "URL_REAPER_CHUNK_SIZE", 500)
+        sleep = getattr(settings, "URL_REAPER_SLEEP", 0.5) if sleep is None else sleep
+        max_chunks = max_chunks or getattr(settings, "URL_REAPER_MAX_CHUNKS", None)
+
+        started = time.monotonic()
+        expired = ExpiredUrlReaperService.expired_urls().order_by("pk")
+        cursor = cache.get(ExpiredUrlReaperService.CURSOR_KEY)
+        report = {"chunks": 0, "urls": 0, "rows": 0}
+
+        while max_chunks is None or report["chunks"] < max_chunks:
+            chunk = expired.filter(pk__gt=cursor) if cursor else expired
+            rows = list(chunk.values_list("pk", "short_code")[:chunk_size])
+            if not rows:
+                cursor = None
+                break
+
+            ids = [pk for pk, _ in rows]
+            report["rows"] += ExpiredUrlReaperService._delete_chunk(ids)
+            report["urls"] += len(ids)
+            report["chunks"] += 1
+
+            ShortCodeResolverService.invalidate(*[code for _, code in rows])
+            QrCodeService.schedule_purge(code for _, code in rows)
+
+            cursor = ids[-1]
+            cache.set(ExpiredUrlReaperService.CURSOR_KEY, cursor, ExpiredUrlReaperService.CURSOR_TIMEOUT)
+
+            if len(rows) < chunk_size:
+                cursor = None
+                break
+
+            if sleep:
+                time.sleep(sleep)
+
+        if cursor is None:
+            cache.delete(ExpiredUrlReaperService.CURSOR_KEY)
+
+        if report["urls"]:
+            EdgeRedirectMapService.schedule()
+
+        report["seconds"] = round(time.monotonic() - started, 3)
+        report["urls_per_second"] = (
+            round(report["urls"] / report["seconds"], 1) if report["seconds"] else report["urls"]
+        )
+        report["finished"] = cursor is None
+
+        logger.info(
+            f"[REAPER] URLs expiradas removidas | urls={report['urls']} rows={report['rows']} "
+            f"chunks={report['chunks']} seconds={report['seconds']} rate={report['urls_per_second']}/s "
+            f"finished={report['finished']}"
+        )
+        return report
+
+    @staticmethod
+    def _fast_path(using) -> bool:
+        # Só CASCADE sem cascatas/sinais abaixo e SET_NULL são aplicados à mão; PROTECT,
+        # RESTRICT, SET_DEFAULT, DO_NOTHING e cascatas aninhadas ficam com o Collector.
+        collector = Collector(using=using)
+
+        for relation in Url._meta.related_objects:
+            if relation.on_delete is models.SET_NULL:
+                continue
+            if relation.on_delete is not models.CASCADE or not collector.can_fast_delete(
+                relation.related_model._base_manager.none()
+            ):
+                return False
+
+        return True
+
+    @staticmethod
+    def _delete_chunk(ids) -> int:
+        using = router.db_for_write(Url)
+
+        if not ExpiredUrlReaperService._fast_path(using):
+            logger.warning("[REAPER] Relação sem caminho rápido, usando o Collector do Django")
+            deleted, _ = Url.objects.using(using).filter(pk__in=ids).delete()
+            return deleted
+
+        deleted = 0
+
+        with transaction.atomic(using=using):
+            oldest = Url.objects.filter(pk__in=ids).aggregate(oldest=Min("created_at"))["oldest"]
+
+            for relation in Url._meta.related_objects:
+                related = relation.related_model._base_manager.using(using).filter(
+                    **{f"{relation.field.name}__in": ids}
+                )
+                if relation.related_model is AccessEvent and oldest:
+                    related = related.filter(created_at__gte=oldest)
+
+                if relation.on_delete is models.CASCADE:
+                    deleted += related._raw_delete(using)
+                else:
+                    related.update(**{relation.field.name: None})
+
+            deleted += Url.objects.filter(pk__in=ids)._raw_delete(using)
+
+        return deleted
@@ -0,0 +1,263 @@
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.common.cache import LRUCache
+from apps.converter.enums import URL_EXPIRATION_DAYS
+from apps.converter.services.bloom_service import ShortCodeBloomFilterService
+from apps.converter.services.shortening_service import ShortCodeService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ResolvedUrl:
+    url_id: str
+    original_url: str
+    is_direct: bool
+    is_permanent: bool
+    created_at: datetime
+
+    @property
+    def expires_at(self) -> datetime | None:
+        if self.is_permanent:
+            return None
+        return self.created_at + timedelta(days=URL_EXPIRATION_DAYS)
+
+    def as_tuple(self) -> tuple:
+        return (
+            self.url_id,
+            self.original_url,
+            self.is_direct,
+            self.is_permanent,
+            self.created_at,
+        )
+
+
+class ShortCodeResolverService:
+    CACHE_KEY_PREFIX = "converter:resolve"
+    GENERATION_KEY = f"{CACHE_KEY_PREFIX}:generation"
+
+    _local_cache = LRUCache(
+        maxsize=getattr(settings, "SHORT_CODE_LOCAL_CACHE_SIZE", 10000),
+        ttl=getattr(settings, "SHORT_CODE_LOCAL_CACHE_TIMEOUT", 30),
+    )
+
+    # O cache local de cada processo é descartado quando a geração compartilhada
+    # muda: um link editado/removido fica obsoleto em outros workers por no máximo
+    # SHORT_CODE_LOCAL_CACHE_CHECK_INTERVAL (ou o TTL local, se o cache cair)
+    _generation = None
+    _generation_checked_at = 0.0
+
+    @staticmethod
+    def _cache_key(short_code: str) -> str:
+        return f"{ShortCodeResolverService.CACHE_KEY_PREFIX}:{short_code}"
+
+    @staticmethod
+    def _cache_timeout(resolved: ResolvedUrl) -> int:
+        timeout = getattr(settings, "SHORT_CODE_CACHE_TIMEOUT", 3600)
+        expires_at = resolved.expires_at
+
+        if expires_at is None:
+            return timeout
+
+        remaining = int((expires_at - timezone.now()).total_seconds())
+        return min(timeout, remaining)
+
+    @staticmethod
+    def _generation_due() -> bool:
+        now = time.monotonic()
+        interval = getattr(settings, "SHORT_CODE_LOCAL_CACHE_CHECK_INTERVAL", 1)
+
+        if now - ShortCodeResolverService._generation_checked_at < interval:
+            return False
+
+        ShortCodeResolverService._generation_checked_at = now
+        return True
+
+    @staticmethod
+    def _apply_generation(generation) -> bool:
+        if generation == ShortCodeResolverService._generation:
+            return False
+
+        ShortCodeResolverService._local_cache.clear()
+        ShortCodeResolverService._generation = generation
+        return True
+
+    @staticmethod
+    def _check_generation() -> bool:
+        if not ShortCodeResolverService._generation_due():
+            return False
+
+        try:
+            generation = cache.get(ShortCodeResolverService.GENERATION_KEY, 0)
+        except Exception:
+            logger.warning("[RESOLVER] Cache indisponível ao verificar geração")
+            return False
+
+        return ShortCodeResolverService._apply_generation(generation)
+
+    @staticmethod
+    async def _acheck_generation() -> bool:
+        if not ShortCodeResolverService._generation_due():
+            return False
+
+        try:
+            generation = await cache.aget(ShortCodeResolverService.GENERATION_KEY, 0)
+        except Exception:
+            logger.warning("[RESOLVER] Cache indisponível ao verificar geração")
+            return False
+
+        return ShortCodeResolverService._apply_generation(generation)
+
+    @staticmethod
+    def _local_get(short_code: str) -> ResolvedUrl | None:
+        resolved = ShortCodeResolverService._local_cache.get(short_code)
+        if resolved is None or ShortCodeResolverService._check_generation():
+            return None
+        return resolved
+
+    @staticmethod
+    async def _alocal_get(short_code: str) -> ResolvedUrl | None:
+        resolved = ShortCodeResolverService._local_cache.get(short_code)
+        if resolved is None or await ShortCodeResolverService._acheck_generation():
+            return None
+        return resolved
+
+    @staticmethod
+    def resolve(short_code: str) -> ResolvedUrl | None:
+        resolved = ShortCodeResolverService._local_get(short_code)
+        if resolved is not None:
+            return resolved
+
+        if not ShortCodeService.is_valid(short_code):
+            return None
+
+        key = ShortCodeResolverService._cache_key(short_code)
+
+        try:
+            cached = cache.get(key)
+        except Exception:
+            logger.warning(f"[RESOLVER] Cache indisponível | code={short_code}")
+            cached = None
+
+        if cached is not None:
+            resolved = ResolvedUrl(*cached)
+            ShortCodeResolverService._local_cache.set(short_code, resolved)
+            return resolved
+
+        present = ShortCodeBloomFilterService.might_contain(short_code)
+        if present is False:
+            return None
+
+        resolved = ShortCodeResolverService._load(short_code)
+        if resolved is None:
+            if present:
+                ShortCodeBloomFilterService.record_false_positive(short_code)
+            return None
+
+        timeout = ShortCodeResolverService._cache_timeout(resolved)
+        if timeout > 0:
+            ShortCodeResolverService._local_cache.set(short_code, resolved)
+            try:
+                cache.set(key, resolved.as_tuple(), timeout)
+            except Exception:
+                logger.warning(f"[RESOLVER] Falha ao gravar cache | code={short_code}")
+
+        return resolved
+
+    @staticmethod
+    async def aresolve(short_code: str) -> ResolvedUrl | None:
+        resolved = await ShortCodeResolverService._alocal_get(short_code)
+        if resolved is not None:
+            return resolved
+
+        if not ShortCodeService.is_valid(short_code):
+            return None
+
+        key = ShortCodeResolverService._cache_key(short_code)
+
+        try:
+            cached = await cache.aget(key)
+        except Exception:
+            logger.warning(f"[RESOLVER] Cache indisponível | code={short_code}")
+            cached = None
+
+        if cached is not None:
+            resolved = ResolvedUrl(*cached)
+            ShortCodeResolverService._local_cache.set(short_code, resolved)
+            return resolved
+
+        present = await sync_to_async(ShortCodeBloomFilterService.might_contain)(short_code)
+        if present is False:
+            return None
+
+        row = await ShortCodeResolverService._queryset(short_code).afirst()
+        resolved = ShortCodeResolverService._from_row(row)
+        if resolved is None:
+            if present:
+                await sync_to_async(ShortCodeBloomFilterService.record_false_positive)(short_code)
+            return None
+
+        timeout = ShortCodeResolverService._cache_timeout(resolved)
+        if timeout > 0:
+            ShortCodeResolverService._local_cache.set(short_code, resolved)
+            try:
+                await cache.aset(key, resolved.as_tuple(), timeout)
+            except Exception:
+                logger.warning(f"[RESOLVER] Falha ao gravar cache | code={short_code}")
+
+        return resolved
+
+    @staticmethod
+    def _queryset(short_code: str):
+        from apps.converter.models import Url
+
+        return Url.objects.filter(short_code=short_code, metadata__isnull=False).values_list(
+            "id",
+            "original_url",
+            "metadata__is_direct",
+            "metadata__is_permanent",
+            "created_at",
+        )
+
+    @staticmethod
+    def _from_row(row) -> ResolvedUrl | None:
+        if row is None:
+            return None
+
+        url_id, original_url, is_direct, is_permanent, created_at = row
+        return ResolvedUrl(str(url_id), original_url, is_direct, is_permanent, created_at)
+
+    @staticmethod
+    def _load(short_code: str) -> ResolvedUrl | None:
+        return ShortCodeResolverService._from_row(
+            ShortCodeResolverService._queryset(short_code).first()
+        )
+
+    @staticmethod
+    def invalidate(*short_codes: str) -> None:
+        if not short_codes:
+            return
+
+        for short_code in short_codes:
+            ShortCodeResolverService._local_cache.delete(short_code)
+
+        try:
+            cache.delete_many([ShortCodeResolverService._cache_key(code) for code in short_codes])
+            cache.add(ShortCodeResolverService.GENERATION_KEY, 0, timeout=None)
+            cache.incr(ShortCodeResolverService.GENERATION_KEY)
+        except Exception:
+            logger.warning(f"[RESOLVER] Falha ao invalidar cache | codes={short_codes}")
+
+    @staticmethod
+    def clear_local_cache() -> None:
+        ShortCodeResolverService._local_cache.clear()
+        ShortCodeResolverService._generation = None
+        ShortCodeResolverService._generation_checked_at = 0.0
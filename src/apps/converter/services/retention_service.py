@@ -0,0 +1,86 @@
+import logging
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from apps.billing.models import Plan, UserSubscription
+from apps.converter.models import AccessEvent
+from apps.converter.services.partition_service import AccessEventPartitionService
+
+logger = logging.getLogger(__name__)
+
+
+class AccessEventRetentionService:
+
+    @staticmethod
+    def default_days() -> int:
+        return getattr(settings, "ACCESS_EVENT_RETENTION_DAYS", 365)
+
+    @staticmethod
+    def policies() -> dict:
+        default = AccessEventRetentionService.default_days()
+        return {
+            plan_id: days or default
+            for plan_id, days in Plan.objects.values_list("id", "access_event_retention_days")
+        }
+
+    @staticmethod
+    def max_days() -> int:
+        return max([AccessEventRetentionService.default_days(), *AccessEventRetentionService.policies().values()])
+
+    @staticmethod
+    def min_days() -> int:
+        return min([AccessEventRetentionService.default_days(), *AccessEventRetentionService.policies().values()])
+
+    @staticmethod
+    def complete_since(now=None) -> date:
+        """
+        Primeiro dia local cujos AccessEvents brutos nenhuma política apagou.
+
+        Recalcular contadores ou agregados a partir de eventos só é válido daqui em diante;
+        antes disso o histórico vive apenas em Url.click_count e ClickRollup.
+        """
+        now = now or timezone.now()
+        horizon = now - timedelta(days=AccessEventRetentionService.min_days())
+        return timezone.localdate(horizon) + timedelta(days=1)
+
+    @staticmethod
+    def day_start(day: date) -> datetime:
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    @staticmethod
+    def prune(now=None) -> int:
+        now = now or timezone.now()
+        active = UserSubscription.objects.filter(
+            status=UserSubscription.Status.ACTIVE, plan__isnull=False
+        )
+        deleted = 0
+
+        for plan_id, days in AccessEventRetentionService.policies().items():
+            subscribers = active.filter(plan_id=plan_id).values("user_id")
+            count, _ = AccessEvent.objects.filter(
+                created_at__lt=now - timedelta(days=days),
+                url__created_by__in=subscribers,
+            ).delete()
+            deleted += count
+
+        count, _ = AccessEvent.objects.filter(
+            created_at__lt=now - timedelta(days=AccessEventRetentionService.default_days()),
+        ).exclude(url__created_by__in=active.values("user_id")).delete()
+        deleted += count
+
+        logger.info(f"[RETENTION] Acessos antigos removidos | deleted={deleted}")
+        return deleted
+
+    @staticmethod
+    def enforce() -> dict:
+        result = {"created": [], "removed": [], "deleted": 0}
+
+        if AccessEventPartitionService.is_partitioned():
+            result["created"] = AccessEventPartitionService.ensure_partitions()
+            cutoff = timezone.localdate() - timedelta(days=AccessEventRetentionService.max_days())
+            result["removed"] = AccessEventPartitionService.drop_partitions(before=cutoff)
+
+        result["deleted"] = AccessEventRetentionService.prune()
+        return result
@@ -1,13 +1,21 @@
+import re
+import threading
+from datetime import timedelta
+
 from django.conf import settings
-from django.db import transaction
+from django.db import connection, transaction
 from django.db.models import F
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as translate
 from hashids import Hashids
 
 from apps.billing.services.wallet_service import WalletService
+from apps.converter.dto import BulkUrlItemDTO
 from apps.converter.enums import ANONYMOUS_DAILY_LIMIT, AnonymousLimitExceeded, ShortenResult
+from apps.converter.services.bloom_service import ShortCodeBloomFilterService
 from apps.converter.services.pricing_service import PricingService
+from apps.converter.services.qr_service import QrCodeService
+from apps.security.services import RateLimitService
 
 
 class UrlShorteningService:
@@ -22,34 +30,67 @@ class UrlShorteningService:
         is_permanent: bool,
         create_new: bool = False,
     ):
-        from apps.converter.models import UrlMetadata
-        
         cost = PricingService.calculate_cost(
             is_direct=is_direct,
             is_permanent=is_permanent,
         )
 
-        existing = UrlShorteningService._find_existing(
-            user=user,
-            client_ip=client_ip,
-            url_object=url_object,
-            is_direct=is_direct,
-            is_permanent=is_permanent,
-        )
-
-        if existing and not create_new:
-            return existing, ShortenResult.EXISTS
+        if not create_new:
+            existing = UrlShorteningService._find_existing(
+                user=user,
+                client_ip=client_ip,
+                url_object=url_object,
+                is_direct=is_direct,
+                is_permanent=is_permanent,
+            )
+            if existing:
+                return existing, ShortenResult.EXISTS
 
+        quota = None
         if not user.is_authenticated:
-            today = timezone.now().date()
-            from apps.converter.models import Url
-            count = Url.objects.filter(
+            quota = UrlShorteningService._consume_anonymous_quota(client_ip)
+
+        try:
+            return UrlShorteningService._create(
+                user=user,
+                client_ip=client_ip,
+                url_object=url_object,
+                is_direct=is_direct,
+                is_permanent=is_permanent,
+                cost=cost,
+            )
+        except Exception:
+            if quota is not None:
+                RateLimitService.release(quota)
+            raise
+
+    @staticmethod
+    def _consume_anonymous_quota(client_ip):
+        from apps.converter.models import Url
+
+        def count_today():
+            today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+            return Url.objects.filter(
                 created_by=None,
                 created_by_ip=client_ip,
-                created_at__date=today,
+                created_at__gte=today,
+                created_at__lt=today + timedelta(days=1),
             ).count()
-            if count >= ANONYMOUS_DAILY_LIMIT:
-                raise AnonymousLimitExceeded()
+
+        quota = RateLimitService.hit(
+            "anonymous-shorten",
+            client_ip,
+            limit=ANONYMOUS_DAILY_LIMIT,
+            window=60 * 60 * 24,
+            fallback=count_today,
+        )
+        if not quota.allowed:
+            raise AnonymousLimitExceeded()
+        return quota
+
+    @staticmethod
+    def _create(*, user, client_ip, url_object, is_direct, is_permanent, cost):
+        from apps.converter.models import UrlMetadata
 
         if user.is_authenticated:
             WalletService.debit(
@@ -60,30 +101,77 @@ class UrlShorteningService:
 
         url_object.created_by = user if user.is_authenticated else None
         url_object.created_by_ip = client_ip
-        
-        url_object.save()
+        url_object.save(force_insert=True)
 
-        if not url_object.short_code:
-            url_object.short_code = ShortCodeService.encode(url_object.id)
-            url_object.save(update_fields=["short_code"])
-                
-        url_object.save()
-        
-        metadata, _ = UrlMetadata.objects.get_or_create(url=url_object)
-        metadata.is_direct = is_direct
-        metadata.is_permanent = is_permanent
-        metadata.save()
-
-        UrlMetadata.objects.update_or_create(
+        UrlMetadata.objects.create(
             url=url_object,
-            defaults={
-                "is_direct": is_direct,
-                "is_permanent": is_permanent
-            }
+            is_direct=is_direct,
+            is_permanent=is_permanent,
         )
-        
+
+        if is_direct:
+            from apps.converter.services.edge_service import EdgeRedirectMapService
+
+            EdgeRedirectMapService.schedule()
+
+        if user.is_authenticated:
+            QrCodeService.schedule_prerender([url_object.short_code])
+
         return url_object, ShortenResult.CREATED
 
+    @staticmethod
+    @transaction.atomic
+    def shorten_bulk(*, user, client_ip, items: list[BulkUrlItemDTO]):
+        from apps.converter.models import Url, UrlMetadata
+
+        if not items:
+            return []
+
+        cost = sum(
+            PricingService.calculate_cost(
+                is_direct=item.is_direct,
+                is_permanent=item.is_permanent,
+            )
+            for item in items
+        )
+
+        WalletService.debit(
+            wallet=user.wallet,
+            amount=cost,
+            source=f"{translate('URL shortening')} ({len(items)})",
+        )
+
+        sequences = UrlSequenceService.reserve(len(items))
+        urls = [
+            Url(
+                original_url=item.original_url,
+                original_url_digest=Url.digest(item.original_url),
+                short_code=ShortCodeService.encode(sequence),
+                created_by=user,
+                created_by_ip=client_ip,
+            )
+            for item, sequence in zip(items, sequences)
+        ]
+        Url.objects.bulk_create(urls, batch_size=1000)
+        ShortCodeBloomFilterService.add(*[url.short_code for url in urls])
+
+        UrlMetadata.objects.bulk_create(
+            [
+                UrlMetadata(url=url, is_direct=item.is_direct, is_permanent=item.is_permanent)
+                for url, item in zip(urls, items)
+            ],
+            batch_size=1000,
+        )
+
+        if any(item.is_direct for item in items):
+            from apps.converter.services.edge_service import EdgeRedirectMapService
+
+            EdgeRedirectMapService.schedule()
+
+        QrCodeService.schedule_prerender(url.short_code for url in urls)
+
+        return urls
+
     @staticmethod
     def _find_existing(
         *,
@@ -96,6 +184,7 @@ class UrlShorteningService:
         from apps.converter.models import Url
         
         url_filters = {
+            "original_url_digest": Url.digest(url_object.original_url),
             "original_url": url_object.original_url,
         }
 
@@ -117,11 +206,35 @@ class UrlShorteningService:
 
 
 class ShortCodeService:
+    ALPHABET = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890"
+    LEGACY_PATTERN = re.compile(r"[0-9a-f]{8}")
+
     _hashids = Hashids(
         salt=settings.SHORT_CODE_SALT,
         min_length=getattr(settings, "SHORT_CODE_MIN_LENGTH", 6),
-        alphabet="abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ1234567890"
+        alphabet=ALPHABET,
     )
+    _pattern = None
+
+    @staticmethod
+    def min_length() -> int:
+        return getattr(settings, "SHORT_CODE_MIN_LENGTH", 6)
+
+    @staticmethod
+    def max_length() -> int:
+        from apps.converter.models import Url
+
+        return Url._meta.get_field("short_code").max_length
+
+    @staticmethod
+    def pattern() -> re.Pattern:
+        # Compilado no primeiro uso: o limite superior vem do campo Url.short_code.
+        if ShortCodeService._pattern is None:
+            ShortCodeService._pattern = re.compile(
+                rf"[{ShortCodeService.ALPHABET}]"
+                rf"{{{ShortCodeService.min_length()},{ShortCodeService.max_length()}}}"
+            )
+        return ShortCodeService._pattern
 
     @staticmethod
     def encode(number: int) -> str:
@@ -131,20 +244,158 @@ class ShortCodeService:
             raise TypeError(f"Expected int, got {type(number).__name__}")
         if number < 0:
             raise ValueError("Number must be a positive integer")
-        return ShortCodeService._hashids.encode(number)
+
+        code = ShortCodeService._hashids.encode(number)
+        if len(code) > ShortCodeService.max_length():
+            raise ValueError(
+                f"Short code {code!r} exceeds Url.short_code max_length={ShortCodeService.max_length()}"
+            )
+        return code
 
     @staticmethod
     def decode(code: str) -> int | None:
         decoded = ShortCodeService._hashids.decode(code)
-        return decoded[0] if decoded else None
+        return decoded[0] if len(decoded) == 1 else None
+
+    @staticmethod
+    def is_valid(code: str) -> bool:
+        if not code or not ShortCodeService.pattern().fullmatch(code):
+            return False
+
+        # Códigos gerados antes do Hashids (uuid4 truncado) continuam válidos.
+        if ShortCodeService.LEGACY_PATTERN.fullmatch(code) and getattr(
+            settings, "SHORT_CODE_ALLOW_LEGACY", True
+        ):
+            return True
+
+        return ShortCodeService.decode(code) is not None
+
+
+class _SequenceBlock:
+    def __init__(self, start: int, end: int):
+        self.current = start
+        self.end = end
+
+    def take(self) -> int | None:
+        if self.current > self.end:
+            return None
+        value = self.current
+        self.current += 1
+        return value
 
 
 class UrlSequenceService:
+    RETURNING_VENDORS = ("postgresql", "sqlite")
+
+    _lock = threading.Lock()
+    _blocks: list[_SequenceBlock] = []
+    _pending = threading.local()
+
     @staticmethod
-    @transaction.atomic
     def next() -> int:
+        block_size = getattr(settings, "URL_SEQUENCE_BLOCK_SIZE", 100)
+
+        if block_size <= 1 or connection.vendor not in UrlSequenceService.RETURNING_VENDORS:
+            return UrlSequenceService._next_locked()
+
+        value = UrlSequenceService._take_pending()
+        if value is not None:
+            return value
+
+        with UrlSequenceService._lock:
+            while UrlSequenceService._blocks:
+                value = UrlSequenceService._blocks[0].take()
+                if value is not None:
+                    return value
+                UrlSequenceService._blocks.pop(0)
+
+        block = UrlSequenceService._reserve_block(block_size)
+        value = block.take()
+
+        if connection.in_atomic_block:
+            UrlSequenceService._hold_until_commit(block)
+        else:
+            UrlSequenceService._publish(block)
+
+        return value
+
+    @staticmethod
+    def reserve(count: int) -> list[int]:
+        if count <= 0:
+            return []
+
+        if connection.vendor not in UrlSequenceService.RETURNING_VENDORS:
+            return [UrlSequenceService._next_locked() for _ in range(count)]
+
+        block = UrlSequenceService._reserve_block(count)
+        return list(range(block.current, block.end + 1))
+
+    @staticmethod
+    def _reserve_block(size: int) -> _SequenceBlock:
         from apps.converter.models import UrlSequence
-        
+
+        table = connection.ops.quote_name(UrlSequence._meta.db_table)
+        sql = (
+            f"UPDATE {table} SET value = value + %s "
+            f"WHERE id = (SELECT MIN(id) FROM {table}) RETURNING value"
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [size])
+            row = cursor.fetchone()
+
+            if row is None:
+                UrlSequence.objects.get_or_create(defaults={"value": 0})
+                cursor.execute(sql, [size])
+                row = cursor.fetchone()
+
+        high = row[0]
+        return _SequenceBlock(high - size + 1, high)
+
+    @staticmethod
+    def _publish(block: _SequenceBlock) -> None:
+        if block.current > block.end:
+            return
+        with UrlSequenceService._lock:
+            UrlSequenceService._blocks.append(block)
+
+    @staticmethod
+    def _hold_until_commit(block: _SequenceBlock) -> None:
+        # Ids reserved inside a transaction only become shared once it commits;
+        # a rollback reverts the UPDATE, so the block must be thrown away.
+        def publish():
+            if getattr(UrlSequenceService._pending, "block", None) is block:
+                UrlSequenceService._pending.block = None
+            UrlSequenceService._publish(block)
+
+        UrlSequenceService._pending.block = block
+        UrlSequenceService._pending.callback = publish
+        transaction.on_commit(publish)
+
+    @staticmethod
+    def _take_pending() -> int | None:
+        block = getattr(UrlSequenceService._pending, "block", None)
+        if block is None:
+            return None
+
+        callback = UrlSequenceService._pending.callback
+        if not any(func is callback for _, func, _ in connection.run_on_commit):
+            UrlSequenceService._pending.block = None
+            return None
+
+        return block.take()
+
+    @staticmethod
+    def reset() -> None:
+        with UrlSequenceService._lock:
+            UrlSequenceService._blocks.clear()
+        UrlSequenceService._pending.block = None
+
+    @staticmethod
+    @transaction.atomic
+    def _next_locked() -> int:
+        from apps.converter.models import UrlSequence
+
         seq, _ = (
             UrlSequence.objects
             .select_for_update()
@@ -155,4 +406,4 @@ class UrlSequenceService:
         seq.save(update_fields=["value"])
 
         seq.refresh_from_db(fields=["value"])
-        return seq.value
\ No newline at end of file
+        return seq.value
@@ -0,0 +1,110 @@
+import hashlib
+import json
+import logging
+from typing import NamedTuple
+
+from django.conf import settings
+from user_agents import parse
+
+from apps.common.cache import LRUCache
+from apps.security.services import RedisConnectionService
+
+logger = logging.getLogger(__name__)
+
+
+class ParsedUserAgent(NamedTuple):
+    browser: str | None
+    browser_version: str | None
+    os: str | None
+    device_type: str
+    is_bot: bool
+
+
+class UserAgentParserService:
+    REDIS_KEY = "converter:user_agents"
+    REDIS_TIMEOUT = 60 * 60 * 24 * 7
+
+    _cache = LRUCache(maxsize=getattr(settings, "USER_AGENT_CACHE_SIZE", 5000))
+    _warmed = False
+
+    @staticmethod
+    def _key(ua_string: str) -> str:
+        return hashlib.blake2b(ua_string.encode(), digest_size=16).hexdigest()
+
+    @staticmethod
+    def _use_redis() -> bool:
+        return getattr(settings, "USER_AGENT_CACHE_REDIS", False)
+
+    @staticmethod
+    def parse(ua_string: str) -> ParsedUserAgent:
+        if not UserAgentParserService._warmed and UserAgentParserService._use_redis():
+            UserAgentParserService.warm_up()
+
+        key = UserAgentParserService._key(ua_string)
+        parsed = UserAgentParserService._cache.get(key)
+        if parsed is not None:
+            return parsed
+
+        parsed = UserAgentParserService._parse(ua_string)
+        UserAgentParserService._cache.set(key, parsed)
+
+        if UserAgentParserService._use_redis():
+            UserAgentParserService._store(key, parsed)
+
+        return parsed
+
+    @staticmethod
+    def _parse(ua_string: str) -> ParsedUserAgent:
+        user_agent = parse(ua_string)
+
+        device_type = (
+            "Mobile" if user_agent.is_mobile
+            else "Tablet" if user_agent.is_tablet
+            else "PC"
+        )
+
+        return ParsedUserAgent(
+            browser=user_agent.browser.family or None,
+            browser_version=user_agent.browser.version_string or None,
+            os=user_agent.os.family or None,
+            device_type=device_type,
+            is_bot=user_agent.is_bot,
+        )
+
+    @staticmethod
+    def _store(key: str, parsed: ParsedUserAgent) -> None:
+        try:
+            client = RedisConnectionService.get_redis_client()
+            with client.pipeline() as pipe:
+                pipe.hset(UserAgentParserService.REDIS_KEY, key, json.dumps(parsed))
+                pipe.expire(UserAgentParserService.REDIS_KEY, UserAgentParserService.REDIS_TIMEOUT)
+                pipe.execute()
+        except Exception as e:
+            logger.warning(f"[USER AGENT] Falha ao gravar no Redis | error={e}")
+
+    @staticmethod
+    def warm_up() -> int:
+        UserAgentParserService._warmed = True
+        cache = UserAgentParserService._cache
+        loaded = 0
+
+        try:
+            client = RedisConnectionService.get_redis_client()
+            for key, value in client.hscan_iter(UserAgentParserService.REDIS_KEY, count=500):
+                if loaded >= cache.maxsize:
+                    break
+                cache.set(key.decode(), ParsedUserAgent(*json.loads(value)))
+                loaded += 1
+        except Exception as e:
+            logger.warning(f"[USER AGENT] Falha ao carregar cache do Redis | error={e}")
+
+        return loaded
+
+    @staticmethod
+    def stats() -> dict:
+        return UserAgentParserService._cache.stats()
+
+    @staticmethod
+    def clear() -> None:
+        UserAgentParserService._cache.clear()
+        UserAgentParserService._warmed = False
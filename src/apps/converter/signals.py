@@ -0,0 +1,31 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.converter.models import Url, UrlMetadata
+from apps.converter.services.edge_service import EdgeRedirectMapService
+from apps.converter.services.resolver_service import ShortCodeResolverService
+
+REDIRECT_FIELDS = {"original_url", "is_direct", "is_permanent"}
+
+
+def _redirect_changed(short_code: str) -> None:
+    # Após o commit: invalidar antes deixaria outro worker recarregar o destino antigo.
+    transaction.on_commit(lambda: ShortCodeResolverService.invalidate(short_code))
+    EdgeRedirectMapService.schedule()
+
+
+@receiver(post_save, sender=Url)
+@receiver(post_save, sender=UrlMetadata)
+def invalidate_saved_redirect(sender, instance, created, update_fields=None, **kwargs):
+    # Links novos ainda não estão em cache; salvar só contadores não muda o destino.
+    if created or (update_fields is not None and not REDIRECT_FIELDS & set(update_fields)):
+        return
+
+    url = instance if sender is Url else instance.url
+    _redirect_changed(url.short_code)
+
+
+@receiver(post_delete, sender=Url)
+def invalidate_deleted_redirect(sender, instance, **kwargs):
+    _redirect_changed(instance.short_code)
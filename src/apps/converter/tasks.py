@@ -1,18 +1,88 @@
-from datetime import timedelta
-
 from celery import shared_task
-from django.utils import timezone
+from django.core.cache import cache
 
-from .models import Url
+from .services.access_event_buffer_service import AccessEventBufferService
+from .services.bloom_service import ShortCodeBloomFilterService
+from .services.edge_service import EdgeAccessLogService, EdgeRedirectMapService
+from .services.qr_service import QrCodeService
+from .services.reaper_service import ExpiredUrlReaperService
+from .services.retention_service import AccessEventRetentionService
 
 
 @shared_task(ignore_result=True)
 def delete_expired_urls():
-    expiration_date = timezone.now() - timedelta(days=7)
+    report = ExpiredUrlReaperService.run()
+
+    return (
+        f"{report['urls']} URLs expiradas removidas em {report['chunks']} lotes "
+        f"({report['urls_per_second']}/s)"
+    )
+
+
+@shared_task(ignore_result=True)
+def flush_access_events():
+    flushed = AccessEventBufferService.flush()
+    # Agregados adiados quando o buffer estava indisponível
+    AccessEventBufferService.flush_aggregates()
+
+    return f"{flushed} acessos gravados"
+
+
+@shared_task(ignore_result=True)
+def flush_click_aggregates():
+    aggregated = AccessEventBufferService.flush_aggregates()
+
+    return f"{aggregated} acessos agregados"
+
+
+@shared_task(ignore_result=True)
+def enforce_access_event_retention():
+    result = AccessEventRetentionService.enforce()
+
+    return (
+        f"{len(result['created'])} partições criadas, "
+        f"{len(result['removed'])} partições removidas, "
+        f"{result['deleted']} acessos expurgados"
+    )
+
+
+@shared_task(ignore_result=True)
+def regenerate_edge_redirect_map():
+    cache.delete(EdgeRedirectMapService.SCHEDULE_KEY)
+    if not EdgeRedirectMapService.enabled():
+        return "Mapa de redirecionamentos desabilitado"
 
-    deleted, _ = Url.objects.filter(
-        metadata__is_permanent=False,
-        created_at__lt=expiration_date,
-    ).delete()
+    written = EdgeRedirectMapService.generate()
+
+    return f"{written} redirecionamentos exportados"
+
+
+@shared_task(ignore_result=True)
+def ingest_edge_access_log():
+    ingested = EdgeAccessLogService.ingest()
+
+    return f"{ingested} acessos importados do nginx"
+
+
+@shared_task(ignore_result=True)
+def rebuild_short_code_bloom_filter():
+    if not ShortCodeBloomFilterService.enabled():
+        return "Filtro de códigos desabilitado"
+
+    added = ShortCodeBloomFilterService.rebuild()
+
+    return f"{added} códigos no filtro"
+
+
+@shared_task(ignore_result=True)
+def render_qr_codes(short_codes):
+    rendered = sum(QrCodeService.prerender(short_code) for short_code in short_codes)
+
+    return f"{rendered} QR codes gerados"
+
+
+@shared_task(ignore_result=True)
+def purge_qr_codes(short_codes):
+    removed = QrCodeService.purge(*short_codes)
 
-    return f"{deleted} URLs expiradas removidas"
\ No newline at end of file
+    return f"{removed} QR codes removidos"
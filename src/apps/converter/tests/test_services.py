@@ -0,0 +1,1212 @@
+import json
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from unittest import skipUnless
+from unittest.mock import Mock, patch
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import ProtectedError
+from django.db.models.signals import post_delete
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import get_resolver
+from django.utils import timezone
+
+from apps.billing.models import Plan, UserSubscription
+from apps.common.tests.mixins import QueryPlanAssertionsMixin
+from apps.common.tests.mocks.mock_redis import MockRedis
+from apps.common.utils import CommonUtils
+from apps.converter.checks import short_code_length_check
+from apps.converter.enums import ANONYMOUS_DAILY_LIMIT, AnonymousLimitExceeded, ShortenResult
+from apps.converter.models import AccessEvent, Url, UrlMetadata, UrlSequence
+from apps.converter.services.access_event_buffer_service import AccessEventBufferService
+from apps.converter.services.access_event_service import AccessEventService
+from apps.converter.services.bloom_service import ShortCodeBloomFilterService
+from apps.converter.services.click_counter_service import ClickCounterService
+from apps.converter.services.edge_service import EdgeAccessLogService, EdgeRedirectMapService
+from apps.converter.services.partition_service import AccessEventPartitionService
+from apps.converter.services.reaper_service import ExpiredUrlReaperService
+from apps.converter.services.resolver_service import ShortCodeResolverService
+from apps.converter.services.retention_service import AccessEventRetentionService
+from apps.converter.services.shortening_service import (
+    ShortCodeService,
+    UrlSequenceService,
+    UrlShorteningService,
+)
+from apps.converter.services.user_agent_service import UserAgentParserService
+from apps.converter.tasks import delete_expired_urls
+from apps.monitor.models import ClickRollup
+from apps.monitor.services.rollup_service import ClickRollupService
+from apps.security.services import RedisConnectionService
+
+User = get_user_model()
+
+
+class ShortCodeResolverServiceTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        cache.clear()
+        ShortCodeResolverService.clear_local_cache()
+        self.user = User.objects.create_user(username='owner', email='owner@test.com')
+        self.url = Url.objects.create(original_url='https://example.com', created_by=self.user)
+        UrlMetadata.objects.create(url=self.url, is_direct=True)
+
+    def test_resolves_url_and_metadata(self):
+        resolved = ShortCodeResolverService.resolve(self.url.short_code)
+
+        self.assertEqual(resolved.url_id, str(self.url.id))
+        self.assertEqual(resolved.original_url, 'https://example.com')
+        self.assertTrue(resolved.is_direct)
+        self.assertFalse(resolved.is_permanent)
+
+    def test_second_lookup_hits_no_database(self):
+        ShortCodeResolverService.resolve(self.url.short_code)
+
+        with self.assertNumQueries(0):
+            ShortCodeResolverService.resolve(self.url.short_code)
+
+    def test_shared_cache_is_used_when_local_cache_is_cold(self):
+        ShortCodeResolverService.resolve(self.url.short_code)
+        ShortCodeResolverService.clear_local_cache()
+
+        with self.assertNumQueries(0):
+            resolved = ShortCodeResolverService.resolve(self.url.short_code)
+
+        self.assertEqual(resolved.original_url, 'https://example.com')
+
+    def test_unknown_code_returns_none(self):
+        self.assertIsNone(ShortCodeResolverService.resolve('missing'))
+
+    def test_url_without_metadata_returns_none(self):
+        url = Url.objects.create(original_url='https://nometa.com', created_by=self.user)
+        self.assertIsNone(ShortCodeResolverService.resolve(url.short_code))
+
+    def test_invalidate_drops_cached_entry(self):
+        ShortCodeResolverService.resolve(self.url.short_code)
+
+        Url.objects.filter(pk=self.url.pk).update(original_url='https://changed.com')
+        ShortCodeResolverService.invalidate(self.url.short_code)
+
+        resolved = ShortCodeResolverService.resolve(self.url.short_code)
+        self.assertEqual(resolved.original_url, 'https://changed.com')
+
+    @override_settings(SHORT_CODE_LOCAL_CACHE_CHECK_INTERVAL=0)
+    def test_invalidate_from_another_worker_drops_local_entry(self):
+        ShortCodeResolverService.resolve(self.url.short_code)
+        Url.objects.filter(pk=self.url.pk).update(original_url='https://changed.com')
+
+        # Outro worker invalida: só o cache compartilhado e a geração mudam aqui
+        with patch.object(ShortCodeResolverService._local_cache, 'delete'):
+            ShortCodeResolverService.invalidate(self.url.short_code)
+
+        resolved = ShortCodeResolverService.resolve(self.url.short_code)
+        self.assertEqual(resolved.original_url, 'https://changed.com')
+
+    def test_generation_is_checked_at_most_once_per_interval(self):
+        ShortCodeResolverService.resolve(self.url.short_code)
+        ShortCodeResolverService.resolve(self.url.short_code)
+
+        with patch.object(cache, 'get', wraps=cache.get) as get:
+            ShortCodeResolverService.resolve(self.url.short_code)
+
+        get.assert_not_called()
+
+    def test_delete_expired_urls_invalidates_cache(self):
+        Url.objects.filter(pk=self.url.pk).update(created_at=self.url.created_at.replace(year=2000))
+        ShortCodeResolverService.invalidate(self.url.short_code)
+        ShortCodeResolverService.resolve(self.url.short_code)
+
+        delete_expired_urls()
+
+        self.assertIsNone(ShortCodeResolverService.resolve(self.url.short_code))
+
+
+@override_settings(ACCESS_EVENT_BUFFERED=True, ACCESS_EVENT_BATCH_SIZE=2)
+class AccessEventBufferServiceTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.redis = MockRedis()
+        patcher = patch.object(
+            RedisConnectionService, 'get_redis_client', return_value=self.redis
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user(username='owner', email='owner@test.com')
+        self.url = Url.objects.create(original_url='https://example.com', created_by=self.user)
+        self.request = RequestFactory().get('/', HTTP_USER_AGENT='Mozilla/5.0', REMOTE_ADDR='1.1.1.1')
+
+    def test_track_enqueues_without_database_write(self):
+        with patch('apps.converter.tasks.flush_access_events.delay'):
+            with self.assertNumQueries(0):
+                result = AccessEventService.track(self.request, self.url.id)
+
+        self.assertIsNone(result)
+        self.assertEqual(self.redis.llen(AccessEventBufferService.BUFFER_KEY), 1)
+
+    def test_full_batch_schedules_flush(self):
+        with patch('apps.converter.tasks.flush_access_events.delay') as delay:
+            AccessEventService.track(self.request, self.url.id)
+            delay.assert_not_called()
+            AccessEventService.track(self.request, self.url.id)
+            delay.assert_called_once()
+
+    def test_flush_bulk_creates_events(self):
+        with patch('apps.converter.tasks.flush_access_events.delay'):
+            for _ in range(3):
+                AccessEventService.track(self.request, self.url.id)
+
+        flushed = AccessEventBufferService.flush()
+
+        self.assertEqual(flushed, 3)
+        self.assertEqual(AccessEvent.objects.filter(url=self.url).count(), 3)
+        self.assertEqual(self.redis.llen(AccessEventBufferService.BUFFER_KEY), 0)
+
+    def test_flush_drops_events_of_deleted_urls(self):
+        with patch('apps.converter.tasks.flush_access_events.delay'):
+            AccessEventService.track(self.request, self.url.id)
+        self.url.delete()
+
+        self.assertEqual(AccessEventBufferService.flush(), 0)
+        self.assertEqual(AccessEventBufferService.stats()['dropped'], 1)
+
+    def test_items_left_by_an_interrupted_flush_are_recovered(self):
+        with patch('apps.converter.tasks.flush_access_events.delay'):
+            AccessEventService.track(self.request, self.url.id)
+        processing = f'{AccessEventBufferService.BUFFER_KEY}:processing'
+        self.redis.lmove(AccessEventBufferService.BUFFER_KEY, processing)
+
+        self.assertEqual(AccessEventBufferService.flush(), 1)
+        self.assertEqual(self.redis.llen(processing), 0)
+
+    def test_failed_batch_is_kept_until_it_commits(self):
+        with patch('apps.converter.tasks.flush_access_events.delay'):
+            AccessEventService.track(self.request, self.url.id)
+
+        with patch.object(AccessEventService, 'create_events', side_effect=IntegrityError):
+            with self.assertRaises(IntegrityError):
+                AccessEventBufferService.flush()
+
+        self.assertEqual(AccessEventBufferService.flush(), 1)
+        self.assertEqual(AccessEvent.objects.filter(url=self.url).count(), 1)
+
+    def test_corrupt_item_is_dead_lettered_without_losing_the_batch(self):
+        self.redis.rpush(AccessEventBufferService.BUFFER_KEY, 'not json')
+        with patch('apps.converter.tasks.flush_access_events.delay'):
+            AccessEventService.track(self.request, self.url.id)
+
+        self.assertEqual(AccessEventBufferService.flush(), 1)
+        self.assertEqual(AccessEventBufferService.stats()['dead'], 1)
+
+    @override_settings(ACCESS_EVENT_FLUSH_MAX_ATTEMPTS=1)
+    def test_batch_failing_past_retry_cap_dead_letters_only_failing_items(self):
+        create_events = AccessEventService.create_events
+
+        def flaky(payloads, *args, **kwargs):
+            if any(payload['ip_address'] == '6.6.6.6' for payload in payloads):
+                raise IntegrityError
+            return create_events(payloads, *args, **kwargs)
+
+        poisoned = RequestFactory().get('/', REMOTE_ADDR='6.6.6.6')
+        with patch('apps.converter.tasks.flush_access_events.delay'):
+            AccessEventService.track(poisoned, self.url.id)
+            AccessEventService.track(self.request, self.url.id)
+
+        with patch.object(AccessEventService, 'create_events', side_effect=flaky):
+            self.assertEqual(AccessEventBufferService.flush(), 1)
+
+        self.assertEqual(AccessEvent.objects.filter(url=self.url).count(), 1)
+        self.assertEqual(AccessEventBufferService.stats()['dead'], 1)
+
+    def test_stats_report_backpressure(self):
+        with override_settings(ACCESS_EVENT_BUFFER_HIGH_WATERMARK=1):
+            with patch('apps.converter.tasks.flush_access_events.delay'):
+                AccessEventService.track(self.request, self.url.id)
+                AccessEventService.track(self.request, self.url.id)
+
+            stats = AccessEventBufferService.stats()
+
+        self.assertTrue(stats['online'])
+        self.assertEqual(stats['depth'], 2)
+        self.assertEqual(stats['enqueued'], 2)
+        self.assertTrue(stats['backpressure'])
+
+    def test_falls_back_to_synchronous_write_without_redis(self):
+        self.redis.pipeline = Mock(side_effect=ConnectionError)
+
+        event = AccessEventService.track(self.request, self.url.id)
+
+        self.assertIsNotNone(event.pk)
+        self.assertEqual(AccessEvent.objects.filter(url=self.url).count(), 1)
+
+
+@override_settings(ACCESS_EVENT_BATCH_SIZE=2)
+class DeferredClickAggregatesTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.redis = MockRedis()
+        patcher = patch.object(
+            RedisConnectionService, 'get_redis_client', return_value=self.redis
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user(username='owner', email='owner@test.com')
+        self.url = Url.objects.create(original_url='https://example.com', created_by=self.user)
+        self.request = RequestFactory().get('/', HTTP_USER_AGENT='Mozilla/5.0', REMOTE_ADDR='1.1.1.1')
+
+    def test_track_leaves_rollups_to_the_batched_flush(self):
+        AccessEventService.track(self.request, self.url.id)
+
+        self.assertFalse(ClickRollup.objects.exists())
+        self.assertEqual(self.redis.llen(AccessEventBufferService.AGGREGATE_KEY), 1)
+
+        self.assertEqual(AccessEventBufferService.flush_aggregates(), 1)
+        self.assertEqual(
+            ClickRollup.objects.get(url=self.url, dimension=ClickRollup.Dimension.TOTAL).total, 1
+        )
+
+    def test_full_batch_schedules_aggregate_flush(self):
+        with patch('apps.converter.tasks.flush_click_aggregates.delay') as delay:
+            AccessEventService.track(self.request, self.url.id)
+            delay.assert_not_called()
+            AccessEventService.track(self.request, self.url.id)
+            delay.assert_called_once()
+
+    def test_flush_skips_aggregates_of_deleted_urls(self):
+        AccessEventService.track(self.request, self.url.id)
+        self.url.delete()
+
+        self.assertEqual(AccessEventBufferService.flush_aggregates(), 0)
+        self.assertFalse(ClickRollup.objects.exists())
+
+    def test_aggregates_inline_without_redis(self):
+        self.redis.rpush = Mock(side_effect=ConnectionError)
+
+        AccessEventService.track(self.request, self.url.id)
+
+        self.assertTrue(ClickRollup.objects.filter(url=self.url).exists())
+
+
+class UserAgentParserServiceTests(TestCase):
+    UA = (
+        'Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 '
+        '(KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1'
+    )
+
+    def setUp(self):
+        UserAgentParserService.clear()
+        self.addCleanup(UserAgentParserService.clear)
+
+    def test_parses_user_agent(self):
+        parsed = UserAgentParserService.parse(self.UA)
+
+        self.assertEqual(parsed.browser, 'Mobile Safari')
+        self.assertEqual(parsed.os, 'iOS')
+        self.assertEqual(parsed.device_type, 'Mobile')
+        self.assertFalse(parsed.is_bot)
+
+    def test_repeated_user_agent_is_served_from_cache(self):
+        UserAgentParserService.parse(self.UA)
+
+        with patch('apps.converter.services.user_agent_service.parse') as parse:
+            UserAgentParserService.parse(self.UA)
+            parse.assert_not_called()
+
+        stats = UserAgentParserService.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    @override_settings(USER_AGENT_CACHE_REDIS=True)
+    def test_warm_up_loads_entries_from_redis(self):
+        redis = MockRedis()
+        with patch.object(RedisConnectionService, 'get_redis_client', return_value=redis):
+            expected = UserAgentParserService.parse(self.UA)
+            UserAgentParserService.clear()
+
+            self.assertEqual(UserAgentParserService.warm_up(), 1)
+
+            with patch('apps.converter.services.user_agent_service.parse') as parse:
+                self.assertEqual(UserAgentParserService.parse(self.UA), expected)
+                parse.assert_not_called()
+
+
+class UrlSequenceServiceTests(TestCase):
+    def setUp(self):
+        UrlSequenceService.reset()
+        self.addCleanup(UrlSequenceService.reset)
+
+    @override_settings(URL_SEQUENCE_BLOCK_SIZE=10)
+    def test_block_is_reserved_with_a_single_statement(self):
+        UrlSequence.objects.create(value=0)
+
+        with self.assertNumQueries(1):
+            first = UrlSequenceService.next()
+
+        with self.assertNumQueries(0):
+            values = [UrlSequenceService.next() for _ in range(9)]
+
+        self.assertEqual([first, *values], list(range(1, 11)))
+        self.assertEqual(UrlSequence.objects.get().value, 10)
+
+    @override_settings(URL_SEQUENCE_BLOCK_SIZE=10)
+    def test_rolled_back_block_is_discarded(self):
+        try:
+            with transaction.atomic():
+                UrlSequenceService.next()
+                raise RuntimeError
+        except RuntimeError:
+            pass
+
+        self.assertEqual(UrlSequenceService.next(), 1)
+
+    @override_settings(URL_SEQUENCE_BLOCK_SIZE=1)
+    def test_block_size_one_falls_back_to_locked_sequence(self):
+        self.assertEqual(UrlSequenceService.next(), 1)
+        self.assertEqual(UrlSequenceService.next(), 2)
+
+
+@override_settings(URL_SEQUENCE_BLOCK_SIZE=5)
+class UrlSequenceConcurrencyTests(TransactionTestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        UrlSequenceService.reset()
+        self.addCleanup(UrlSequenceService.reset)
+
+    def _create_urls(self, count):
+        try:
+            return [
+                Url.objects.create(original_url='https://example.com').short_code
+                for _ in range(count)
+            ]
+        finally:
+            connection.close()
+
+    # SQLite em memória falha escritores concorrentes em vez de esperar o lock da linha.
+    @skipUnless(connection.vendor == 'postgresql', 'requer escrita concorrente (PostgreSQL)')
+    def test_parallel_creation_yields_unique_short_codes(self):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(self._create_urls, [25] * 4))
+
+        short_codes = [code for codes in results for code in codes]
+
+        self.assertEqual(len(short_codes), 100)
+        self.assertEqual(len(set(short_codes)), 100)
+        self.assertEqual(Url.objects.count(), 100)
+
+    def test_restarted_worker_never_reuses_reserved_ids(self):
+        first_worker = [UrlSequenceService.next() for _ in range(3)]
+        UrlSequenceService.reset()
+        second_worker = [UrlSequenceService.next() for _ in range(3)]
+
+        self.assertFalse(set(first_worker) & set(second_worker))
+
+
+class ClickCounterServiceTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.redis = MockRedis()
+        patcher = patch.object(
+            RedisConnectionService, 'get_redis_client', return_value=self.redis
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = User.objects.create_user(username='owner', email='owner@test.com')
+        self.url = Url.objects.create(original_url='https://example.com', created_by=self.user)
+        self.request = RequestFactory().get('/', HTTP_USER_AGENT='Mozilla/5.0', REMOTE_ADDR='1.1.1.1')
+
+    def test_tracking_increments_counter_in_batched_flush(self):
+        AccessEventService.track(self.request, self.url.id)
+        with self.assertNumQueries(1):
+            event = AccessEventService.track(self.request, self.url.id)
+
+        self.url.refresh_from_db()
+        self.assertEqual(self.url.click_count, 0)
+
+        AccessEventBufferService.flush_aggregates()
+
+        self.url.refresh_from_db()
+        self.assertEqual(self.url.click_count, 2)
+        self.assertEqual(self.url.last_clicked_at, event.created_at)
+
+    def test_older_batch_does_not_move_last_clicked_at_back(self):
+        event = AccessEventService.track(self.request, self.url.id)
+        AccessEventBufferService.flush_aggregates()
+        payload = AccessEventService.build_payload(self.request, self.url.id)
+        payload['created_at'] = (timezone.now() - timedelta(hours=1)).timestamp()
+
+        AccessEventService.create_events([payload])
+
+        self.url.refresh_from_db()
+        self.assertEqual(self.url.click_count, 2)
+        self.assertEqual(self.url.last_clicked_at, event.created_at)
+
+    def test_reconcile_recomputes_from_access_events(self):
+        event = AccessEventService.track(self.request, self.url.id)
+        idle = Url.objects.create(original_url='https://idle.com', created_by=self.user)
+        Url.objects.filter(pk=self.url.pk).update(click_count=42, last_clicked_at=None)
+        Url.objects.filter(pk=idle.pk).update(click_count=7)
+
+        call_command('reconcile_click_counts', batch_size=1, stdout=Mock())
+
+        self.url.refresh_from_db()
+        idle.refresh_from_db()
+        self.assertEqual(self.url.click_count, 1)
+        self.assertEqual(self.url.last_clicked_at, event.created_at)
+        self.assertEqual(idle.click_count, 0)
+        self.assertIsNone(idle.last_clicked_at)
+
+    def test_reconcile_returns_number_of_urls(self):
+        Url.objects.create(original_url='https://other.com', created_by=self.user)
+        self.assertEqual(ClickCounterService.reconcile(batch_size=1), 2)
+
+
+@override_settings(ACCESS_EVENT_RETENTION_DAYS=30)
+class AccessEventRetentionServiceTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.free_user = User.objects.create_user(username='free', email='free@test.com')
+        self.paying_user = User.objects.create_user(username='paying', email='paying@test.com')
+        plan = Plan.objects.create(name='Pro', access_event_retention_days=90)
+        UserSubscription.objects.create(user=self.paying_user, plan=plan)
+
+        self.free_url = Url.objects.create(original_url='https://free.com', created_by=self.free_user)
+        self.paying_url = Url.objects.create(original_url='https://paying.com', created_by=self.paying_user)
+        self.anonymous_url = Url.objects.create(original_url='https://anonymous.com')
+
+    def _event(self, url, days_ago):
+        event = AccessEvent.objects.create(url=url, ip_address='1.1.1.1')
+        AccessEvent.objects.filter(pk=event.pk).update(
+            created_at=timezone.now() - timedelta(days=days_ago)
+        )
+        return event
+
+    def test_prune_applies_plan_retention(self):
+        self._event(self.free_url, 60)
+        self._event(self.anonymous_url, 60)
+        kept_free = self._event(self.free_url, 10)
+        kept_paying = self._event(self.paying_url, 60)
+        self._event(self.paying_url, 120)
+
+        deleted = AccessEventRetentionService.prune()
+
+        self.assertEqual(deleted, 3)
+        self.assertEqual(
+            set(AccessEvent.objects.values_list('pk', flat=True)),
+            {kept_free.pk, kept_paying.pk},
+        )
+
+    def test_max_days_covers_longest_plan(self):
+        self.assertEqual(AccessEventRetentionService.max_days(), 90)
+
+    def test_complete_window_follows_shortest_policy(self):
+        now = timezone.now()
+
+        self.assertEqual(
+            AccessEventRetentionService.complete_since(now),
+            timezone.localdate(now - timedelta(days=30)) + timedelta(days=1),
+        )
+
+    def _track(self, url, days_ago):
+        AccessEventService.create_events([
+            AccessEventService.payload_from(
+                url_id=url.id,
+                created_at=(timezone.now() - timedelta(days=days_ago)).timestamp(),
+                ip_address='1.1.1.1',
+                ua_string='Mozilla/5.0',
+            )
+        ])
+
+    def test_recomputes_keep_history_older_than_retention(self):
+        self._track(self.free_url, 60)
+        self._track(self.free_url, 1)
+        AccessEventRetentionService.prune()
+        self.assertEqual(AccessEvent.objects.filter(url=self.free_url).count(), 1)
+
+        ClickCounterService.reconcile()
+        ClickRollupService.rebuild()
+
+        self.free_url.refresh_from_db()
+        self.assertEqual(self.free_url.click_count, 2)
+        self.assertEqual(
+            sum(
+                ClickRollup.objects.filter(
+                    url=self.free_url, dimension=ClickRollup.Dimension.TOTAL
+                ).values_list('total', flat=True)
+            ),
+            2,
+        )
+
+    def test_enforce_skips_partitions_outside_postgres(self):
+        self._event(self.free_url, 60)
+
+        result = AccessEventRetentionService.enforce()
+
+        self.assertEqual(result, {'created': [], 'removed': [], 'deleted': 1})
+
+
+class AccessEventPartitionServiceTests(TestCase):
+    def test_add_months_rolls_over_year(self):
+        self.assertEqual(AccessEventPartitionService.add_months(date(2026, 11, 15), 2), date(2027, 1, 1))
+        self.assertEqual(AccessEventPartitionService.add_months(date(2026, 1, 1), -1), date(2025, 12, 1))
+
+    def test_partition_name_is_monthly(self):
+        self.assertEqual(
+            AccessEventPartitionService.partition_name(date(2026, 3, 1)),
+            'converter_accessevent_p202603',
+        )
+
+    @override_settings(TIME_ZONE='America/Recife')
+    def test_bounds_carry_explicit_offset(self):
+        self.assertEqual(
+            AccessEventPartitionService.bound(date(2026, 3, 1)),
+            '2026-03-01T00:00:00-03:00',
+        )
+
+    def test_sqlite_is_not_partitioned(self):
+        self.assertFalse(AccessEventPartitionService.is_partitioned())
+
+
+class ExpiredUrlReaperServiceTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        cache.clear()
+        self.request = RequestFactory().get('/', HTTP_USER_AGENT='Mozilla/5.0', REMOTE_ADDR='1.1.1.1')
+        self.expired = [self._make_url(days_ago=30) for _ in range(5)]
+        self.fresh = self._make_url(days_ago=1)
+        self.permanent = self._make_url(days_ago=30, is_permanent=True)
+
+    def _make_url(self, days_ago, is_permanent=False):
+        url = Url.objects.create(original_url='https://example.com')
+        UrlMetadata.objects.create(url=url, is_permanent=is_permanent)
+        created_at = timezone.now() - timedelta(days=days_ago)
+        Url.objects.filter(pk=url.pk).update(created_at=created_at)
+        AccessEventService.track(self.request, url.id)
+        return url
+
+    def test_deletes_expired_urls_in_chunks_with_cascades(self):
+        report = ExpiredUrlReaperService.run(chunk_size=2, sleep=0)
+
+        self.assertEqual(report['urls'], 5)
+        self.assertEqual(report['chunks'], 3)
+        self.assertTrue(report['finished'])
+        self.assertEqual(
+            set(Url.objects.values_list('pk', flat=True)),
+            {self.fresh.pk, self.permanent.pk},
+        )
+        self.assertEqual(AccessEvent.objects.count(), 2)
+        self.assertEqual(UrlMetadata.objects.count(), 2)
+        self.assertFalse(ClickRollup.objects.filter(url_id__in=[url.pk for url in self.expired]).exists())
+
+    def test_interrupted_run_resumes_from_cursor(self):
+        first = ExpiredUrlReaperService.run(chunk_size=2, sleep=0, max_chunks=1)
+
+        self.assertFalse(first['finished'])
+        self.assertIsNotNone(cache.get(ExpiredUrlReaperService.CURSOR_KEY))
+
+        second = ExpiredUrlReaperService.run(chunk_size=2, sleep=0)
+
+        self.assertEqual(first['urls'] + second['urls'], 5)
+        self.assertTrue(second['finished'])
+        self.assertIsNone(cache.get(ExpiredUrlReaperService.CURSOR_KEY))
+
+    def test_sleeps_between_full_chunks(self):
+        with patch('apps.converter.services.reaper_service.time.sleep') as sleep:
+            ExpiredUrlReaperService.run(chunk_size=2, sleep=0.1)
+
+        self.assertEqual(sleep.call_count, 2)
+
+
+    def test_protected_relation_is_not_bypassed(self):
+        relation = next(r for r in Url._meta.related_objects if r.related_model is ClickRollup)
+
+        with patch.object(relation, 'on_delete', models.PROTECT):
+            with self.assertRaises(ProtectedError):
+                ExpiredUrlReaperService.run(chunk_size=10, sleep=0)
+
+        self.assertEqual(Url.objects.count(), 7)
+
+    def test_relations_with_delete_signals_fall_back_to_collector(self):
+        deleted = []
+
+        def receiver(sender, instance, **kwargs):
+            deleted.append(instance.pk)
+
+        post_delete.connect(receiver, sender=UrlMetadata)
+        self.addCleanup(post_delete.disconnect, receiver, sender=UrlMetadata)
+
+        report = ExpiredUrlReaperService.run(chunk_size=10, sleep=0)
+
+        self.assertEqual(report['urls'], 5)
+        self.assertEqual(len(deleted), 5)
+        self.assertEqual(UrlMetadata.objects.count(), 2)
+
+
+class ConverterQueryPlanTests(QueryPlanAssertionsMixin, TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.user = User.objects.create_user(username='owner', email='owner@test.com')
+        self.url = Url.objects.create(original_url='https://example.com', created_by=self.user)
+
+    def test_digest_follows_original_url(self):
+        self.assertEqual(self.url.original_url_digest, Url.digest('https://example.com'))
+
+        self.url.original_url = 'https://changed.com'
+        self.url.save(update_fields=['original_url'])
+
+        self.url.refresh_from_db()
+        self.assertEqual(self.url.original_url_digest, Url.digest('https://changed.com'))
+
+    def test_owner_lookup_uses_digest_index(self):
+        queryset = Url.objects.filter(
+            created_by=self.user,
+            original_url_digest=Url.digest('https://example.com'),
+            original_url='https://example.com',
+        )
+        self.assertUsesIndex(queryset, 'url_owner_digest_idx')
+
+    def test_anonymous_lookup_uses_digest_index(self):
+        queryset = Url.objects.filter(
+            created_by=None,
+            created_by_ip='1.1.1.1',
+            original_url_digest=Url.digest('https://example.com'),
+        )
+        self.assertUsesIndex(queryset, 'url_anon_digest_idx')
+
+    def test_anonymous_daily_count_uses_index(self):
+        today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        queryset = Url.objects.filter(
+            created_by=None,
+            created_by_ip='1.1.1.1',
+            created_at__gte=today,
+            created_at__lt=today + timedelta(days=1),
+        )
+        self.assertUsesIndex(queryset, 'url_anon_created_idx')
+
+    def test_access_event_aggregates_use_index(self):
+        queryset = AccessEvent.objects.filter(
+            url=self.url, created_at__gte=self.url.created_at
+        ).values('country')
+        self.assertUsesIndex(queryset)
+
+
+class AnonymousQuotaTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.redis = MockRedis()
+        patcher = patch.object(RedisConnectionService, 'get_redis_client', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _shorten(self, original_url):
+        return UrlShorteningService.shorten(
+            user=AnonymousUser(),
+            client_ip='9.9.9.9',
+            url_object=Url(original_url=original_url),
+            is_direct=False,
+            is_permanent=False,
+        )
+
+    def test_limit_is_enforced_from_redis_counter(self):
+        for index in range(ANONYMOUS_DAILY_LIMIT):
+            self._shorten(f'https://example.com/{index}')
+
+        with self.assertRaises(AnonymousLimitExceeded):
+            self._shorten('https://example.com/blocked')
+
+    def test_shorten_does_not_count_urls_in_database(self):
+        with CaptureQueriesContext(connection) as queries:
+            self._shorten('https://example.com')
+
+        self.assertFalse(any('COUNT(' in query['sql'] for query in queries.captured_queries))
+
+    def test_failed_shorten_returns_quota(self):
+        with patch.object(UrlShorteningService, '_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self._shorten('https://example.com')
+
+        key = next(iter(self.redis.data))
+        self.assertEqual(int(self.redis.get(key)), 0)
+
+    def test_database_count_is_used_when_redis_is_down(self):
+        self.redis.pipeline = Mock(side_effect=ConnectionError)
+        for index in range(ANONYMOUS_DAILY_LIMIT):
+            self._shorten(f'https://example.com/{index}')
+
+        with self.assertRaises(AnonymousLimitExceeded):
+            self._shorten('https://example.com/blocked')
+
+
+class ShortenQueryCountTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        cache.clear()
+        self.redis = MockRedis()
+        patcher = patch.object(RedisConnectionService, 'get_redis_client', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        UrlSequenceService.reset()
+        self.addCleanup(UrlSequenceService.reset)
+        UrlSequenceService.next()
+
+        self.user = User.objects.create_user(username='owner', email='owner@test.com')
+        self.user.wallet.balance = 100
+        self.user.wallet.save()
+
+    def _shorten(self, user, create_new=False):
+        return UrlShorteningService.shorten(
+            user=user,
+            client_ip='9.9.9.9',
+            url_object=Url(original_url='https://example.com'),
+            is_direct=True,
+            is_permanent=False,
+            create_new=create_new,
+        )
+
+    def test_anonymous_shorten_queries(self):
+        # SAVEPOINT, _find_existing, INSERT url, INSERT metadata, RELEASE
+        with self.assertNumQueries(5):
+            url, result = self._shorten(AnonymousUser())
+
+        self.assertEqual(result, ShortenResult.CREATED)
+        self.assertTrue(url.short_code)
+        self.assertTrue(url.metadata.is_direct)
+
+    def test_authenticated_shorten_queries(self):
+        with self.assertNumQueries(9):
+            url, result = self._shorten(self.user)
+
+        self.assertEqual(result, ShortenResult.CREATED)
+        self.assertEqual(url.created_by, self.user)
+
+    def test_create_new_skips_existing_lookup(self):
+        self._shorten(AnonymousUser())
+
+        with self.assertNumQueries(4):
+            _, result = self._shorten(AnonymousUser(), create_new=True)
+
+        self.assertEqual(result, ShortenResult.CREATED)
+
+    def test_existing_url_is_returned_with_metadata(self):
+        created, _ = self._shorten(self.user)
+
+        with self.assertNumQueries(3):
+            existing, result = self._shorten(self.user)
+
+        self.assertEqual(result, ShortenResult.EXISTS)
+        self.assertEqual(existing.pk, created.pk)
+        self.assertTrue(existing.metadata.is_direct)
+
+
+class EdgeRedirectMapServiceTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        cache.clear()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        settings_patcher = override_settings(EDGE_REDIRECT_MAP_DIR=self.directory.name)
+        settings_patcher.enable()
+        self.addCleanup(settings_patcher.disable)
+
+    def _url(self, original_url, short_code, is_direct=True, is_permanent=False, days_old=0):
+        url = Url.objects.create(original_url=original_url, short_code=short_code)
+        UrlMetadata.objects.create(url=url, is_direct=is_direct, is_permanent=is_permanent)
+        if days_old:
+            Url.objects.filter(pk=url.pk).update(created_at=timezone.now() - timedelta(days=days_old))
+        return url
+
+    def _read(self, name=EdgeRedirectMapService.TARGETS_FILE):
+        with open(os.path.join(self.directory.name, name)) as handle:
+            return handle.read()
+
+    def test_exports_only_active_direct_urls(self):
+        self._url('https://direct.com', 'direct')
+        self._url('https://middle.com', 'middle', is_direct=False)
+        self._url('https://expired.com', 'expired', days_old=400)
+        self._url('https://forever.com', 'forever', is_permanent=True, days_old=400)
+
+        self.assertEqual(EdgeRedirectMapService.generate(), 2)
+
+        content = self._read()
+        self.assertIn('direct "direct https://direct.com";', content)
+        self.assertIn('forever "forever https://forever.com";', content)
+        self.assertNotIn('middle', content)
+        self.assertNotIn('expired', content)
+
+    def test_escapes_nginx_special_characters(self):
+        self._url('https://example.com/a b"c$d\\e/ção', 'escaped')
+
+        EdgeRedirectMapService.generate()
+
+        self.assertIn(
+            'escaped "escaped https://example.com/a%20b%22c%24d%5Ce/%C3%A7%C3%A3o";', self._read()
+        )
+
+    def _nginx_target(self, code):
+        # Reproduz os dois maps do nginx: chave literal sem caixa, depois o regex sensível a caixa.
+        with open(settings.BASE_DIR.parent / 'infra' / 'nginx' / 'shortly.prod.conf') as handle:
+            pattern = re.search(r'"~(\^\(\[A-Za-z0-9\]\+\) .*)" \$2;', handle.read()).group(1)
+
+        entries = {}
+        for line in self._read().splitlines():
+            key, value = line.split(' ', 1)
+            entries[key] = value.rstrip(';').strip('"')
+
+        match = re.match(pattern, f'{code} {entries.get(code.lower(), "")}')
+        return match.group(2) if match else ''
+
+    def test_nginx_code_location_matches_short_codes_and_urlconf(self):
+        with open(settings.BASE_DIR.parent / 'infra' / 'nginx' / 'shortly.prod.conf') as handle:
+            conf = handle.read()
+
+        bounds = re.search(r'location ~ "\^/\[A-Za-z0-9\]\{(\d+),(\d+)\}/\?\$"', conf).groups()
+        self.assertEqual(
+            tuple(map(int, bounds)), (ShortCodeService.min_length(), ShortCodeService.max_length())
+        )
+        self.assertIn(f'(?<code>[A-Za-z0-9]{{{bounds[0]},{bounds[1]}}})', conf)
+
+        code = re.compile(rf'[A-Za-z0-9]{{{bounds[0]},{bounds[1]}}}')
+        excluded = set(re.search(r'"~\^\(([a-z0-9|]+)\)\$" shortly;', conf).group(1).split('|'))
+
+        def segments(patterns):
+            for pattern in patterns:
+                route = str(pattern.pattern).lstrip('^')
+                if not route and hasattr(pattern, 'url_patterns'):
+                    yield from segments(pattern.url_patterns)
+                elif route and not route.startswith('<'):
+                    yield route.split('/')[0]
+
+        # Todo prefixo de página (Django ou location do nginx) com formato de código precisa ir ao gunicorn
+        prefixes = set(segments(get_resolver().url_patterns)) | set(re.findall(r'location /(\w+)/', conf))
+        self.assertEqual({prefix for prefix in prefixes if code.fullmatch(prefix)}, excluded)
+
+    def test_codes_differing_only_in_case_keep_their_own_targets(self):
+        self._url('https://upper.com', 'AbC123')
+        self._url('https://lower.com', 'aBc123')
+        self._url('https://other.com', 'xyz789')
+
+        self.assertEqual(EdgeRedirectMapService.generate(), 3)
+
+        keys = [line.split(' ', 1)[0] for line in self._read().splitlines()]
+        self.assertEqual(sorted(keys), ['abc123', 'xyz789'])
+        self.assertEqual(self._nginx_target('AbC123'), 'https://upper.com')
+        self.assertEqual(self._nginx_target('aBc123'), 'https://lower.com')
+        self.assertEqual(self._nginx_target('abc123'), '')
+        self.assertEqual(self._nginx_target('XYZ789'), '')
+        self.assertEqual(self._nginx_target('xyz789'), 'https://other.com')
+
+    def test_swap_is_atomic_and_stamps_version(self):
+        self._url('https://direct.com', 'direct')
+
+        EdgeRedirectMapService.generate()
+        EdgeRedirectMapService.generate()
+
+        self.assertEqual(
+            sorted(os.listdir(self.directory.name)),
+            [EdgeRedirectMapService.VERSION_FILE, EdgeRedirectMapService.TARGETS_FILE],
+        )
+        self.assertTrue(self._read(EdgeRedirectMapService.VERSION_FILE).strip().endswith(' 1'))
+
+    def test_schedule_is_debounced_until_commit(self):
+        with patch('apps.converter.tasks.regenerate_edge_redirect_map.apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                EdgeRedirectMapService.schedule()
+                EdgeRedirectMapService.schedule()
+                apply_async.assert_not_called()
+
+        apply_async.assert_called_once_with(countdown=30)
+
+    @override_settings(EDGE_REDIRECT_MAP_DIR='')
+    def test_schedule_is_noop_when_disabled(self):
+        with patch('apps.converter.tasks.regenerate_edge_redirect_map.apply_async') as apply_async:
+            with self.captureOnCommitCallbacks(execute=True):
+                EdgeRedirectMapService.schedule()
+
+        apply_async.assert_not_called()
+
+    def test_direct_shorten_schedules_regeneration(self):
+        with patch.object(EdgeRedirectMapService, 'schedule') as schedule:
+            UrlShorteningService.shorten(
+                user=AnonymousUser(),
+                client_ip='9.9.9.9',
+                url_object=Url(original_url='https://example.com'),
+                is_direct=True,
+                is_permanent=False,
+            )
+
+        schedule.assert_called_once()
+
+
+class EdgeAccessLogServiceTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        cache.clear()
+        self.url = Url.objects.create(original_url='https://example.com', short_code='edge')
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'redirects.log')
+        settings_patcher = override_settings(EDGE_ACCESS_LOG_PATH=self.path)
+        settings_patcher.enable()
+        self.addCleanup(settings_patcher.disable)
+
+    def _line(self, **overrides):
+        entry = {
+            'time': f'{timezone.now().timestamp():.3f}',
+            'code': 'edge',
+            'ip': '10.0.0.1',
+            'cf_ip': '1.1.1.1',
+            'xff': '',
+            'ua': 'Mozilla/5.0',
+            'referer': '',
+            'country': 'BR',
+            'region': '',
+            'city': '',
+            'lat': '',
+            'lon': '',
+            **overrides,
+        }
+        return json.dumps(entry) + '\n'
+
+    def _append(self, *lines, mode='a'):
+        with open(self.path, mode) as handle:
+            handle.write(''.join(lines))
+
+    def test_ingests_edge_redirects_as_access_events(self):
+        self._append(self._line(), self._line(code='unknown'), 'not json\n')
+
+        self.assertEqual(EdgeAccessLogService.ingest(), 1)
+
+        event = AccessEvent.objects.get()
+        self.assertEqual(event.url, self.url)
+        self.assertEqual(event.ip_address, '1.1.1.1')
+        self.assertEqual(event.country, 'BR')
+        self.assertIsNone(event.referer)
+        self.url.refresh_from_db()
+        self.assertEqual(self.url.click_count, 1)
+
+    def test_resumes_from_last_offset(self):
+        self._append(self._line())
+        EdgeAccessLogService.ingest()
+
+        self._append(self._line(), '{"code": "edge"')
+
+        self.assertEqual(EdgeAccessLogService.ingest(), 1)
+        self.assertEqual(EdgeAccessLogService.ingest(), 0)
+        self.assertEqual(AccessEvent.objects.count(), 2)
+
+    def test_rotated_log_is_read_from_start(self):
+        self._append(self._line(), self._line())
+        EdgeAccessLogService.ingest()
+
+        rotated = f'{self.path}.new'
+        with open(rotated, 'w') as handle:
+            handle.write(self._line())
+        os.replace(rotated, self.path)
+
+        self.assertEqual(EdgeAccessLogService.ingest(), 1)
+
+    def test_offset_survives_cache_flush(self):
+        self._append(self._line())
+        EdgeAccessLogService.ingest()
+
+        cache.clear()
+
+        self.assertEqual(EdgeAccessLogService.ingest(), 0)
+        self.assertEqual(AccessEvent.objects.count(), 1)
+
+    def test_rotated_file_is_finished_before_the_new_one(self):
+        self._append(self._line())
+        EdgeAccessLogService.ingest()
+        self._append(self._line())
+
+        os.replace(self.path, f'{self.path}{EdgeAccessLogService.ROTATED_SUFFIX}')
+        self._append(self._line(), self._line(), mode='w')
+
+        self.assertEqual(EdgeAccessLogService.ingest(), 1)
+        self.assertEqual(EdgeAccessLogService.ingest(), 2)
+        self.assertEqual(EdgeAccessLogService.ingest(), 0)
+        self.assertEqual(AccessEvent.objects.count(), 4)
+
+    def test_missing_log_is_ignored(self):
+        self.assertEqual(EdgeAccessLogService.ingest(), 0)
+
+
+@override_settings(SHORT_CODE_BLOOM_ENABLED=True, SHORT_CODE_BLOOM_CAPACITY=1000)
+class ShortCodeBloomFilterServiceTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        cache.clear()
+        ShortCodeResolverService.clear_local_cache()
+        self.redis = MockRedis()
+        patcher = patch.object(RedisConnectionService, 'get_redis_client', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.url = Url.objects.create(original_url='https://example.com')
+        UrlMetadata.objects.create(url=self.url, is_direct=True)
+
+    def test_rebuild_contains_every_short_code(self):
+        self.assertEqual(ShortCodeBloomFilterService.rebuild(), 1)
+
+        self.assertTrue(ShortCodeBloomFilterService.might_contain(self.url.short_code))
+        self.assertIsNotNone(ShortCodeResolverService.resolve(self.url.short_code))
+
+    def test_unknown_code_is_rejected_without_database(self):
+        ShortCodeBloomFilterService.rebuild()
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(ShortCodeResolverService.resolve(ShortCodeService.encode(999999)))
+
+        self.assertEqual(ShortCodeBloomFilterService.stats()['rejected'], 1)
+
+    def test_fails_open_until_built(self):
+        self.assertIsNone(ShortCodeBloomFilterService.might_contain('unknown'))
+        self.assertIsNotNone(ShortCodeResolverService.resolve(self.url.short_code))
+
+    def test_fails_open_without_redis(self):
+        ShortCodeBloomFilterService.rebuild()
+        self.redis.pipeline = Mock(side_effect=ConnectionError)
+
+        self.assertIsNone(ShortCodeBloomFilterService.might_contain('unknown'))
+
+    def test_new_urls_are_added_incrementally(self):
+        ShortCodeBloomFilterService.rebuild()
+
+        url, _ = UrlShorteningService.shorten(
+            user=AnonymousUser(),
+            client_ip='9.9.9.9',
+            url_object=Url(original_url='https://new.com'),
+            is_direct=True,
+            is_permanent=False,
+        )
+
+        self.assertTrue(ShortCodeBloomFilterService.might_contain(url.short_code))
+
+    def test_urls_created_outside_the_shortening_service_are_added(self):
+        ShortCodeBloomFilterService.rebuild()
+
+        url = Url.objects.create(original_url='https://admin.com')
+        UrlMetadata.objects.create(url=url, is_direct=True)
+
+        self.assertTrue(ShortCodeBloomFilterService.might_contain(url.short_code))
+        self.assertIsNotNone(ShortCodeResolverService.resolve(url.short_code))
+
+    def test_add_does_not_create_partial_filter(self):
+        ShortCodeBloomFilterService.add('orphan')
+
+        self.assertFalse(self.redis.exists(ShortCodeBloomFilterService.key()))
+
+    def test_add_during_rebuild_reaches_new_filter(self):
+        building = f'{ShortCodeBloomFilterService.key()}:building'
+        self.redis.set(ShortCodeBloomFilterService.BUILDING_KEY, building)
+
+        ShortCodeBloomFilterService.add('fresh')
+
+        self.redis.rename(building, ShortCodeBloomFilterService.key())
+        self.assertTrue(ShortCodeBloomFilterService.might_contain('fresh'))
+
+    def test_rebuild_recovers_codes_committed_after_the_scan(self):
+        set_bits = ShortCodeBloomFilterService._set_bits
+        late = []
+
+        def commit_during_rebuild(*args):
+            # Encurtamento cujo add() foi antes do BUILDING_KEY e o commit depois do snapshot.
+            if not late:
+                late.append(Url.objects.create(original_url='https://late.com'))
+            return set_bits(*args)
+
+        with patch.object(ShortCodeBloomFilterService, '_set_bits', side_effect=commit_during_rebuild):
+            ShortCodeBloomFilterService.rebuild()
+
+        self.assertTrue(ShortCodeBloomFilterService.might_contain(late[0].short_code))
+
+    def test_failed_rebuild_discards_partial_filter(self):
+        building = f'{ShortCodeBloomFilterService.key()}:building'
+
+        with patch.object(ShortCodeBloomFilterService, '_set_bits', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                ShortCodeBloomFilterService.rebuild()
+
+        self.assertFalse(self.redis.exists(building))
+        self.assertFalse(self.redis.exists(ShortCodeBloomFilterService.BUILDING_KEY))
+
+    def test_false_positives_are_measured(self):
+        ghost = ShortCodeService.encode(999998)
+        ShortCodeBloomFilterService.rebuild()
+        ShortCodeBloomFilterService.add(ghost)
+
+        self.assertIsNone(ShortCodeResolverService.resolve(ghost))
+        self.assertIsNone(ShortCodeResolverService.resolve(ShortCodeService.encode(999999)))
+
+        stats = ShortCodeBloomFilterService.stats()
+        self.assertEqual(stats['false_positives'], 1)
+        self.assertEqual(stats['false_positive_rate'], 0.5)
+
+    def test_rebuild_command(self):
+        stdout = Mock()
+        call_command('rebuild_short_code_filter', stdout=stdout)
+
+        self.assertTrue(ShortCodeBloomFilterService.might_contain(self.url.short_code))
+
+
+class ShortCodeValidationTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        cache.clear()
+        ShortCodeResolverService.clear_local_cache()
+
+    def test_accepts_canonical_hashids(self):
+        code = ShortCodeService.encode(12345)
+
+        self.assertTrue(ShortCodeService.is_valid(code))
+        self.assertEqual(ShortCodeService.decode(code), 12345)
+
+    def test_rejects_malformed_codes(self):
+        code = ShortCodeService.encode(12345)
+        tampered = code[:-1] + ('a' if code[-1] != 'a' else 'b')
+
+        for value in ['', 'abc', 'wp-admin', 'a' * 9, '../etc', tampered]:
+            with self.subTest(value=value):
+                self.assertFalse(ShortCodeService.is_valid(value))
+
+    def test_length_bound_follows_the_model_field(self):
+        self.assertEqual(ShortCodeService.max_length(), Url._meta.get_field('short_code').max_length)
+        self.assertFalse(ShortCodeService.is_valid('a' * (ShortCodeService.max_length() + 1)))
+
+    def test_min_length_above_field_fails_system_check(self):
+        with override_settings(SHORT_CODE_MIN_LENGTH=ShortCodeService.max_length() + 1):
+            errors = short_code_length_check(None)
+
+        self.assertEqual([error.id for error in errors], ['converter.E001'])
+
+    def test_rejects_multi_value_hashids(self):
+        self.assertFalse(ShortCodeService.is_valid(ShortCodeService._hashids.encode(1, 2)))
+
+    def test_accepts_legacy_hex_codes(self):
+        self.assertTrue(ShortCodeService.is_valid('0a1b2c3d'))
+
+        with override_settings(SHORT_CODE_ALLOW_LEGACY=False):
+            self.assertFalse(ShortCodeService.is_valid('0a1b2c3d'))
+
+    def test_resolver_rejects_invalid_code_without_io(self):
+        with patch('apps.converter.services.resolver_service.cache') as shared_cache:
+            with self.assertNumQueries(0):
+                self.assertIsNone(ShortCodeResolverService.resolve('wp-login'))
+
+        shared_cache.get.assert_not_called()
+
+    def test_resolver_resolves_legacy_code(self):
+        url = Url.objects.create(original_url='https://legacy.com', short_code='0a1b2c3d')
+        UrlMetadata.objects.create(url=url)
+
+        self.assertEqual(ShortCodeResolverService.resolve('0a1b2c3d').original_url, 'https://legacy.com')
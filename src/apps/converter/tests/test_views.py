@@ -1,12 +1,32 @@
+import asyncio
+import json
+import time
 from datetime import timedelta
+from unittest.mock import patch
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.cache import SessionStore
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.http import Http404
+from django.test import AsyncRequestFactory, Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 
+from apps.account.services.api_token_service import ApiTokenService
 from apps.common.utils import CommonUtils
 from apps.converter.models import AccessEvent, Url, UrlMetadata
+from apps.converter.services.access_event_service import AccessEventService
+from apps.converter.services.interstitial_service import InterstitialTokenService
+from apps.converter.services.qr_service import QrCodeService
+from apps.converter.services.resolver_service import ShortCodeResolverService
+from apps.converter.tasks import purge_qr_codes, render_qr_codes
+from apps.converter.views import AsyncMiddleView, BulkShortenView
 
 User = get_user_model()
 
@@ -37,6 +57,16 @@ def _make_url(user, original_url='https://example.com', is_permanent=False, is_d
 class QrCodeImageViewTests(TestCase):
     def setUp(self):
         CommonUtils().disable_welcome_signal()
+        cache.clear()
+        settings_patcher = override_settings(
+            DOMAIN='testserver',
+            STORAGES={
+                **settings.STORAGES,
+                'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'},
+            },
+        )
+        settings_patcher.enable()
+        self.addCleanup(settings_patcher.disable)
         self.client = Client()
         self.owner = User.objects.create_user(username='owner', email='owner@test.com', password='pass')
         self.other = User.objects.create_user(username='other', email='other@test.com', password='pass')
@@ -92,6 +122,100 @@ class QrCodeImageViewTests(TestCase):
         )
         self.assertEqual(response.status_code, 404)
 
+    def test_rendered_once_and_served_from_storage(self):
+        self.client.force_login(self.owner)
+        qr_url = reverse('converter:url-qr', kwargs={'short_code': self.url.short_code})
+
+        with patch.object(QrCodeService, 'render', wraps=QrCodeService.render) as render:
+            first = self.client.get(qr_url)
+            cache.clear()
+            second = self.client.get(qr_url)
+
+        render.assert_called_once()
+        self.assertEqual(first.content, second.content)
+
+    def test_strong_etag_returns_304(self):
+        self.client.force_login(self.owner)
+        qr_url = reverse('converter:url-qr', kwargs={'short_code': self.url.short_code})
+        etag = self.client.get(qr_url)['ETag']
+
+        with patch.object(QrCodeService, 'get') as get:
+            response = self.client.get(qr_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(etag.startswith('W/'))
+        get.assert_not_called()
+
+    def test_if_none_match_is_parsed_as_a_list(self):
+        self.client.force_login(self.owner)
+        qr_url = reverse('converter:url-qr', kwargs={'short_code': self.url.short_code})
+        etag = self.client.get(qr_url)['ETag']
+
+        for header, status in [
+            (f'"other", W/{etag}', 304),
+            ('*', 304),
+            (f'"x{etag[1:-1]}x"', 200),
+        ]:
+            with self.subTest(header=header):
+                self.assertEqual(self.client.get(qr_url, HTTP_IF_NONE_MATCH=header).status_code, status)
+
+    def test_svg_and_sizes(self):
+        self.client.force_login(self.owner)
+        svg = self.client.get(reverse('converter:url-qr-svg', kwargs={'short_code': self.url.short_code}))
+        qr_url = reverse('converter:url-qr', kwargs={'short_code': self.url.short_code})
+        small = self.client.get(qr_url, {'size': 'sm'})
+        large = self.client.get(qr_url, {'size': 'lg'})
+
+        self.assertEqual(svg['Content-Type'], 'image/svg+xml')
+        self.assertIn(b'<svg', svg.content)
+        self.assertLess(len(small.content), len(large.content))
+        self.assertNotEqual(small['ETag'], large['ETag'])
+        self.assertEqual(self.client.get(qr_url, {'size': 'xl'}).status_code, 404)
+
+    def test_prerender_task_fills_storage(self):
+        render_qr_codes([self.url.short_code])
+        self.client.force_login(self.owner)
+
+        with patch.object(QrCodeService, 'render') as render:
+            response = self.client.get(
+                reverse('converter:url-qr-svg', kwargs={'short_code': self.url.short_code})
+            )
+
+        render.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(DOMAIN='sh0rtly.com', ALLOWED_HOSTS=['shortly'])
+    def test_view_and_prerender_share_storage_key_behind_proxy(self):
+        QrCodeService.prerender(self.url.short_code)
+        cache.clear()
+        self.client.force_login(self.owner)
+
+        with patch.object(QrCodeService, 'render') as render:
+            response = self.client.get(
+                reverse('converter:url-qr', kwargs={'short_code': self.url.short_code}),
+                HTTP_HOST='shortly:8000',
+            )
+
+        render.assert_not_called()
+        data = QrCodeService.short_url(self.url.short_code, 'https://sh0rtly.com/')
+        self.assertEqual(
+            response['ETag'], f'"{QrCodeService.digest(data, QrCodeService.DEFAULT_SIZE, "png")}"'
+        )
+
+    def test_delete_purges_rendered_images(self):
+        QrCodeService.prerender(self.url.short_code)
+        data = QrCodeService.short_url(self.url.short_code, 'https://testserver/')
+        path = QrCodeService.path(QrCodeService.digest(data, QrCodeService.DEFAULT_SIZE, 'png'), 'png')
+        self.assertTrue(default_storage.exists(path))
+        self.client.force_login(self.owner)
+
+        with patch.object(purge_qr_codes, 'delay', side_effect=purge_qr_codes):
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('delete_link', kwargs={'url_id': self.url.id}))
+
+        self.assertFalse(default_storage.exists(path))
+
 
 class UrlDetailViewTests(TestCase):
     def setUp(self):
@@ -171,3 +295,284 @@ class UrlDetailViewTests(TestCase):
         self.client.force_login(self.owner)
         response = self.client.get(self._detail_url())
         self.assertIn(self.url.short_code, response.context['short_url'])
+
+
+class MiddleViewTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        cache.clear()
+        ShortCodeResolverService.clear_local_cache()
+        self.client = Client()
+        self.owner = User.objects.create_user(username='owner', email='owner@test.com', password='pass')
+
+    def _redirect_url(self, url):
+        return reverse('converter:url-redirect', kwargs={'short_code': url.short_code})
+
+    def test_direct_url_redirects_and_tracks_access(self):
+        url = _make_url(self.owner, is_direct=True)
+        response = self.client.get(self._redirect_url(url))
+
+        self.assertRedirects(response, 'https://example.com', fetch_redirect_response=False)
+        self.assertEqual(AccessEvent.objects.filter(url=url).count(), 1)
+
+    def test_non_direct_url_renders_interstitial(self):
+        url = _make_url(self.owner)
+        response = self.client.get(self._redirect_url(url))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'converter/middle.html')
+        self.assertNotIn(settings.SESSION_COOKIE_NAME, response.cookies)
+
+    def test_confirm_redirect_requires_wait(self):
+        url = _make_url(self.owner, original_url='https://target.com')
+        confirm_url = self.client.get(self._redirect_url(url)).context['redirect_url']
+
+        self.assertEqual(self.client.get(confirm_url).status_code, 403)
+
+        later = time.time() + InterstitialTokenService.wait_seconds()
+        with patch('apps.converter.services.interstitial_service.time.time', return_value=later):
+            response = self.client.get(confirm_url)
+
+        self.assertRedirects(response, 'https://target.com', fetch_redirect_response=False)
+
+    def test_confirm_redirect_rejects_tampered_token(self):
+        token = InterstitialTokenService.issue('https://target.com', now=0)
+
+        response = self.client.get(
+            reverse('converter:confirm-redirect'), {'token': token[:-1] + 'x'}
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(INTERSTITIAL_TOKEN_MAX_AGE=60)
+    def test_confirm_redirect_rejects_expired_token(self):
+        token = InterstitialTokenService.issue('https://target.com')
+
+        with patch('django.core.signing.time.time', return_value=time.time() + 120):
+            response = self.client.get(reverse('converter:confirm-redirect'), {'token': token})
+
+        self.assertEqual(response.status_code, 403)
+
+    def test_unknown_code_returns_404(self):
+        response = self.client.get(
+            reverse('converter:url-redirect', kwargs={'short_code': 'nonexist'})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_update_invalidates_cached_redirect(self):
+        url = _make_url(self.owner, is_direct=True)
+        self.client.get(self._redirect_url(url))
+
+        self.client.force_login(self.owner)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('update_link', kwargs={'url_id': url.id}),
+                data='{"original_url": "https://changed.com"}',
+                content_type='application/json',
+            )
+
+        response = self.client.get(self._redirect_url(url))
+        self.assertRedirects(response, 'https://changed.com', fetch_redirect_response=False)
+
+    def test_admin_edits_invalidate_cached_redirect(self):
+        url = _make_url(self.owner, is_direct=True)
+        self.client.get(self._redirect_url(url))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            url.original_url = 'https://admin.com'
+            url.save()
+        response = self.client.get(self._redirect_url(url))
+        self.assertRedirects(response, 'https://admin.com', fetch_redirect_response=False)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            metadata = UrlMetadata.objects.get(url=url)
+            metadata.is_direct = False
+            metadata.save()
+        self.assertEqual(self.client.get(self._redirect_url(url)).status_code, 200)
+
+    def test_deleted_url_stops_redirecting(self):
+        url = _make_url(self.owner, is_direct=True)
+        self.client.get(self._redirect_url(url))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Url.objects.get(pk=url.pk).delete()
+
+        self.assertEqual(self.client.get(self._redirect_url(url)).status_code, 404)
+
+
+class AsyncMiddleViewTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        cache.clear()
+        ShortCodeResolverService.clear_local_cache()
+        self.owner = User.objects.create_user(username='owner', email='owner@test.com', password='pass')
+        self.direct = _make_url(self.owner, is_direct=True)
+        self.middle = _make_url(self.owner, original_url='https://middle.com')
+        self.view = AsyncMiddleView.as_view()
+
+    async def _get(self, short_code):
+        request = AsyncRequestFactory().get(f'/{short_code}/')
+        request.session = SessionStore()
+        request.user = AnonymousUser()
+
+        with patch.object(AccessEventService, 'track') as track:
+            response = await self.view(request, short_code=short_code)
+            await asyncio.gather(*AccessEventService._background_tasks)
+
+        return request, response, track
+
+    async def test_direct_url_redirects_and_tracks_in_background(self):
+        _, response, track = await self._get(self.direct.short_code)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], 'https://example.com')
+        track.assert_called_once()
+        self.assertEqual(track.call_args.args[1], str(self.direct.id))
+
+    async def test_non_direct_url_renders_interstitial(self):
+        request, response, _ = await self._get(self.middle.short_code)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'redirect/confirm/?token=')
+        self.assertFalse(request.session.modified)
+
+    async def test_unknown_code_returns_404(self):
+        with self.assertRaises(Http404):
+            await self._get('nonexist')
+
+    async def test_resolution_is_cached(self):
+        await self._get(self.direct.short_code)
+        ShortCodeResolverService.clear_local_cache()
+
+        with patch.object(ShortCodeResolverService, '_queryset') as queryset:
+            _, response, _ = await self._get(self.direct.short_code)
+
+        queryset.assert_not_called()
+        self.assertEqual(response.status_code, 302)
+
+
+class BulkShortenViewTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.client = Client()
+        self.user = User.objects.create_user(username='owner', email='owner@test.com', password='pass')
+        self.user.wallet.balance = 1000
+        self.user.wallet.save()
+        self.client.force_login(self.user)
+
+    def _post(self, payload):
+        return self.client.post(
+            reverse('converter:bulk-shorten'),
+            data=json.dumps(payload),
+            content_type='application/json',
+        )
+
+    def test_creates_all_urls_with_a_single_debit(self):
+        response = self._post({
+            'urls': [f'https://example.com/{index}' for index in range(20)],
+            'is_direct': True,
+        })
+        body = json.loads(b''.join(response.streaming_content))
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(body['count'], 20)
+        self.assertEqual(len({url['short_code'] for url in body['urls']}), 20)
+        self.assertEqual(Url.objects.filter(created_by=self.user, metadata__is_direct=True).count(), 20)
+        self.assertEqual(self.user.wallet.transactions.count(), 1)
+
+        self.user.wallet.refresh_from_db()
+        self.assertEqual(self.user.wallet.balance, 1000 - 40)
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        self._post({'urls': ['https://warmup.com']})
+
+        with CaptureQueriesContext(connection) as small:
+            self._post({'urls': ['https://example.com/a']})
+        with CaptureQueriesContext(connection) as large:
+            self._post({'urls': [f'https://example.com/{index}' for index in range(50)]})
+
+        self.assertEqual(len(small), len(large))
+
+    def test_insufficient_balance_creates_nothing(self):
+        self.user.wallet.balance = 1
+        self.user.wallet.save()
+
+        response = self._post({'urls': ['https://a.com', 'https://b.com']})
+
+        self.assertEqual(response.status_code, 402)
+        self.assertFalse(Url.objects.exists())
+
+    def test_invalid_urls_are_reported_by_index(self):
+        response = self._post({'urls': ['https://ok.com', 'not a url', {'original_url': ''}]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error['index'] for error in response.json()['errors']], [1, 2])
+        self.assertFalse(Url.objects.exists())
+
+    @override_settings(BULK_SHORTEN_MAX_URLS=2)
+    def test_rejects_oversized_batches_before_validating_items(self):
+        with patch.object(BulkShortenView, '_parse_items') as parse_items:
+            response = self._post({'urls': ['https://a.com', 'https://b.com', 'https://c.com']})
+
+        self.assertEqual(response.status_code, 413)
+        parse_items.assert_not_called()
+
+    def test_flags_must_be_json_booleans(self):
+        response = self._post({'urls': ['https://a.com'], 'is_direct': 'false'})
+        self.assertEqual(response.status_code, 400)
+
+        response = self._post({'urls': ['https://a.com', {'original_url': 'https://b.com', 'is_permanent': 0}]})
+        self.assertEqual([error['index'] for error in response.json()['errors']], [1])
+        self.assertFalse(Url.objects.exists())
+
+    def test_other_validation_errors_are_not_reported_as_balance(self):
+        with patch(
+            'apps.converter.views.UrlShorteningService.shorten_bulk',
+            side_effect=ValidationError('Plano inválido.'),
+        ):
+            response = self._post({'urls': ['https://a.com']})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'errors': [{'error': 'Plano inválido.'}]})
+
+    def test_requires_authentication(self):
+        self.client.logout()
+        response = self._post({'urls': ['https://a.com']})
+        self.assertEqual(response.status_code, 403)
+
+    def test_accepts_api_token_without_session_or_csrf(self):
+        _, raw_token = ApiTokenService.issue(self.user, 'ci')
+        client = Client(enforce_csrf_checks=True)
+
+        response = client.post(
+            reverse('converter:bulk-shorten'),
+            data=json.dumps({'urls': ['https://a.com']}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {raw_token}',
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Url.objects.get().created_by, self.user)
+
+    def test_rejects_invalid_api_token(self):
+        response = Client().post(
+            reverse('converter:bulk-shorten'),
+            data=json.dumps({'urls': ['https://a.com']}),
+            content_type='application/json',
+            HTTP_AUTHORIZATION='Bearer invalid',
+        )
+
+        self.assertEqual(response.status_code, 401)
+
+    def test_session_requests_still_require_csrf(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+
+        response = client.post(
+            reverse('converter:bulk-shorten'),
+            data=json.dumps({'urls': ['https://a.com']}),
+            content_type='application/json',
+        )
+
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Url.objects.exists())
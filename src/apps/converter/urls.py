@@ -1,13 +1,26 @@
+from django.conf import settings
 from django.urls import path
 
-from .views import ConfirmRedirectView, HomeView, MiddleView, QrCodeImageView, UrlDetailView
+from .views import (
+    AsyncMiddleView,
+    BulkShortenView,
+    ConfirmRedirectView,
+    HomeView,
+    MiddleView,
+    QrCodeImageView,
+    UrlDetailView,
+)
 
 app_name = "converter"
 
+RedirectView = AsyncMiddleView if settings.ASYNC_REDIRECT_VIEW else MiddleView
+
 urlpatterns = [
     path('', HomeView.as_view(), name='home'),
     path('url/<str:short_code>/', UrlDetailView.as_view(), name='url-detail'),
     path('url/<str:short_code>/qr.png', QrCodeImageView.as_view(), name='url-qr'),
+    path('url/<str:short_code>/qr.svg', QrCodeImageView.as_view(), {'fmt': 'svg'}, name='url-qr-svg'),
+    path('api/shorten/bulk/', BulkShortenView.as_view(), name='bulk-shorten'),
     path('redirect/confirm/', ConfirmRedirectView.as_view(), name='confirm-redirect'),
-    path('<str:short_code>/', MiddleView.as_view(), name='url-redirect'),
+    path('<str:short_code>/', RedirectView.as_view(), name='url-redirect'),
 ]
@@ -1,27 +1,40 @@
-import io
 import json
-import secrets
 
-import qrcode
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.exceptions import ValidationError
+from django.core.validators import URLValidator
 from django.db import models
 from django.db.models import Count
-from django.http import Http404, HttpResponse, HttpResponseForbidden
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseForbidden,
+    JsonResponse,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import urlencode
 from django.utils.safestring import mark_safe
 from django.utils.translation import gettext_lazy as translate
 from django.views import View
 
+from apps.account.mixins import ApiTokenOrLoginRequiredMixin
+from apps.converter.dto import BulkUrlItemDTO
 from apps.converter.enums import AnonymousLimitExceeded, PricingRule
 from apps.converter.forms import UrlForm
 from apps.converter.models import Url, UrlMetadata
 from apps.converter.services.access_event_service import AccessEventService
+from apps.converter.services.interstitial_service import InterstitialTokenService
 from apps.converter.services.pricing_service import PricingService
+from apps.converter.services.qr_service import QrCodeService
+from apps.converter.services.resolver_service import ShortCodeResolverService
 from apps.converter.services.shortening_service import ShortenResult, UrlShorteningService
 from apps.converter.utils import UserRequestUtil
 from apps.notification.models import Announcement
@@ -31,42 +44,58 @@ user_request_util = UserRequestUtil()
 
 class MiddleView(View):
     def get(self, request, short_code) -> HttpResponse:
-        url = get_object_or_404(Url, short_code=short_code)
-        metadata = get_object_or_404(UrlMetadata, url=url)
-        AccessEventService.track(request, url)
+        resolved = ShortCodeResolverService.resolve(short_code)
+        if resolved is None:
+            raise Http404
 
-        if metadata.is_direct:
-            return redirect(url.original_url)
+        AccessEventService.track(request, resolved.url_id)
 
-        token = secrets.token_urlsafe(16)
-        request.session[f"token_{token}"] = {
-            "timestamp": timezone.now().timestamp(),
-            "target_url": url.original_url,
-        }
+        if resolved.is_direct:
+            return redirect(resolved.original_url)
+
+        return self.interstitial(request, resolved)
+
+    @staticmethod
+    def interstitial(request, resolved) -> HttpResponse:
+        token = InterstitialTokenService.issue(resolved.original_url)
 
         return render(
             request,
             "converter/middle.html",
             {
-                "redirect_url": reverse("converter:confirm-redirect") + f"?token={token}",
+                "redirect_url": reverse("converter:confirm-redirect") + f"?{urlencode({'token': token})}",
+                "wait_seconds": InterstitialTokenService.wait_seconds(),
             },
         )
 
 
+class AsyncMiddleView(View):
+    async def get(self, request, short_code) -> HttpResponse:
+        resolved = await ShortCodeResolverService.aresolve(short_code)
+        if resolved is None:
+            raise Http404
+
+        AccessEventService.track_in_background(request, resolved.url_id)
+
+        if resolved.is_direct:
+            return redirect(resolved.original_url)
+
+        return await sync_to_async(MiddleView.interstitial)(request, resolved)
+
+
 class ConfirmRedirectView(View):
     def get(self, request):
-        token = request.GET.get("token")
-        data = request.session.get(f"token_{token}")
+        data = InterstitialTokenService.load(request.GET.get("token"))
 
         if not data:
             return HttpResponseForbidden("Token inválido")
 
-        now = timezone.now().timestamp()
-        if now - data["timestamp"] < 5:
-            return HttpResponseForbidden("Aguarde 5 segundos")
+        if InterstitialTokenService.remaining(data) > 0:
+            return HttpResponseForbidden(
+                f"Aguarde {InterstitialTokenService.wait_seconds()} segundos"
+            )
 
-        del request.session[f"token_{token}"]
-        return redirect(data["target_url"])
+        return redirect(data["u"])
 
 
 class HomeView(View):
@@ -133,7 +162,7 @@ class HomeView(View):
             url, result = UrlShorteningService.shorten(
                 user=request.user,
                 client_ip=client_ip,
-                url_object=form.save(commit=True),
+                url_object=form.save(commit=False),
                 is_direct=form.cleaned_data["is_direct"],
                 is_permanent=form.cleaned_data["is_permanent"],
                 create_new=request.POST.get("create_new") == "true"
@@ -171,8 +200,6 @@ class HomeView(View):
         short_url = request.build_absolute_uri(
             f"/{url.short_code}").replace("http", "https")
 
-        metadata = UrlMetadata.objects.filter(url=url).first()
-
         messages.success(
             request,
             mark_safe(
@@ -180,8 +207,8 @@ class HomeView(View):
                     "converter/includes/url_created.html",
                     {
                         "short_url": short_url,
-                        "is_direct": metadata.is_direct,
-                        "is_permanent": metadata.is_permanent,
+                        "is_direct": url.metadata.is_direct,
+                        "is_permanent": url.metadata.is_permanent,
                     },
                 )
             ),
@@ -189,14 +216,98 @@ class HomeView(View):
         return redirect("converter:home")
 
 
-def _generate_qr_png(data: str) -> bytes:
-    qr = qrcode.QRCode(version=1, box_size=10, border=4)
-    qr.add_data(data)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="#18181b", back_color="white")
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    return buf.getvalue()
+class BulkShortenView(ApiTokenOrLoginRequiredMixin, View):
+    FLAGS = ("is_direct", "is_permanent")
+
+    def post(self, request):
+        try:
+            data = json.loads(request.body)
+        except json.JSONDecodeError:
+            return JsonResponse({"error": "JSON inválido."}, status=400)
+
+        if not isinstance(data, dict) or not isinstance(data.get("urls"), list):
+            return JsonResponse({"errors": [{"error": "Campo urls é obrigatório."}]}, status=400)
+
+        # Antes de validar item a item: um corpo grande demais não deve ser processado.
+        max_urls = getattr(settings, "BULK_SHORTEN_MAX_URLS", 5000)
+        if len(data["urls"]) > max_urls:
+            return JsonResponse(
+                {"error": f"Máximo de {max_urls} URLs por requisição."}, status=413
+            )
+
+        items, errors = self._parse_items(data)
+        if errors:
+            return JsonResponse({"errors": errors}, status=400)
+
+        try:
+            urls = UrlShorteningService.shorten_bulk(
+                user=request.user,
+                client_ip=user_request_util.get_client_ip(request),
+                items=items,
+            )
+        except ValidationError as e:
+            if e.code == "insufficient_balance":
+                return JsonResponse({"error": "Saldo insuficiente."}, status=402)
+            return JsonResponse({"errors": [{"error": message} for message in e.messages]}, status=400)
+
+        base_url = request.build_absolute_uri("/").replace("http://", "https://")
+
+        def stream():
+            yield f'{{"count": {len(urls)}, "urls": ['
+            for index, url in enumerate(urls):
+                prefix = "," if index else ""
+                yield prefix + json.dumps({
+                    "original_url": url.original_url,
+                    "short_code": url.short_code,
+                    "short_url": f"{base_url}{url.short_code}",
+                    "is_direct": url.metadata.is_direct,
+                    "is_permanent": url.metadata.is_permanent,
+                })
+            yield "]}"
+
+        return StreamingHttpResponse(stream(), content_type="application/json", status=201)
+
+    @staticmethod
+    def _flags(source: dict, defaults: dict) -> dict | None:
+        # Só booleanos JSON: bool("false") seria True.
+        flags = {name: source.get(name, defaults[name]) for name in BulkShortenView.FLAGS}
+        if not all(isinstance(value, bool) for value in flags.values()):
+            return None
+        return flags
+
+    @staticmethod
+    def _parse_items(data):
+        defaults = BulkShortenView._flags(data, dict.fromkeys(BulkShortenView.FLAGS, False))
+        if defaults is None:
+            return [], [{"error": "is_direct e is_permanent devem ser booleanos."}]
+
+        validator = URLValidator()
+        items, errors = [], []
+
+        for index, entry in enumerate(data["urls"]):
+            if isinstance(entry, str):
+                entry = {"original_url": entry}
+            if not isinstance(entry, dict):
+                errors.append({"index": index, "error": "Item inválido."})
+                continue
+
+            original_url = str(entry.get("original_url", "")).strip()
+            try:
+                if len(original_url) > Url._meta.get_field("original_url").max_length:
+                    raise ValidationError("URL muito longa.")
+                validator(original_url)
+            except ValidationError:
+                errors.append({"index": index, "error": "URL inválida."})
+                continue
+
+            flags = BulkShortenView._flags(entry, defaults)
+            if flags is None:
+                errors.append({"index": index, "error": "is_direct e is_permanent devem ser booleanos."})
+                continue
+
+            items.append(BulkUrlItemDTO(original_url=original_url, **flags))
+
+        return items, errors
 
 
 class UrlDetailView(LoginRequiredMixin, View):
@@ -208,7 +319,7 @@ class UrlDetailView(LoginRequiredMixin, View):
             raise Http404
 
         metadata = UrlMetadata.objects.filter(url=url).first()
-        events = url.accessevent_set.all()
+        events = url.accessevent_set.filter(created_at__gte=url.created_at)
 
         total_clicks = events.count()
         unique_visitors = events.values("ip_address").distinct().count()
@@ -253,15 +364,27 @@ class UrlDetailView(LoginRequiredMixin, View):
 class QrCodeImageView(LoginRequiredMixin, View):
     login_url = "/account/login/"
 
-    def get(self, request, short_code):
+    def get(self, request, short_code, fmt="png"):
+        size = request.GET.get("size", QrCodeService.DEFAULT_SIZE)
+        if size not in QrCodeService.SIZES or fmt not in QrCodeService.FORMATS:
+            raise Http404
+
         url = get_object_or_404(Url, short_code=short_code)
         if url.created_by != request.user:
             raise Http404
 
-        short_url = request.build_absolute_uri(
-            f"/{url.short_code}/").replace("http://", "https://")
-        png = _generate_qr_png(short_url)
-        response = HttpResponse(png, content_type="image/png")
-        response["Content-Disposition"] = f'inline; filename="qr-{short_code}.png"'
+        data = QrCodeService.short_url(url.short_code, QrCodeService.base_url(request))
+        etag = f'"{QrCodeService.digest(data, size, fmt)}"'
+
+        # Trata "*", validadores fracos (W/) e listas como o ConditionalGetMiddleware
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                QrCodeService.get(data, size, fmt),
+                content_type=QrCodeService.FORMATS[fmt],
+            )
+            response["Content-Disposition"] = f'inline; filename="qr-{short_code}.{fmt}"'
+
+        response["ETag"] = etag
         response["Cache-Control"] = "private, max-age=3600"
         return response
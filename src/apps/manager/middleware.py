@@ -0,0 +1,122 @@
+import heapq
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from apps.manager.services.monitoring.query_stats_service import QueryStatsService
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCollector:
+    def __init__(self, keep: int = 3):
+        self.keep = keep
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.count += 1
+            self.duration += elapsed
+
+            entry = (elapsed, sql[:300])
+            if len(self.slowest) < self.keep:
+                heapq.heappush(self.slowest, entry)
+            else:
+                heapq.heappushpop(self.slowest, entry)
+
+    def top(self) -> list[tuple[str, float]]:
+        return [(sql, elapsed) for elapsed, sql in sorted(self.slowest, reverse=True)]
+
+
+class QueryInstrumentationMiddleware:
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_INSTRUMENTATION_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        collector = QueryCollector()
+        started = time.perf_counter()
+
+        with connection.execute_wrapper(collector):
+            response = self.get_response(request)
+
+        stats = self._report(request, response, collector, started)
+        if stats:
+            QueryStatsService.record(**stats)
+
+        return response
+
+    async def __acall__(self, request):
+        # A conexão é por thread: o wrapper precisa ser registrado na thread
+        # onde o sync_to_async (thread_sensitive) executa o ORM desta requisição
+        collector = QueryCollector()
+        started = time.perf_counter()
+        wrappers = ExitStack()
+
+        await sync_to_async(self._install)(wrappers, collector)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(wrappers.close)()
+
+        stats = self._report(request, response, collector, started)
+        if stats:
+            await sync_to_async(QueryStatsService.record, thread_sensitive=False)(**stats)
+
+        return response
+
+    @staticmethod
+    def _install(wrappers: ExitStack, collector: QueryCollector) -> None:
+        wrappers.enter_context(connection.execute_wrapper(collector))
+
+    def _report(self, request, response, collector, started) -> dict | None:
+        total_ms = (time.perf_counter() - started) * 1000
+        endpoint = self._endpoint(request)
+        slow_ms = getattr(settings, "QUERY_SLOW_MS", 100)
+
+        for sql, elapsed in collector.top():
+            if elapsed >= slow_ms:
+                logger.warning(f"[QUERY] Consulta lenta | endpoint={endpoint} ms={elapsed:.1f} sql={sql}")
+
+        if settings.DEBUG:
+            response["X-DB-Query-Count"] = str(collector.count)
+            response["X-DB-Time-Ms"] = f"{collector.duration:.2f}"
+            response["X-Request-Time-Ms"] = f"{total_ms:.2f}"
+
+        if random.random() >= getattr(settings, "QUERY_STATS_SAMPLE_RATE", 1.0):
+            return None
+
+        return {
+            "endpoint": endpoint,
+            "queries": collector.count,
+            "db_ms": collector.duration,
+            "total_ms": total_ms,
+            "slowest": collector.top(),
+        }
+
+    @staticmethod
+    def _endpoint(request) -> str:
+        match = getattr(request, "resolver_match", None)
+        view_name = match.view_name if match else "unresolved"
+        return f"{request.method} {view_name}"
@@ -0,0 +1,109 @@
+import logging
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+from apps.security.services import RedisConnectionService
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStatsService:
+    KEY_PREFIX = "manager:query_stats"
+    FIELDS = ("requests", "queries", "db_ms", "total_ms")
+
+    @staticmethod
+    def _bucket_seconds() -> int:
+        return getattr(settings, "QUERY_STATS_BUCKET_SECONDS", 300)
+
+    @staticmethod
+    def _window_seconds() -> int:
+        return getattr(settings, "QUERY_STATS_WINDOW_SECONDS", 3600)
+
+    @staticmethod
+    def _buckets(now: float) -> list[int]:
+        size = QueryStatsService._bucket_seconds()
+        current = int(now // size)
+        count = max(1, QueryStatsService._window_seconds() // size)
+        return [current - offset for offset in range(count)]
+
+    @staticmethod
+    def _keys(bucket: int) -> tuple[str, str, str]:
+        prefix = f"{QueryStatsService.KEY_PREFIX}:{bucket}"
+        return f"{prefix}:endpoints", f"{prefix}:max", f"{prefix}:statements"
+
+    @staticmethod
+    def record(endpoint: str, *, queries: int, db_ms: float, total_ms: float, slowest=(), now=None) -> None:
+        bucket = QueryStatsService._buckets(now or time.time())[0]
+        endpoints_key, max_key, statements_key = QueryStatsService._keys(bucket)
+        ttl = QueryStatsService._window_seconds() + QueryStatsService._bucket_seconds()
+
+        try:
+            client = RedisConnectionService.get_redis_client()
+            with client.pipeline(transaction=False) as pipe:
+                pipe.hincrby(endpoints_key, f"{endpoint}|requests", 1)
+                pipe.hincrby(endpoints_key, f"{endpoint}|queries", queries)
+                pipe.hincrbyfloat(endpoints_key, f"{endpoint}|db_ms", round(db_ms, 3))
+                pipe.hincrbyfloat(endpoints_key, f"{endpoint}|total_ms", round(total_ms, 3))
+                pipe.zadd(max_key, {endpoint: round(total_ms, 3)}, gt=True)
+                for sql, duration in slowest:
+                    pipe.zadd(statements_key, {f"{endpoint}|{sql}": round(duration, 3)}, gt=True)
+                for key in (endpoints_key, max_key, statements_key):
+                    pipe.expire(key, ttl)
+                pipe.execute()
+        except Exception as e:
+            logger.warning(f"[QUERY STATS] Falha ao registrar métricas | endpoint={endpoint} error={e}")
+
+    @staticmethod
+    def top(limit: int = 10, now=None) -> list[dict]:
+        buckets = QueryStatsService._buckets(now or time.time())
+
+        try:
+            client = RedisConnectionService.get_redis_client()
+            with client.pipeline(transaction=False) as pipe:
+                for bucket in buckets:
+                    endpoints_key, max_key, statements_key = QueryStatsService._keys(bucket)
+                    pipe.hgetall(endpoints_key)
+                    pipe.zrange(max_key, 0, -1, withscores=True)
+                    pipe.zrange(statements_key, 0, -1, withscores=True)
+                results = pipe.execute()
+        except Exception:
+            return []
+
+        totals = defaultdict(lambda: dict.fromkeys(QueryStatsService.FIELDS, 0.0))
+        maximums = defaultdict(float)
+        statements = defaultdict(dict)
+
+        for index in range(0, len(results), 3):
+            endpoints, max_scores, statement_scores = results[index:index + 3]
+
+            for field, value in endpoints.items():
+                endpoint, _, name = field.decode().rpartition("|")
+                totals[endpoint][name] += float(value)
+
+            for endpoint, score in max_scores:
+                endpoint = endpoint.decode()
+                maximums[endpoint] = max(maximums[endpoint], score)
+
+            for member, score in statement_scores:
+                endpoint, _, sql = member.decode().partition("|")
+                statements[endpoint][sql] = max(statements[endpoint].get(sql, 0.0), score)
+
+        rows = []
+        for endpoint, data in totals.items():
+            requests = int(data["requests"]) or 1
+            slowest = sorted(statements[endpoint].items(), key=lambda item: item[1], reverse=True)
+            rows.append({
+                "endpoint": endpoint,
+                "requests": int(data["requests"]),
+                "avg_queries": round(data["queries"] / requests, 1),
+                "avg_db_ms": round(data["db_ms"] / requests, 2),
+                "avg_total_ms": round(data["total_ms"] / requests, 2),
+                "max_total_ms": round(maximums[endpoint], 2),
+                "slowest_sql": slowest[0][0] if slowest else None,
+                "slowest_sql_ms": round(slowest[0][1], 2) if slowest else None,
+            })
+
+        rows.sort(key=lambda row: row["avg_total_ms"], reverse=True)
+        return rows[:limit]
@@ -1,2 +1,106 @@
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, override_settings
+
+from apps.common.tests.mocks.mock_redis import MockRedis
+from apps.common.utils import CommonUtils
+from apps.converter.models import Url
+from apps.manager.middleware import QueryInstrumentationMiddleware
+from apps.manager.services.monitoring.query_stats_service import QueryStatsService
+from apps.security.services import RedisConnectionService
+
+
+class QueryStatsServiceTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.redis = MockRedis()
+        patcher = patch.object(RedisConnectionService, 'get_redis_client', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_top_orders_endpoints_by_average_time(self):
+        QueryStatsService.record('GET fast', queries=1, db_ms=1, total_ms=10, now=1000)
+        QueryStatsService.record('GET slow', queries=4, db_ms=50, total_ms=100, slowest=[('SELECT 1', 40)], now=1000)
+        QueryStatsService.record('GET slow', queries=6, db_ms=70, total_ms=300, slowest=[('SELECT 2', 60)], now=1400)
+
+        rows = QueryStatsService.top(10, now=1400)
+
+        self.assertEqual([row['endpoint'] for row in rows], ['GET slow', 'GET fast'])
+        self.assertEqual(rows[0]['requests'], 2)
+        self.assertEqual(rows[0]['avg_queries'], 5.0)
+        self.assertEqual(rows[0]['avg_total_ms'], 200.0)
+        self.assertEqual(rows[0]['max_total_ms'], 300.0)
+        self.assertEqual(rows[0]['slowest_sql'], 'SELECT 2')
+
+    @override_settings(QUERY_STATS_BUCKET_SECONDS=300, QUERY_STATS_WINDOW_SECONDS=600)
+    def test_top_ignores_buckets_outside_window(self):
+        QueryStatsService.record('GET old', queries=1, db_ms=1, total_ms=10, now=0)
+
+        self.assertEqual(QueryStatsService.top(10, now=1000), [])
+
+    def test_top_fails_safe_when_redis_is_unavailable(self):
+        with patch.object(RedisConnectionService, 'get_redis_client', side_effect=ConnectionError):
+            QueryStatsService.record('GET x', queries=1, db_ms=1, total_ms=1)
+            self.assertEqual(QueryStatsService.top(), [])
+
+
+@override_settings(QUERY_INSTRUMENTATION_ENABLED=True, QUERY_STATS_SAMPLE_RATE=1.0)
+class QueryInstrumentationMiddlewareTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.redis = MockRedis()
+        patcher = patch.object(RedisConnectionService, 'get_redis_client', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _view(request):
+        list(Url.objects.all())
+        list(Url.objects.filter(short_code='abc'))
+        return HttpResponse('ok')
+
+    def test_records_query_count_per_endpoint(self):
+        middleware = QueryInstrumentationMiddleware(self._view)
+
+        with override_settings(DEBUG=True):
+            response = middleware(RequestFactory().get('/'))
+
+        self.assertEqual(response['X-DB-Query-Count'], '2')
+        self.assertIn('X-DB-Time-Ms', response)
+
+        rows = QueryStatsService.top()
+        self.assertEqual(rows[0]['endpoint'], 'GET unresolved')
+        self.assertEqual(rows[0]['avg_queries'], 2.0)
+        self.assertIn('converter_url', rows[0]['slowest_sql'])
+
+    def test_async_chain_stays_async(self):
+        async def view(request):
+            return HttpResponse('ok')
+
+        self.assertTrue(iscoroutinefunction(QueryInstrumentationMiddleware(view)))
+
+    async def test_records_queries_in_async_mode(self):
+        async def view(request):
+            return await sync_to_async(self._view)(request)
+
+        middleware = QueryInstrumentationMiddleware(view)
+
+        with override_settings(DEBUG=True):
+            response = await middleware(AsyncRequestFactory().get('/'))
+
+        self.assertEqual(response['X-DB-Query-Count'], '2')
+        rows = await sync_to_async(QueryStatsService.top)()
+        self.assertEqual(rows[0]['avg_queries'], 2.0)
+
+    def test_headers_are_hidden_outside_debug(self):
+        response = QueryInstrumentationMiddleware(self._view)(RequestFactory().get('/'))
+
+        self.assertNotIn('X-DB-Query-Count', response)
+
+    @override_settings(QUERY_INSTRUMENTATION_ENABLED=False)
+    def test_disabled_by_default(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            QueryInstrumentationMiddleware(self._view)
@@ -6,8 +6,11 @@ from django.utils import timezone
 from django.views import View
 
 from apps.converter.models import AccessEvent, Url
+from apps.converter.services.access_event_buffer_service import AccessEventBufferService
+from apps.converter.services.user_agent_service import UserAgentParserService
 
 from .services.health.system_service import SystemStatusService
+from .services.monitoring.query_stats_service import QueryStatsService
 
 User = get_user_model()
 
@@ -54,5 +57,8 @@ class DashboardView(View):
             ),
         }
         context["system"] = SystemStatusService.get_status()
+        context["access_buffer"] = AccessEventBufferService.stats()
+        context["user_agent_cache"] = UserAgentParserService.stats()
+        context["slow_endpoints"] = QueryStatsService.top(10)
 
         return render(request, 'manager/dashboard.html', context)
@@ -1,2 +1,12 @@
+from django.contrib import admin
 
-# Register your models here.
+from .models import ClickRollup
+
+
+@admin.register(ClickRollup)
+class ClickRollupAdmin(admin.ModelAdmin):
+    list_display = ("url", "bucket", "dimension", "value", "total")
+    list_filter = ("dimension", "bucket")
+    search_fields = ("url__short_code", "value")
+    ordering = ("-bucket",)
+    readonly_fields = ("url", "bucket", "dimension", "value", "total")
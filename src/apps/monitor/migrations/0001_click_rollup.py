@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('converter', '0010_remove_url_sequence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClickRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateField()),
+                ('dimension', models.CharField(choices=[('total', 'Total'), ('country', 'País'), ('device', 'Dispositivo'), ('browser', 'Navegador'), ('bot', 'Bot')], max_length=20)),
+                ('value', models.CharField(blank=True, default='', max_length=100)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('url', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='click_rollups', to='converter.url')),
+            ],
+            options={
+                'db_table': 'click_rollup',
+                'indexes': [models.Index(fields=['url', 'dimension', 'bucket'], name='click_rollu_url_id_13b15b_idx')],
+                'constraints': [models.UniqueConstraint(fields=('url', 'bucket', 'dimension', 'value'), name='unique_click_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import models
+
+
+class ClickRollup(models.Model):
+    class Dimension(models.TextChoices):
+        TOTAL = "total", "Total"
+        COUNTRY = "country", "País"
+        DEVICE = "device", "Dispositivo"
+        BROWSER = "browser", "Navegador"
+        BOT = "bot", "Bot"
+
+    url = models.ForeignKey(
+        "converter.Url",
+        on_delete=models.CASCADE,
+        related_name="click_rollups",
+    )
+    bucket = models.DateField()
+    dimension = models.CharField(max_length=20, choices=Dimension.choices)
+    value = models.CharField(max_length=100, blank=True, default="")
+    total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "click_rollup"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["url", "bucket", "dimension", "value"],
+                name="unique_click_rollup",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["url", "dimension", "bucket"]),
+        ]
+
+    def __str__(self):
+        return f"{self.url_id} | {self.bucket} | {self.dimension}={self.value}: {self.total}"
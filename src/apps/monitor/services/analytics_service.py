@@ -0,0 +1,75 @@
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth
+
+from apps.monitor.models import ClickRollup
+
+Dimension = ClickRollup.Dimension
+
+
+class AnalyticsService:
+
+    @staticmethod
+    def _rollups(user, dimension, since=None, until=None):
+        rollups = ClickRollup.objects.filter(url__created_by=user, dimension=dimension)
+        if since is not None:
+            rollups = rollups.filter(bucket__gte=since)
+        if until is not None:
+            rollups = rollups.filter(bucket__lt=until)
+        return rollups
+
+    @staticmethod
+    def _distribution(user, dimension, limit=None):
+        distribution = (
+            AnalyticsService._rollups(user, dimension)
+            .values("value")
+            .annotate(clicks=Sum("total"))
+            .order_by("-clicks", "value")
+        )
+        if limit is not None:
+            distribution = distribution[:limit]
+        return [(entry["value"], entry["clicks"]) for entry in distribution]
+
+    @staticmethod
+    def total_clicks(user, since=None, until=None) -> int:
+        return (
+            AnalyticsService._rollups(user, Dimension.TOTAL, since, until)
+            .aggregate(clicks=Sum("total"))["clicks"] or 0
+        )
+
+    @staticmethod
+    def monthly_clicks(user, since=None):
+        monthly = (
+            AnalyticsService._rollups(user, Dimension.TOTAL, since)
+            .annotate(month=TruncMonth("bucket"))
+            .values("month")
+            .annotate(clicks=Sum("total"))
+            .order_by("month")
+        )
+        return [(entry["month"], entry["clicks"]) for entry in monthly]
+
+    @staticmethod
+    def top_urls(user, limit=10):
+        top = (
+            AnalyticsService._rollups(user, Dimension.TOTAL)
+            .values("url__short_code")
+            .annotate(clicks=Sum("total"))
+            .order_by("-clicks", "url__short_code")[:limit]
+        )
+        return [(entry["url__short_code"], entry["clicks"]) for entry in top]
+
+    @staticmethod
+    def country_distribution(user, limit=10):
+        return AnalyticsService._distribution(user, Dimension.COUNTRY, limit)
+
+    @staticmethod
+    def device_distribution(user):
+        return AnalyticsService._distribution(user, Dimension.DEVICE)
+
+    @staticmethod
+    def browser_distribution(user, limit=5):
+        return AnalyticsService._distribution(user, Dimension.BROWSER, limit)
+
+    @staticmethod
+    def bot_split(user) -> dict:
+        split = dict(AnalyticsService._distribution(user, Dimension.BOT))
+        return {"humans": split.get("human", 0), "bots": split.get("bot", 0)}
@@ -0,0 +1,124 @@
+import logging
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.monitor.models import ClickRollup
+
+logger = logging.getLogger(__name__)
+
+Dimension = ClickRollup.Dimension
+
+
+class ClickRollupService:
+    BATCH_SIZE = 100
+
+    FIELDS = {
+        Dimension.COUNTRY: "country",
+        Dimension.DEVICE: "device_type",
+        Dimension.BROWSER: "browser",
+        Dimension.BOT: "is_bot",
+    }
+    REQUIRED = {Dimension.COUNTRY, Dimension.BROWSER}
+
+    @staticmethod
+    def _value(dimension, raw):
+        if dimension == Dimension.BOT:
+            return "bot" if raw else "human"
+        if not raw and dimension in ClickRollupService.REQUIRED:
+            return None
+        return str(raw or "")[:100]
+
+    @staticmethod
+    def count(events) -> Counter:
+        counts = Counter()
+
+        for event in events:
+            bucket = timezone.localdate(event.created_at)
+            counts[(event.url_id, bucket, Dimension.TOTAL, "")] += 1
+
+            for dimension, field in ClickRollupService.FIELDS.items():
+                value = ClickRollupService._value(dimension, getattr(event, field))
+                if value is not None:
+                    counts[(event.url_id, bucket, dimension, value)] += 1
+
+        return counts
+
+    @staticmethod
+    def record(events) -> int:
+        counts = ClickRollupService.count(events)
+        if not counts:
+            return 0
+
+        rows = sorted(counts.items(), key=lambda item: tuple(map(str, item[0])))
+        for start in range(0, len(rows), ClickRollupService.BATCH_SIZE):
+            ClickRollupService._upsert(rows[start:start + ClickRollupService.BATCH_SIZE])
+
+        return len(rows)
+
+    @staticmethod
+    def _upsert(rows) -> None:
+        meta = ClickRollup._meta
+        fields = [meta.get_field(name) for name in ("url", "bucket", "dimension", "value", "total")]
+        table = connection.ops.quote_name(meta.db_table)
+        columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+        unique = ", ".join(connection.ops.quote_name(field.column) for field in fields[:4])
+        total = connection.ops.quote_name(fields[4].column)
+
+        params = []
+        for (url_id, bucket, dimension, value), amount in rows:
+            for field, raw in zip(fields, (url_id, bucket, dimension, value, amount)):
+                params.append(field.get_db_prep_value(raw, connection))
+
+        placeholders = ", ".join(["(%s, %s, %s, %s, %s)"] * len(rows))
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) VALUES {placeholders} "
+                f"ON CONFLICT ({unique}) DO UPDATE "
+                f"SET {total} = {table}.{total} + excluded.{total}",
+                params,
+            )
+
+    @staticmethod
+    def rebuild(url_ids=None) -> int:
+        from apps.converter.models import AccessEvent
+        from apps.converter.services.retention_service import AccessEventRetentionService
+
+        # Dias fora da janela de retenção não têm mais eventos brutos: seus agregados são o histórico.
+        since = AccessEventRetentionService.complete_since()
+        events = AccessEvent.objects.filter(
+            created_at__gte=AccessEventRetentionService.day_start(since)
+        ).annotate(bucket=TruncDate("created_at"))
+        rollups = ClickRollup.objects.filter(bucket__gte=since)
+        if url_ids is not None:
+            events = events.filter(url_id__in=url_ids)
+            rollups = rollups.filter(url_id__in=url_ids)
+
+        groups = [(Dimension.TOTAL, None), *ClickRollupService.FIELDS.items()]
+        created = 0
+
+        with transaction.atomic():
+            rollups.delete()
+
+            for dimension, field in groups:
+                group_by = ["url_id", "bucket"] + ([field] if field else [])
+                rows = events.values(*group_by).annotate(total=Count("id")).order_by()
+
+                counts = Counter()
+                for row in rows.iterator():
+                    value = ClickRollupService._value(dimension, row[field]) if field else ""
+                    if value is not None:
+                        counts[(row["url_id"], row["bucket"], value)] += row["total"]
+
+                batch = [
+                    ClickRollup(url_id=url_id, bucket=bucket, dimension=dimension, value=value, total=total)
+                    for (url_id, bucket, value), total in counts.items()
+                ]
+                created += len(ClickRollup.objects.bulk_create(batch, batch_size=1000))
+
+        logger.info(f"[ROLLUP] Agregados reconstruídos | rows={created}")
+        return created
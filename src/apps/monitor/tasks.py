@@ -0,0 +1,10 @@
+from celery import shared_task
+
+from .services.rollup_service import ClickRollupService
+
+
+@shared_task(ignore_result=True)
+def rebuild_click_rollups(url_ids=None):
+    created = ClickRollupService.rebuild(url_ids)
+
+    return f"{created} agregados de cliques reconstruídos"
@@ -1,2 +1,126 @@
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.common.utils import CommonUtils
+from apps.converter.models import AccessEvent, Url
+from apps.converter.services.access_event_service import AccessEventService
+from apps.monitor.models import ClickRollup
+from apps.monitor.services.analytics_service import AnalyticsService
+from apps.monitor.services.rollup_service import ClickRollupService
+
+User = get_user_model()
+
+
+def _payload(url, **overrides):
+    return {
+        'url_id': str(url.id),
+        'created_at': timezone.now().timestamp(),
+        'ip_address': '1.1.1.1',
+        'user_agent': 'Mozilla/5.0',
+        'browser': 'Chrome',
+        'device_type': 'PC',
+        'country': 'BR',
+        'is_bot': False,
+        **overrides,
+    }
+
+
+class ClickRollupServiceTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.user = User.objects.create_user(username='owner', email='owner@test.com')
+        self.url = Url.objects.create(original_url='https://example.com', created_by=self.user)
+
+    def _totals(self, dimension):
+        return dict(
+            ClickRollup.objects.filter(url=self.url, dimension=dimension)
+            .values_list('value', 'total')
+        )
+
+    def test_ingest_increments_rollups(self):
+        AccessEventService.create_events([
+            _payload(self.url),
+            _payload(self.url, country='US', is_bot=True),
+        ])
+        AccessEventService.create_events([_payload(self.url, country=None, browser='Firefox')])
+
+        self.assertEqual(self._totals(ClickRollup.Dimension.TOTAL), {'': 3})
+        self.assertEqual(self._totals(ClickRollup.Dimension.COUNTRY), {'BR': 1, 'US': 1})
+        self.assertEqual(self._totals(ClickRollup.Dimension.BROWSER), {'Chrome': 2, 'Firefox': 1})
+        self.assertEqual(self._totals(ClickRollup.Dimension.BOT), {'human': 2, 'bot': 1})
+
+    def test_batch_is_written_with_a_single_upsert(self):
+        payloads = [_payload(self.url, country=country) for country in ('BR', 'US', 'AR')]
+
+        with self.assertNumQueries(5):
+            AccessEventService.create_events(payloads)
+
+    def test_rebuild_matches_incremental_rollups(self):
+        AccessEventService.create_events([
+            _payload(self.url),
+            _payload(self.url, country='US', created_at=(timezone.now() - timedelta(days=3)).timestamp()),
+        ])
+        expected = sorted(ClickRollup.objects.values_list('bucket', 'dimension', 'value', 'total'))
+
+        ClickRollup.objects.all().delete()
+        ClickRollupService.rebuild()
+
+        self.assertEqual(
+            sorted(ClickRollup.objects.values_list('bucket', 'dimension', 'value', 'total')),
+            expected,
+        )
+
+    def test_rollups_are_removed_with_url(self):
+        AccessEventService.create_events([_payload(self.url)])
+        self.url.delete()
+
+        self.assertFalse(ClickRollup.objects.exists())
+
+
+class AnalyticsServiceTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.user = User.objects.create_user(username='owner', email='owner@test.com')
+        self.other = User.objects.create_user(username='other', email='other@test.com')
+        self.url = Url.objects.create(original_url='https://example.com', created_by=self.user)
+        self.foreign = Url.objects.create(original_url='https://other.com', created_by=self.other)
+
+        old = (timezone.now() - timedelta(days=40)).timestamp()
+        AccessEventService.create_events([
+            _payload(self.url),
+            _payload(self.url, created_at=old),
+            _payload(self.foreign),
+        ])
+
+    def test_totals_are_scoped_to_user(self):
+        self.assertEqual(AnalyticsService.total_clicks(self.user), 2)
+        self.assertEqual(
+            AnalyticsService.total_clicks(self.user, since=timezone.localdate() - timedelta(days=30)),
+            1,
+        )
+        self.assertEqual(AnalyticsService.top_urls(self.user), [(self.url.short_code, 2)])
+        self.assertEqual(AnalyticsService.bot_split(self.user), {'humans': 2, 'bots': 0})
+
+
+class DashboardHomeViewTests(TestCase):
+    def setUp(self):
+        CommonUtils().disable_welcome_signal()
+        self.client = Client()
+        self.user = User.objects.create_user(username='owner', email='owner@test.com', password='pass')
+        self.url = Url.objects.create(original_url='https://example.com', created_by=self.user)
+        AccessEventService.create_events([_payload(self.url), _payload(self.url, country='US')])
+        self.client.force_login(self.user)
+
+    def test_dashboard_reads_rollups_only(self):
+        AccessEvent.objects.all().delete()
+
+        response = self.client.get(reverse('dashboard_home'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['total_accesses'], 2)
+        self.assertEqual(response.context['pie_labels'], [self.url.short_code])
+        self.assertEqual(response.context['country_data'], [1, 1])
@@ -2,15 +2,16 @@ import json
 from datetime import timedelta
 
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count, OuterRef, Q, Subquery
-from django.db.models.functions import TruncMonth
+from django.db.models import Q
 from django.http import JsonResponse
 from django.shortcuts import render
 from django.utils import timezone
 from django.views import View
 from django.views.generic import ListView
 
-from apps.converter.models import AccessEvent, Url
+from apps.converter.models import Url
+from apps.converter.services.qr_service import QrCodeService
+from apps.monitor.services.analytics_service import AnalyticsService
 
 
 class DashboardHomeView(LoginRequiredMixin, View):
@@ -18,43 +19,25 @@ class DashboardHomeView(LoginRequiredMixin, View):
     redirect_field_name = "next"
 
     def get(self, request):
-        now = timezone.now()
-        six_months_ago = now - timedelta(days=180)
-        thirty_days_ago = now - timedelta(days=30)
-        sixty_days_ago = now - timedelta(days=60)
-
-        clicks_subquery = (
-            AccessEvent.objects.filter(url=OuterRef("pk"))
-            .values("url")
-            .annotate(clicks_count=Count("id"))
-            .values("clicks_count")[:1]
-        )
+        user = request.user
+        today = timezone.localdate()
+        six_months_ago = today - timedelta(days=180)
+        thirty_days_ago = today - timedelta(days=30)
+        sixty_days_ago = today - timedelta(days=60)
 
         user_urls = (
-            Url.objects.filter(created_by=request.user)
+            Url.objects.filter(created_by=user)
             .select_related("metadata")
-            .annotate(clicks=Subquery(clicks_subquery))
             .order_by("-created_at")
         )
 
-        access_events = AccessEvent.objects.filter(
-            url__created_by=request.user
-        )
-
         total_urls = user_urls.count()
-        total_access_events = access_events.count()
-        total_accesses_last_6_months = access_events.filter(
-            created_at__gte=six_months_ago
-        ).count()
+        total_access_events = AnalyticsService.total_clicks(user)
 
-        last_30 = access_events.filter(
-            created_at__gte=thirty_days_ago
-        ).count()
-
-        previous_30 = access_events.filter(
-            created_at__gte=sixty_days_ago,
-            created_at__lt=thirty_days_ago
-        ).count()
+        last_30 = AnalyticsService.total_clicks(user, since=thirty_days_ago)
+        previous_30 = AnalyticsService.total_clicks(
+            user, since=sixty_days_ago, until=thirty_days_ago
+        )
 
         growth_rate = 0
         if previous_30 > 0:
@@ -62,72 +45,33 @@ class DashboardHomeView(LoginRequiredMixin, View):
                 ((last_30 - previous_30) / previous_30) * 100, 2
             )
 
-        monthly_accesses = (
-            access_events.filter(created_at__gte=six_months_ago)
-            .annotate(month=TruncMonth("created_at"))
-            .values("month")
-            .annotate(total_clicks=Count("id"))
-            .order_by("month")
-        )
+        monthly_accesses = AnalyticsService.monthly_clicks(user, since=six_months_ago)
+        monthly_labels = [month.strftime("%b/%Y") for month, _ in monthly_accesses]
+        monthly_data = [clicks for _, clicks in monthly_accesses]
+        total_accesses_last_6_months = sum(monthly_data)
 
-        monthly_labels = [
-            entry["month"].strftime("%b/%Y")
-            for entry in monthly_accesses
-        ]
+        top_clicked_urls = AnalyticsService.top_urls(user, limit=10)
+        top_urls_labels = [short_code for short_code, _ in top_clicked_urls]
+        top_urls_clicks = [clicks for _, clicks in top_clicked_urls]
 
-        monthly_data = [
-            entry["total_clicks"]
-            for entry in monthly_accesses
-        ]
+        country_distribution = AnalyticsService.country_distribution(user, limit=10)
+        country_labels = [country for country, _ in country_distribution]
+        country_data = [total for _, total in country_distribution]
 
-        top_clicked_urls = user_urls.filter(
-            clicks__gt=0
-        ).order_by("-clicks")[:10]
+        device_distribution = AnalyticsService.device_distribution(user)
+        device_labels = [device for device, _ in device_distribution]
+        device_data = [total for _, total in device_distribution]
 
-        top_urls_labels = [url.short_code for url in top_clicked_urls]
-        top_urls_clicks = [url.clicks or 0 for url in top_clicked_urls]
+        browser_distribution = AnalyticsService.browser_distribution(user, limit=5)
+        browser_labels = [browser for browser, _ in browser_distribution]
+        browser_data = [total for _, total in browser_distribution]
 
-        country_distribution = (
-            access_events
-            .exclude(country__isnull=True)
-            .values("country")
-            .annotate(total=Count("id"))
-            .order_by("-total")[:10]
-        )
-
-        country_labels = [country["country"] for country in country_distribution]
-        country_data = [country["total"] for country in country_distribution]
-
-        device_distribution = (
-            access_events
-            .values("device_type")
-            .annotate(total=Count("id"))
-            .order_by("-total")
-        )
-
-        device_labels = [d["device_type"] for d in device_distribution]
-        device_data = [d["total"] for d in device_distribution]
-
-        browser_distribution = (
-            access_events
-            .exclude(browser__isnull=True)
-            .values("browser")
-            .annotate(total=Count("id"))
-            .order_by("-total")[:5]
-        )
-
-        browser_labels = [b["browser"] for b in browser_distribution]
-        browser_data = [b["total"] for b in browser_distribution]
-
-        bot_stats = access_events.aggregate(
-            humans=Count("id", filter=Q(is_bot=False)),
-            bots=Count("id", filter=Q(is_bot=True)),
-        )
+        bot_stats = AnalyticsService.bot_split(user)
 
         bot_labels = ["Humanos", "Bots"]
         bot_data = [
-            bot_stats["humans"] or 0,
-            bot_stats["bots"] or 0,
+            bot_stats["humans"],
+            bot_stats["bots"],
         ]
 
         context = {
@@ -162,6 +106,7 @@ class UrlDelete(LoginRequiredMixin, View):
         try:
             url_object = Url.objects.get(id=url_id, created_by=request.user)
             url_object.delete()
+            QrCodeService.schedule_purge([url_object.short_code])
             return JsonResponse({"success": True, "message": "Link excluído com sucesso."})
         except Url.DoesNotExist:
             return JsonResponse(
@@ -182,7 +127,7 @@ class UrlUpdate(LoginRequiredMixin, View):
 
             url_object = Url.objects.get(id=url_id, created_by=request.user)
             url_object.original_url = new_url
-            url_object.save()
+            url_object.save(update_fields=["original_url", "updated_at"])
 
             return JsonResponse({"success": True, "message": "URL atualizada com sucesso."})
         except Url.DoesNotExist:
@@ -204,16 +149,7 @@ class UserUrlsList(LoginRequiredMixin, ListView):
     paginate_by = 15
 
     def get_queryset(self):
-        clicks_subquery = (
-            AccessEvent.objects.filter(url=OuterRef("pk"))
-            .values("url")
-            .annotate(total_clicks=Count("id"))
-            .values("total_clicks")[:1]
-        )
-
-        qs = Url.objects.filter(created_by=self.request.user).select_related("metadata").annotate(
-            clicks=Subquery(clicks_subquery)
-        )
+        qs = Url.objects.filter(created_by=self.request.user).select_related("metadata")
 
         search = self.request.GET.get("q", "").strip()
         if search:
@@ -222,5 +158,5 @@ class UserUrlsList(LoginRequiredMixin, ListView):
         min_clicks = self.request.GET.get("min_clicks")
 
         if min_clicks and min_clicks.isdigit():
-            qs = qs.filter(clicks__gte=int(min_clicks))
+            qs = qs.filter(click_count__gte=int(min_clicks))
         return qs.order_by("-created_at")
@@ -1,4 +1,5 @@
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.http import JsonResponse
 
 from apps.security.services import ExponentialBanService, WebSocketOriginService
@@ -7,10 +8,29 @@ from apps.security.services import ExponentialBanService, WebSocketOriginService
 class ExponentialBanMiddleware:
     LOGIN_URLS = ["/login/", "/api/login/"]
 
+    async_capable = True
+    sync_capable = True
+
     def __init__(self, get_response=None):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        return self._banned_response(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        if request.path in self.LOGIN_URLS:
+            response = await sync_to_async(self._banned_response)(request)
+            if response:
+                return response
+
+        return await self.get_response(request)
+
+    def _banned_response(self, request):
         if request.path in self.LOGIN_URLS:
             username = request.POST.get("username")
             if username:
@@ -21,7 +41,7 @@ class ExponentialBanMiddleware:
                         status=429,
                     )
 
-        return self.get_response(request)
+        return None
 
 
 class WsAllowedOriginValidator:
@@ -1,18 +1,38 @@
+import logging
+import os
 import time
+from typing import Callable, NamedTuple
 from urllib.parse import urlparse
 
 import redis
 from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
 
 BASE_DELAY = 15
 
 
 class RedisConnectionService:
+    _client = None
+    _key = None
+
     @staticmethod
     def get_redis_client():
         url = getattr(settings, "REDIS_URL",
                       None) or "redis://localhost:6379/0"
-        return redis.Redis.from_url(url)
+
+        # Um cliente (e um pool de conexões) por processo; recriado após fork dos workers.
+        key = (os.getpid(), url)
+        if RedisConnectionService._client is None or RedisConnectionService._key != key:
+            RedisConnectionService._client = redis.Redis.from_url(url)
+            RedisConnectionService._key = key
+        return RedisConnectionService._client
+
+    @staticmethod
+    def reset() -> None:
+        RedisConnectionService._client = None
+        RedisConnectionService._key = None
 
 
 class ExponentialBanService:
@@ -41,6 +61,72 @@ class ExponentialBanService:
         return max(0, int(ts) - now)
 
 
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    count: int
+    limit: int
+    reset_in: int
+    key: str | None = None
+
+
+class RateLimitService:
+    KEY_PREFIX = "ratelimit"
+
+    @staticmethod
+    def _window(window: int, now: float) -> tuple[int, int]:
+        offset = int(timezone.localtime().utcoffset().total_seconds())
+        start = int((now + offset) // window) * window - offset
+        return start, start + window
+
+    @staticmethod
+    def hit(
+        scope: str,
+        identifier,
+        *,
+        limit: int,
+        window: int,
+        amount: int = 1,
+        fallback: Callable[[], int] | None = None,
+    ) -> RateLimitResult:
+        now = time.time()
+        start, end = RateLimitService._window(window, now)
+        reset_in = max(1, int(end - now))
+        key = f"{RateLimitService.KEY_PREFIX}:{scope}:{identifier}:{start}"
+
+        try:
+            client = RedisConnectionService.get_redis_client()
+            with client.pipeline() as pipe:
+                pipe.incrby(key, amount)
+                pipe.expire(key, reset_in + 60)
+                count, _ = pipe.execute()
+
+            if count > limit:
+                client.decrby(key, amount)
+                return RateLimitResult(False, count - amount, limit, reset_in, key)
+
+            return RateLimitResult(True, count, limit, reset_in, key)
+
+        except Exception as e:
+            logger.warning(f"[RATE LIMIT] Redis indisponível, usando fallback | scope={scope} error={e}")
+
+        if fallback is None:
+            return RateLimitResult(True, 0, limit, reset_in)
+
+        count = fallback()
+        if count + amount > limit:
+            return RateLimitResult(False, count, limit, reset_in)
+        return RateLimitResult(True, count + amount, limit, reset_in)
+
+    @staticmethod
+    def release(result: RateLimitResult, amount: int = 1) -> None:
+        if not result.allowed or result.key is None:
+            return
+        try:
+            RedisConnectionService.get_redis_client().decrby(result.key, amount)
+        except Exception as e:
+            logger.warning(f"[RATE LIMIT] Falha ao devolver cota | key={result.key} error={e}")
+
+
 class WebSocketOriginService:
 
     @staticmethod
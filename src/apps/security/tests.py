@@ -1,2 +1,121 @@
+import time
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from unittest.mock import Mock, patch
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, SimpleTestCase, override_settings
+from django.utils import timezone
+
+from apps.common.tests.mocks.mock_redis import MockRedis
+from apps.security.middleware import ExponentialBanMiddleware
+from apps.security.services import (
+    ExponentialBanService,
+    RateLimitService,
+    RedisConnectionService,
+)
+
+
+@override_settings(REDIS_URL='redis://localhost:6379/0')
+class RedisConnectionServiceTests(SimpleTestCase):
+    def setUp(self):
+        RedisConnectionService.reset()
+        self.addCleanup(RedisConnectionService.reset)
+
+    def test_client_is_shared_within_process(self):
+        client = RedisConnectionService.get_redis_client()
+
+        self.assertIs(RedisConnectionService.get_redis_client(), client)
+
+    def test_client_is_rebuilt_after_fork(self):
+        client = RedisConnectionService.get_redis_client()
+
+        with patch('apps.security.services.os.getpid', return_value=-1):
+            self.assertIsNot(RedisConnectionService.get_redis_client(), client)
+
+    def test_client_follows_redis_url(self):
+        client = RedisConnectionService.get_redis_client()
+
+        with override_settings(REDIS_URL='redis://other:6379/1'):
+            self.assertIsNot(RedisConnectionService.get_redis_client(), client)
+
+
+class RateLimitServiceTests(SimpleTestCase):
+    def setUp(self):
+        self.redis = MockRedis()
+        patcher = patch.object(RedisConnectionService, 'get_redis_client', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_allows_until_limit(self):
+        results = [
+            RateLimitService.hit('test', '1.1.1.1', limit=2, window=60)
+            for _ in range(3)
+        ]
+
+        self.assertEqual([result.allowed for result in results], [True, True, False])
+        self.assertEqual(results[-1].count, 2)
+
+    def test_rejected_hits_do_not_consume_quota(self):
+        first = RateLimitService.hit('test', '1.1.1.1', limit=1, window=60)
+        for _ in range(5):
+            RateLimitService.hit('test', '1.1.1.1', limit=1, window=60)
+
+        self.assertEqual(int(self.redis.get(first.key)), 1)
+
+    def test_scopes_and_identifiers_are_isolated(self):
+        RateLimitService.hit('test', '1.1.1.1', limit=1, window=60)
+
+        self.assertTrue(RateLimitService.hit('test', '2.2.2.2', limit=1, window=60).allowed)
+        self.assertTrue(RateLimitService.hit('other', '1.1.1.1', limit=1, window=60).allowed)
+
+    def test_release_returns_quota(self):
+        result = RateLimitService.hit('test', '1.1.1.1', limit=1, window=60)
+        RateLimitService.release(result)
+
+        self.assertTrue(RateLimitService.hit('test', '1.1.1.1', limit=1, window=60).allowed)
+
+    def test_falls_back_to_callable_without_redis(self):
+        self.redis.pipeline = Mock(side_effect=ConnectionError)
+
+        self.assertTrue(RateLimitService.hit('test', 'x', limit=3, window=60, fallback=lambda: 2).allowed)
+        self.assertFalse(RateLimitService.hit('test', 'x', limit=3, window=60, fallback=lambda: 3).allowed)
+
+    def test_fails_open_without_redis_or_fallback(self):
+        self.redis.pipeline = Mock(side_effect=ConnectionError)
+
+        self.assertTrue(RateLimitService.hit('test', 'x', limit=0, window=60).allowed)
+
+    def test_window_is_aligned_to_local_midnight(self):
+        now = time.time()
+        start, end = RateLimitService._window(60 * 60 * 24, now)
+
+        self.assertEqual(end - start, 60 * 60 * 24)
+        self.assertTrue(start <= now < end)
+        self.assertEqual(timezone.localtime(datetime.fromtimestamp(start, tz=dt_timezone.utc)).hour, 0)
+
+
+class ExponentialBanMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        async def get_response(request):
+            return HttpResponse('ok')
+
+        self.middleware = ExponentialBanMiddleware(get_response)
+        self.factory = AsyncRequestFactory()
+
+    def test_async_chain_stays_async(self):
+        self.assertTrue(iscoroutinefunction(self.middleware))
+
+    async def test_passes_through_non_login_requests(self):
+        response = await self.middleware(self.factory.get('/abc123/'))
+
+        self.assertEqual(response.status_code, 200)
+
+    async def test_blocks_banned_login_in_async_mode(self):
+        request = self.factory.post('/login/', {'username': 'banned'})
+
+        with patch.object(ExponentialBanService, 'get_ban_remaining', return_value=30):
+            response = await self.middleware(request)
+
+        self.assertEqual(response.status_code, 429)
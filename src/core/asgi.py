@@ -5,6 +5,7 @@ from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
 
 from django.core.asgi import get_asgi_application
+from apps.billing.ws_urls import websocket_urlpatterns as billing_websocket_urlpatterns
 from apps.manager.ws_urls import websocket_urlpatterns
 from apps.security.middleware import WsAllowedOriginValidator
 
@@ -18,7 +19,7 @@ application = ProtocolTypeRouter({
     "http": django_asgi_app,
     "websocket": WsAllowedOriginValidator(
         AuthMiddlewareStack(
-            URLRouter(websocket_urlpatterns)
+            URLRouter(websocket_urlpatterns + billing_websocket_urlpatterns)
         ),
     )
 })
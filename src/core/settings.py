@@ -1,5 +1,6 @@
 import os
 import sys
+from datetime import timedelta
 from pathlib import Path
 
 from celery.schedules import crontab
@@ -28,6 +29,7 @@ loadenv(dotenv_path=BASE_DIR / ".env")
 SECRET_KEY = os.environ.get("DJANGO_SECRET_KEY", '')
 SHORT_CODE_MIN_LENGTH = int(os.getenv("DJANGO_SHORT_CODE_MIN_LENGTH", 6) or 6)
 SHORT_CODE_SALT = os.environ.get("DJANGO_SHORT_CODE_SALT", '')
+URL_SEQUENCE_BLOCK_SIZE = int(os.getenv("URL_SEQUENCE_BLOCK_SIZE", 100) or 100)
 
 DEBUG = True if os.environ.get("DJANGO_DEBUG", "FALSE") == "TRUE" else False
 ALLOWED_HOSTS = [
@@ -138,6 +140,7 @@ INSTALLED_APPS = [
 # ================================================================
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "apps.manager.middleware.QueryInstrumentationMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "apps.security.middleware.ExponentialBanMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -313,6 +316,54 @@ CELERY_TIMEZONE = "America/Sao_Paulo"
 CELERY_TRACK_STARTED = True
 CELERY_IGNORE_RESULT = False
 
+ACCESS_EVENT_BUFFERED = os.environ.get("ACCESS_EVENT_BUFFERED", "FALSE") == "TRUE"
+ACCESS_EVENT_BATCH_SIZE = int(os.getenv("ACCESS_EVENT_BATCH_SIZE", 500) or 500)
+ACCESS_EVENT_FLUSH_INTERVAL = int(os.getenv("ACCESS_EVENT_FLUSH_INTERVAL", 10) or 10)
+ACCESS_EVENT_BUFFER_HIGH_WATERMARK = int(
+    os.getenv("ACCESS_EVENT_BUFFER_HIGH_WATERMARK", 50000) or 50000
+)
+# Tentativas de um lote antes de separar os itens que falham na fila de descarte (:dead)
+ACCESS_EVENT_FLUSH_MAX_ATTEMPTS = int(os.getenv("ACCESS_EVENT_FLUSH_MAX_ATTEMPTS", 5) or 5)
+
+USER_AGENT_CACHE_SIZE = int(os.getenv("USER_AGENT_CACHE_SIZE", 5000) or 5000)
+USER_AGENT_CACHE_REDIS = os.environ.get("USER_AGENT_CACHE_REDIS", "FALSE") == "TRUE"
+
+BULK_SHORTEN_MAX_URLS = int(os.getenv("BULK_SHORTEN_MAX_URLS", 5000) or 5000)
+
+URL_REAPER_CHUNK_SIZE = int(os.getenv("URL_REAPER_CHUNK_SIZE", 500) or 500)
+URL_REAPER_SLEEP = float(os.getenv("URL_REAPER_SLEEP", "0.5"))
+URL_REAPER_MAX_CHUNKS = int(os.getenv("URL_REAPER_MAX_CHUNKS", 0) or 0) or None
+
+ACCESS_EVENT_RETENTION_DAYS = int(os.getenv("ACCESS_EVENT_RETENTION_DAYS", 365) or 365)
+ACCESS_EVENT_PARTITIONS_AHEAD = int(os.getenv("ACCESS_EVENT_PARTITIONS_AHEAD", 3) or 3)
+ACCESS_EVENT_ARCHIVE_PARTITIONS = os.environ.get("ACCESS_EVENT_ARCHIVE_PARTITIONS", "FALSE") == "TRUE"
+
+SHORT_CODE_ALLOW_LEGACY = os.environ.get("SHORT_CODE_ALLOW_LEGACY", "TRUE") == "TRUE"
+
+SHORT_CODE_BLOOM_ENABLED = os.environ.get("SHORT_CODE_BLOOM_ENABLED", "FALSE") == "TRUE"
+SHORT_CODE_BLOOM_CAPACITY = int(os.getenv("SHORT_CODE_BLOOM_CAPACITY", 1000000) or 1000000)
+SHORT_CODE_BLOOM_ERROR_RATE = float(os.getenv("SHORT_CODE_BLOOM_ERROR_RATE", "0.001"))
+SHORT_CODE_BLOOM_REBUILD_MARGIN = int(os.getenv("SHORT_CODE_BLOOM_REBUILD_MARGIN", 300) or 300)
+
+INTERSTITIAL_WAIT_SECONDS = int(os.getenv("INTERSTITIAL_WAIT_SECONDS", 5) or 5)
+INTERSTITIAL_TOKEN_MAX_AGE = int(os.getenv("INTERSTITIAL_TOKEN_MAX_AGE", 600) or 600)
+
+WALLET_BALANCE_CACHE_TIMEOUT = int(os.getenv("WALLET_BALANCE_CACHE_TIMEOUT", 300) or 300)
+WALLET_LEDGER_ENABLED = os.environ.get("WALLET_LEDGER_ENABLED", "FALSE") == "TRUE"
+WALLET_CHECKPOINT_LAG = int(os.getenv("WALLET_CHECKPOINT_LAG", 300) or 300)
+
+QUERY_INSTRUMENTATION_ENABLED = os.environ.get("QUERY_INSTRUMENTATION_ENABLED", "FALSE") == "TRUE"
+QUERY_SLOW_MS = int(os.getenv("QUERY_SLOW_MS", 100) or 100)
+QUERY_STATS_SAMPLE_RATE = float(os.getenv("QUERY_STATS_SAMPLE_RATE", "1.0"))
+QUERY_STATS_BUCKET_SECONDS = int(os.getenv("QUERY_STATS_BUCKET_SECONDS", 300) or 300)
+QUERY_STATS_WINDOW_SECONDS = int(os.getenv("QUERY_STATS_WINDOW_SECONDS", 3600) or 3600)
+
+ASYNC_REDIRECT_VIEW = os.environ.get("ASYNC_REDIRECT_VIEW", "FALSE") == "TRUE"
+
+EDGE_REDIRECT_MAP_DIR = os.getenv("EDGE_REDIRECT_MAP_DIR", "")
+EDGE_REDIRECT_MAP_DEBOUNCE = int(os.getenv("EDGE_REDIRECT_MAP_DEBOUNCE", 30) or 30)
+EDGE_ACCESS_LOG_PATH = os.getenv("EDGE_ACCESS_LOG_PATH", "")
+
 CELERY_BEAT_SCHEDULE = {
     "delete-expired-urls-every-hour": {
         "task": "apps.converter.tasks.delete_expired_urls",
@@ -326,12 +377,71 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'apps.billing.tasks.deposit_monthly_credits',
         'schedule': crontab(hour=0, minute="*"),
     },
+    "enforce-access-event-retention-daily": {
+        "task": "apps.converter.tasks.enforce_access_event_retention",
+        "schedule": crontab(minute=30, hour=3),
+    },
+    "regenerate-edge-redirect-map-every-hour": {
+        "task": "apps.converter.tasks.regenerate_edge_redirect_map",
+        "schedule": crontab(minute=15, hour="*"),
+    },
+    "rebuild-short-code-bloom-filter-daily": {
+        "task": "apps.converter.tasks.rebuild_short_code_bloom_filter",
+        "schedule": crontab(minute=45, hour=4),
+    },
+    "checkpoint-wallet-ledger-every-hour": {
+        "task": "apps.billing.tasks.checkpoint_wallet_ledger",
+        "schedule": crontab(minute=5, hour="*"),
+    },
+    "drain-webhook-inbox": {
+        "task": "apps.billing.tasks.drain_webhook_inbox",
+        "schedule": timedelta(minutes=1),
+    },
+    "ingest-edge-access-log": {
+        "task": "apps.converter.tasks.ingest_edge_access_log",
+        "schedule": timedelta(minutes=1),
+    },
 }
 
+if ACCESS_EVENT_BUFFERED:
+    CELERY_BEAT_SCHEDULE["flush-access-events"] = {
+        "task": "apps.converter.tasks.flush_access_events",
+        "schedule": timedelta(seconds=ACCESS_EVENT_FLUSH_INTERVAL),
+    }
+else:
+    # Sem buffer o redirect grava só o evento; os agregados diários seguem em lote
+    CELERY_BEAT_SCHEDULE["flush-click-aggregates"] = {
+        "task": "apps.converter.tasks.flush_click_aggregates",
+        "schedule": timedelta(seconds=ACCESS_EVENT_FLUSH_INTERVAL),
+    }
+
 MERCADO_PAGO_ACCESS_TOKEN = os.environ.get("MERCADO_PAGO_ACCESS_TOKEN", '')
 MERCADO_PAGO_PUBLIC_KEY = os.environ.get("MERCADO_PAGO_PUBLIC_KEY", '')
 MERCADO_PAGO_WEBHOOK_SECRET = os.environ.get("MERCADO_PAGO_WEBHOOK_SECRET", '')
 
+MERCADO_PAGO_CONNECT_TIMEOUT = float(os.getenv("MERCADO_PAGO_CONNECT_TIMEOUT", "3.0"))
+MERCADO_PAGO_READ_TIMEOUT = float(os.getenv("MERCADO_PAGO_READ_TIMEOUT", "10.0"))
+MERCADO_PAGO_MAX_RETRIES = int(os.getenv("MERCADO_PAGO_MAX_RETRIES", 2) or 2)
+MERCADO_PAGO_RETRY_BACKOFF = float(os.getenv("MERCADO_PAGO_RETRY_BACKOFF", "0.3"))
+MERCADO_PAGO_POOL_SIZE = int(os.getenv("MERCADO_PAGO_POOL_SIZE", 10) or 10)
+MERCADO_PAGO_PAYMENT_CACHE_TIMEOUT = int(os.getenv("MERCADO_PAGO_PAYMENT_CACHE_TIMEOUT", 10) or 10)
+
+PAYMENT_STATUS_EVENT_TIMEOUT = int(os.getenv("PAYMENT_STATUS_EVENT_TIMEOUT", 3600) or 3600)
+PAYMENT_STATUS_STREAM_TIMEOUT = int(os.getenv("PAYMENT_STATUS_STREAM_TIMEOUT", 60) or 60)
+PAYMENT_STATUS_HEARTBEAT = int(os.getenv("PAYMENT_STATUS_HEARTBEAT", 15) or 15)
+
+WEBHOOK_TASK_QUEUE = os.getenv("WEBHOOK_TASK_QUEUE", "billing_webhooks")
+WEBHOOK_INBOX_BATCH_SIZE = int(os.getenv("WEBHOOK_INBOX_BATCH_SIZE", 50) or 50)
+WEBHOOK_MAX_ATTEMPTS = int(os.getenv("WEBHOOK_MAX_ATTEMPTS", 5) or 5)
+WEBHOOK_RETRY_DELAY = int(os.getenv("WEBHOOK_RETRY_DELAY", 60) or 60)
+WEBHOOK_PROCESSING_TIMEOUT = int(os.getenv("WEBHOOK_PROCESSING_TIMEOUT", 300) or 300)
+
+# Fila dedicada: a concorrência do worker de webhooks limita as chamadas ao Mercado Pago.
+CELERY_TASK_ROUTES = {
+    "apps.billing.tasks.process_webhook_event": {"queue": WEBHOOK_TASK_QUEUE},
+    "apps.billing.tasks.drain_webhook_inbox": {"queue": WEBHOOK_TASK_QUEUE},
+}
+
 # ================================================================
 # EMAIL CONFIGURATION
 # ================================================================
@@ -371,6 +481,22 @@ CACHES = {
     }
 }
 
+if "test" in sys.argv:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# ================================================================
+# SHORT CODE RESOLVER
+# ================================================================
+SHORT_CODE_CACHE_TIMEOUT = int(os.getenv("SHORT_CODE_CACHE_TIMEOUT", 3600) or 3600)
+SHORT_CODE_LOCAL_CACHE_SIZE = int(os.getenv("SHORT_CODE_LOCAL_CACHE_SIZE", 10000) or 10000)
+SHORT_CODE_LOCAL_CACHE_TIMEOUT = int(os.getenv("SHORT_CODE_LOCAL_CACHE_TIMEOUT", 30) or 30)
+# Intervalo (s) para checar a geração compartilhada; limita a obsolescência entre workers
+SHORT_CODE_LOCAL_CACHE_CHECK_INTERVAL = int(os.getenv("SHORT_CODE_LOCAL_CACHE_CHECK_INTERVAL", 1) or 1)
+
 # ================================================================
 # AXES
 # ================================================================